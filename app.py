@@ -1,24 +1,29 @@
 import sys
 import os
+import time
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                             QLabel, QComboBox, QLineEdit, QSpinBox, QDoubleSpinBox, 
                             QPushButton, QTabWidget, QScrollArea, QGroupBox, QSlider, 
                             QCheckBox, QRadioButton, QSplitter, QFrame, QGridLayout, 
-                            QButtonGroup, QFileDialog, QMessageBox, QTextEdit)
-from PyQt5.QtCore import Qt, QSize
+                            QButtonGroup, QFileDialog, QMessageBox, QTextEdit, QProgressBar)
+from PyQt5.QtCore import Qt, QSize, QThread, QTimer, pyqtSignal
 from PyQt5.QtGui import QFont, QIcon, QPixmap, QColor, QPalette
-import pandas as pd
-import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 import numpy as np
 import random
 
 # Importar módulos del proyecto
-from models import DataModels, Individual
+from models import DataModels, Individual, GenomeCatalog
 from evaluator import FitnessEvaluator
 from genetic_algorithm import GeneticAlgorithm
+from exhaustive_solver import ExhaustiveSolver
 from visualizer import ResultVisualizer
+from result_cache import ResultCache, RESULT_CACHE_DIR
+from optilens import normalize_params, result_from_ga, solutions_from_result
+
+# Tamaño máximo del espacio de configuraciones que la búsqueda exacta enumera
+EXHAUSTIVE_THRESHOLD = 5_000_000
 
 # Estilo y colores para la aplicación
 STYLE = """
@@ -105,17 +110,172 @@ STYLE = """
 """
 
 class ResultCanvas(FigureCanvas):
-    def __init__(self, parent=None, width=6, height=4, dpi=100):
+    """
+    Gráfica de evolución de la aptitud.
+    Durante la optimización los puntos nuevos se agregan a las líneas existentes
+    y solo se redibujan esas líneas sobre un fondo guardado (blitting), como
+    mucho max_fps veces por segundo; la figura completa solo se vuelve a dibujar
+    cuando los datos salen de los límites de los ejes o cambia el tamaño.
+    """
+    def __init__(self, parent=None, width=6, height=4, dpi=100, max_fps=20):
         fig = Figure(figsize=(width, height), dpi=dpi)
         self.axes = fig.add_subplot(111)
         super(ResultCanvas, self).__init__(fig)
         self.setParent(parent)
         
+        self.min_interval = 1.0 / max_fps
+        self.best_line = None
+        self.avg_line = None
+        self._background = None
+        self._generations = []
+        self._best = []
+        self._avg = []
+        self._last_frame = 0.0
+        
+        # Dibujo diferido del último cuadro omitido por el límite de frecuencia
+        self._pending = QTimer(self)
+        self._pending.setSingleShot(True)
+        self._pending.timeout.connect(self.flush)
+        self.mpl_connect('draw_event', self._on_draw)
+        
         # Configuración inicial del gráfico
+        self.reset()
+    
+    def _setup_axes(self):
         self.axes.set_title('Evolución de Aptitud')
         self.axes.set_xlabel('Generaciones')
         self.axes.set_ylabel('Aptitud')
         self.axes.grid(True)
+    
+    def reset(self):
+        """Limpia la gráfica y sale del modo en vivo."""
+        self._pending.stop()
+        self.axes.clear()
+        self._setup_axes()
+        self.best_line = None
+        self.avg_line = None
+        self._background = None
+        self.draw()
+    
+    def start_live(self, generations):
+        """
+        Prepara la gráfica para recibir generaciones una a una.
+        
+        Args:
+            generations (int): Número máximo de generaciones (fija el eje X)
+        """
+        self.reset()
+        self._generations, self._best, self._avg = [], [], []
+        self._last_frame = 0.0
+        # Las líneas animadas no se incluyen en el fondo guardado
+        self.best_line, = self.axes.plot([], [], 'b-', label='Mejor aptitud', animated=True)
+        self.avg_line, = self.axes.plot([], [], 'r--', label='Aptitud promedio', animated=True)
+        self.axes.legend(loc='lower right')
+        self.axes.set_xlim(0, max(1, generations))
+        self.axes.set_ylim(0, 1)
+        self.draw()
+    
+    def append(self, generation, best_fitness, avg_fitness):
+        """
+        Agrega una generación a la gráfica en vivo.
+        Si el último cuadro se dibujó hace menos de 1 / max_fps segundos, el
+        dibujo se pospone y se agrupa con las generaciones siguientes.
+        """
+        if self.best_line is None:
+            return
+        self._generations.append(generation)
+        self._best.append(best_fitness)
+        self._avg.append(avg_fitness)
+        
+        espera = self.min_interval - (time.perf_counter() - self._last_frame)
+        if espera > 0:
+            if not self._pending.isActive():
+                self._pending.start(int(espera * 1000) + 1)
+            return
+        self.flush()
+    
+    def flush(self):
+        """Dibuja de inmediato los puntos pendientes."""
+        self._pending.stop()
+        if self.best_line is None:
+            return
+        self._last_frame = time.perf_counter()
+        self.best_line.set_data(self._generations, self._best)
+        self.avg_line.set_data(self._generations, self._avg)
+        
+        if self._rescale() or self._background is None:
+            # draw() vuelve a guardar el fondo y dibuja las líneas (ver _on_draw)
+            self.draw()
+            return
+        self.restore_region(self._background)
+        self._draw_lines()
+        self.blit(self.axes.bbox)
+    
+    def _rescale(self):
+        """
+        Amplía los ejes si los datos salieron de ellos, con margen para no
+        redibujar la figura completa en cada generación.
+        
+        Returns:
+            bool: True si los límites cambiaron
+        """
+        y_min, y_max = self.axes.get_ylim()
+        datos_min = min(min(self._best), min(self._avg))
+        datos_max = max(max(self._best), max(self._avg))
+        x_max = self.axes.get_xlim()[1]
+        cambio = False
+        
+        if datos_min < y_min or datos_max > y_max or len(self._best) == 1:
+            margen = max(1.0, 0.1 * (datos_max - datos_min))
+            self.axes.set_ylim(datos_min - margen, datos_max + 2 * margen)
+            cambio = True
+        if self._generations[-1] > x_max:
+            self.axes.set_xlim(0, 2 * x_max)
+            cambio = True
+        return cambio
+    
+    def _draw_lines(self):
+        self.axes.draw_artist(self.avg_line)
+        self.axes.draw_artist(self.best_line)
+    
+    def _on_draw(self, event):
+        """Guarda el fondo tras cada dibujo completo (incluido un cambio de tamaño)."""
+        if self.best_line is None:
+            return
+        self._background = self.copy_from_bbox(self.axes.bbox)
+        self._draw_lines()
+    
+    def plot_history(self, generations, best_fitness, avg_fitness):
+        """Dibuja una evolución completa (fin de la optimización o resultado en caché)."""
+        self.reset()
+        self.axes.plot(generations, best_fitness, 'b-', label='Mejor aptitud')
+        self.axes.plot(generations, avg_fitness, 'r--', label='Aptitud promedio')
+        self.axes.legend()
+        self.draw()
+
+class OptimizationWorker(QThread):
+    """Ejecuta el algoritmo genético fuera del hilo de la interfaz."""
+    
+    # generación, mejor aptitud, aptitud promedio, segundos transcurridos
+    progress = pyqtSignal(int, float, float, float)
+    finished_run = pyqtSignal(list)
+    failed = pyqtSignal(str)
+    
+    def __init__(self, ga, precio_min, precio_max, parent=None):
+        super().__init__(parent)
+        self.ga = ga
+        self.precio_min = precio_min
+        self.precio_max = precio_max
+    
+    def run(self):
+        try:
+            solutions = self.ga.run(self.precio_min, self.precio_max, callback=self._report)
+            self.finished_run.emit(solutions)
+        except Exception as e:
+            self.failed.emit(str(e))
+    
+    def _report(self, generation, best_fitness, avg_fitness, elapsed):
+        self.progress.emit(generation, float(best_fitness), float(avg_fitness), elapsed)
 
 class OptilensApp(QMainWindow):
     def __init__(self):
@@ -127,12 +287,15 @@ class OptilensApp(QMainWindow):
         # Inicializar modelos de datos
         self.data_models = DataModels('data')
         
+        # Caché persistente de resultados de optimizaciones anteriores
+        self.result_cache = ResultCache(os.path.join('data', RESULT_CACHE_DIR))
+        
         # Inicializar visualizador de resultados
         self.visualizer = ResultVisualizer()
         
         # Inicializar interfaz
         self.setup_ui()
-        
+    
     def setup_ui(self):
         # Widget central
         central_widget = QWidget()
@@ -360,6 +523,20 @@ class OptilensApp(QMainWindow):
         self.elite_spin.setSingleStep(5)
         self.elite_spin.setSuffix("%")
         
+        # Parada anticipada por falta de mejora (0 = desactivada)
+        patience_label = QLabel("Paciencia (gen. sin mejora):")
+        self.patience_spin = QSpinBox()
+        self.patience_spin.setRange(0, 1000)
+        self.patience_spin.setValue(0)
+        self.patience_spin.setSingleStep(5)
+        self.patience_spin.setSpecialValueText("Desactivada")
+        
+        # Búsqueda exacta: enumerar todo el espacio en lugar de evolucionar
+        self.exhaustive_check = QCheckBox("Búsqueda exacta")
+        self.exhaustive_check.setToolTip(
+            "Evalúa todas las configuraciones posibles si no superan "
+            f"{EXHAUSTIVE_THRESHOLD:,}; garantiza el óptimo pero no muestra la evolución")
+        
         algo_layout.addWidget(pop_label)
         algo_layout.addWidget(self.pop_spin)
         algo_layout.addWidget(gen_label)
@@ -368,6 +545,9 @@ class OptilensApp(QMainWindow):
         algo_layout.addWidget(self.mut_spin)
         algo_layout.addWidget(elite_label)
         algo_layout.addWidget(self.elite_spin)
+        algo_layout.addWidget(patience_label)
+        algo_layout.addWidget(self.patience_spin)
+        algo_layout.addWidget(self.exhaustive_check)
         
         config_layout.addWidget(algo_group)
         
@@ -383,7 +563,13 @@ class OptilensApp(QMainWindow):
         self.reset_btn.setStyleSheet("background-color: #6c757d;")
         self.reset_btn.clicked.connect(self.reset_form)
         
+        self.cancel_btn = QPushButton("Detener")
+        self.cancel_btn.setStyleSheet("background-color: #dc3545;")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel_optimization)
+        
         button_layout.addWidget(self.reset_btn)
+        button_layout.addWidget(self.cancel_btn)
         button_layout.addWidget(self.optimize_btn)
         
         config_layout.addLayout(button_layout)
@@ -487,11 +673,21 @@ class OptilensApp(QMainWindow):
         
         main_layout.addWidget(tab_widget)
         
+        # Barra de progreso de la optimización
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setTextVisible(True)
+        self.progress_bar.setFormat("Listo")
+        main_layout.addWidget(self.progress_bar)
+        
         # Almacenar referencia a las pestañas
         self.tab_widget = tab_widget
         
         # Resultados del algoritmo genético
         self.best_solutions = []
+        self.worker = None
+        self.search_space = None
     
     def update_price_range(self):
         min_val = self.min_price_spin.value()
@@ -538,6 +734,8 @@ class OptilensApp(QMainWindow):
         self.gen_spin.setValue(50)
         self.mut_spin.setValue(0.05)
         self.elite_spin.setValue(10)
+        self.patience_spin.setValue(0)
+        self.exhaustive_check.setChecked(False)
         
         # Limpiar resultados
         self.best_solutions = []
@@ -549,14 +747,17 @@ class OptilensApp(QMainWindow):
                 details.setText(f"Aquí se mostrará la información detallada de la configuración alternativa #{i}.")
         
         # Limpiar gráfica
-        self.canvas.axes.clear()
-        self.canvas.axes.set_title('Evolución de Aptitud')
-        self.canvas.axes.set_xlabel('Generaciones')
-        self.canvas.axes.set_ylabel('Aptitud')
-        self.canvas.axes.grid(True)
-        self.canvas.draw()
+        self.canvas.reset()
+        
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setFormat("Listo")
     
     def optimize_configuration(self):
+        # Evitar ejecuciones simultáneas
+        if self.worker is not None and self.worker.isRunning():
+            return
+        
         # Obtener padecimiento seleccionado
         padecimiento = self.pad_combo.currentText()
         
@@ -619,13 +820,35 @@ class OptilensApp(QMainWindow):
         generations = self.gen_spin.value()
         mutation_rate = self.mut_spin.value()
         elitism_count = int(self.elite_spin.value() * population_size / 100)
+        exhaustive_threshold = EXHAUSTIVE_THRESHOLD if self.exhaustive_check.isChecked() else None
+        
+        # Devolver el resultado guardado si ya se optimizó la misma solicitud con este catálogo
+        params = normalize_params({
+            'padecimiento': padecimiento,
+            'restricciones': restricciones,
+            'precio_min': precio_min,
+            'precio_max': precio_max,
+            'population_size': population_size,
+            'generations': generations,
+            'crossover_rate': 0.8,
+            'mutation_rate': mutation_rate,
+            'elitism_count': elitism_count,
+            'patience': self.patience_spin.value() or None,
+            'exhaustive_threshold': exhaustive_threshold
+        })
+        cache_key = self.result_cache.make_key(params, self.data_models.get_catalog().content_hash())
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            self.show_cached_result(cached)
+            return
         
         # Crear evaluador de aptitud
         evaluator = FitnessEvaluator(
             self.data_models, 
             padecimiento, 
             restricciones, 
-            (precio_min, precio_max)
+            (precio_min, precio_max),
+            cache_size=20000
         )
         
         # Crear algoritmo genético
@@ -636,43 +859,126 @@ class OptilensApp(QMainWindow):
             generations,
             0.8,  # crossover_rate
             mutation_rate,
-            elitism_count
+            elitism_count,
+            compact_genome=True,
+            patience=self.patience_spin.value() or None,
+            exhaustive_threshold=exhaustive_threshold
         )
+        ga.catalog = GenomeCatalog(self.data_models)
+        
+        # La búsqueda exacta solo se aplica si el espacio no supera el umbral
+        self.search_space = None
+        if exhaustive_threshold is not None:
+            space = ExhaustiveSolver(self.data_models, evaluator, ga.catalog).space_size()
+            if space <= exhaustive_threshold:
+                self.search_space = space
+        
+        # Preparar la interfaz para el progreso en vivo
+        self.canvas.start_live(generations)
+        if self.search_space is not None:
+            # Sin progreso por generación: barra indeterminada hasta terminar
+            self.progress_bar.setRange(0, 0)
+            self.progress_bar.setFormat(f"Búsqueda exacta: enumerando {self.search_space:,} configuraciones...")
+        else:
+            self.progress_bar.setRange(0, generations)
+            self.progress_bar.setValue(0)
+            self.progress_bar.setFormat("Generación %v de %m")
+        self.optimize_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        self.tab_widget.setCurrentIndex(1)
+        
+        # Ejecutar el algoritmo en un hilo de trabajo
+        self.worker = OptimizationWorker(ga, precio_min, precio_max, self)
+        self.worker.progress.connect(self.on_generation_progress)
+        self.worker.finished_run.connect(
+            lambda solutions: self.on_optimization_finished(ga, solutions, cache_key, params))
+        self.worker.failed.connect(self.on_optimization_failed)
+        self.worker.start()
+    
+    def on_generation_progress(self, generation, best_fitness, avg_fitness, elapsed):
+        """Actualiza la barra de progreso y la gráfica con los datos de una generación."""
+        if self.search_space is None:
+            self.progress_bar.setValue(generation)
+            self.progress_bar.setFormat(f"Generación %v de %m - Mejor: {best_fitness:.2f} - {elapsed:.1f} s")
+        
+        # Solo agrega el punto; el lienzo limita la frecuencia de dibujo
+        self.canvas.append(generation, best_fitness, avg_fitness)
+    
+    def cancel_optimization(self):
+        """Solicita al algoritmo en ejecución que se detenga tras la generación actual."""
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.ga.cancel()
+            self.cancel_btn.setEnabled(False)
+            self.progress_bar.setFormat("Deteniendo...")
+    
+    def on_optimization_finished(self, ga, solutions, cache_key=None, params=None):
+        """Muestra los resultados cuando el hilo de trabajo termina."""
+        self.optimize_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+        self.best_solutions = solutions
+        
+        # Guardar el resultado para solicitudes idénticas (salvo si se canceló)
+        if cache_key is not None and ga.stop_reason != 'cancelled':
+            self.result_cache.put(cache_key, result_from_ga(ga, params, solutions))
+        
+        # Obtener estadísticas de evolución y actualizar gráfica
+        generations, best_fitness, avg_fitness = ga.get_evolution_stats()
+        self.plot_fitness(generations, best_fitness, avg_fitness)
+        
+        # Mostrar resultados
+        self.display_results()
+        
+        motivos = {
+            'generations': "se completaron todas las generaciones",
+            'patience': "la mejor aptitud dejó de mejorar",
+            'target_fitness': "se alcanzó la aptitud objetivo",
+            'max_time': "se alcanzó el tiempo máximo",
+            'cancelled': "la ejecución fue detenida por el usuario"
+        }
+        if ga.stop_reason == 'exhaustive':
+            total = f"{self.search_space:,}" if self.search_space is not None else "todas las"
+            self.progress_bar.setRange(0, 1)
+            self.progress_bar.setValue(1)
+            self.progress_bar.setFormat(f"Búsqueda exacta completada: {total} configuraciones evaluadas")
+            QMessageBox.information(self, "Búsqueda Exacta Completada", 
+                                  f"Se evaluaron {total} configuraciones posibles "
+                                  f"({ga.elapsed_time:.1f} s). Se encontraron las configuraciones óptimas.")
+            return
         
-        try:
-            # Ejecutar algoritmo genético
-            QMessageBox.information(self, "Optimización en Progreso", 
-                                  "El algoritmo genético está buscando las mejores configuraciones. Esto puede tomar unos momentos.")
-            
-            # Ejecutar el algoritmo
-            self.best_solutions = ga.run(precio_min, precio_max)
-            
-            # Obtener estadísticas de evolución
-            generations, best_fitness, avg_fitness = ga.get_evolution_stats()
-            
-            # Actualizar gráfica
-            self.canvas.axes.clear()
-            self.canvas.axes.plot(generations, best_fitness, 'b-', label='Mejor aptitud')
-            self.canvas.axes.plot(generations, avg_fitness, 'r--', label='Aptitud promedio')
-            self.canvas.axes.set_title('Evolución de Aptitud')
-            self.canvas.axes.set_xlabel('Generaciones')
-            self.canvas.axes.set_ylabel('Aptitud')
-            self.canvas.axes.legend()
-            self.canvas.axes.grid(True)
-            self.canvas.draw()
-            
-            # Mostrar resultados
-            self.display_results()
-            
-            # Cambiar a la pestaña de resultados
-            self.tab_widget.setCurrentIndex(1)
-            
-            QMessageBox.information(self, "Optimización Completada", 
-                                  "El algoritmo genético ha completado la optimización. Se encontraron las configuraciones óptimas.")
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Error en la Optimización", 
-                               f"Ocurrió un error durante la optimización: {str(e)}")
+        motivo = motivos.get(ga.stop_reason, "")
+        self.progress_bar.setFormat(f"Optimización completada en {ga.current_generation} generaciones")
+        
+        QMessageBox.information(self, "Optimización Completada", 
+                              "El algoritmo genético ha completado la optimización "
+                              f"({motivo}, {ga.elapsed_time:.1f} s). Se encontraron las configuraciones óptimas.")
+    
+    def show_cached_result(self, result):
+        """Muestra un resultado recuperado de la caché sin volver a optimizar."""
+        self.best_solutions = solutions_from_result(result, GenomeCatalog(self.data_models))
+        
+        best_fitness = result['best_fitness_history']
+        self.plot_fitness(list(range(len(best_fitness))), best_fitness, result['avg_fitness_history'])
+        self.display_results()
+        
+        self.progress_bar.setRange(0, max(1, result['generations']))
+        self.progress_bar.setValue(max(1, result['generations']))
+        if result.get('stop_reason') == 'exhaustive':
+            self.progress_bar.setFormat("Resultado recuperado de la caché (búsqueda exacta)")
+        else:
+            self.progress_bar.setFormat(f"Resultado recuperado de la caché ({result['generations']} generaciones)")
+        self.tab_widget.setCurrentIndex(1)
+    
+    def on_optimization_failed(self, message):
+        """Informa un error ocurrido en el hilo de trabajo."""
+        self.optimize_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+        self.progress_bar.setFormat("Error en la optimización")
+        QMessageBox.critical(self, "Error en la Optimización", 
+                           f"Ocurrió un error durante la optimización: {message}")
+    
+    def plot_fitness(self, generations, best_fitness, avg_fitness):
+        """Dibuja la evolución de la aptitud en la gráfica de resultados."""
+        self.canvas.plot_history(generations, best_fitness, avg_fitness)
     
     def display_results(self):
         """Muestra los resultados del algoritmo genético en la interfaz."""
@@ -740,12 +1046,13 @@ class OptilensApp(QMainWindow):
                 data.append(row)
             
             # Crear DataFrame y exportar a CSV
+            import pandas as pd
             df = pd.DataFrame(data)
             df.to_csv(file_path, index=False)
             
             QMessageBox.information(self, "Exportación Exitosa", 
                                   f"Los resultados se han exportado correctamente a:\n{file_path}")
-            
+        
         except Exception as e:
             QMessageBox.critical(self, "Error de Exportación", 
                                f"Ocurrió un error al exportar los resultados: {str(e)}")
@@ -919,7 +1226,7 @@ class OptilensApp(QMainWindow):
             
             # Mostrar ventana
             comparison_window.show()
-            
+        
         except Exception as e:
             QMessageBox.critical(self, "Error en Comparación", 
                                f"Ocurrió un error al generar la comparación: {str(e)}")
@@ -0,0 +1,235 @@
+import os
+import json
+import traceback
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from models import DataModels, GenomeCatalog
+from evaluator import FitnessCache
+from optilens import normalize_params, build_evaluator, optimize
+
+class Workspace:
+    """
+    Recursos compartidos por todas las optimizaciones de un proceso: los datos y
+    el catálogo de genomas se cargan una sola vez, los evaluadores (con sus tablas
+    de puntuación) se reutilizan entre solicitudes con los mismos parámetros y todos
+    comparten una caché de aptitud.
+    """
+    def __init__(self, data_dir='data', cache_size=200000, max_evaluators=64, result_cache=None):
+        """
+        Carga los datos del proceso.
+        
+        Args:
+            data_dir (str): Directorio con los CSV
+            cache_size (int): Tamaño de la caché de aptitud compartida
+            max_evaluators (int): Número máximo de evaluadores conservados
+            result_cache (ResultCache): Caché persistente de resultados completos
+        """
+        self.data_models = DataModels(data_dir)
+        self.catalog = GenomeCatalog(self.data_models)
+        self.cache = FitnessCache(cache_size) if cache_size else None
+        self.max_evaluators = max_evaluators
+        self.result_cache = result_cache
+        self._evaluators = OrderedDict()
+    
+    def evaluator(self, params):
+        """
+        Devuelve el evaluador para unos parámetros normalizados, construyéndolo
+        solo si no hay uno reciente con el mismo padecimiento, restricciones y precios.
+        """
+        key = (params['padecimiento'], tuple(params['restricciones']),
+               params['precio_min'], params['precio_max'])
+        evaluator = self._evaluators.get(key)
+        if evaluator is None:
+            evaluator = build_evaluator(self.data_models, params, cache=self.cache)
+            self._evaluators[key] = evaluator
+            if len(self._evaluators) > self.max_evaluators:
+                self._evaluators.popitem(last=False)
+        else:
+            self._evaluators.move_to_end(key)
+        return evaluator
+    
+    def run(self, index, request):
+        """
+        Optimiza una solicitud sin propagar sus errores.
+        
+        Args:
+            index (int): Posición de la solicitud en la entrada
+            request (dict): Parámetros de la solicitud
+        
+        Returns:
+            dict: Resultado de optimize() o {'error': mensaje}, con 'index' (y 'id' si la solicitud lo tenía)
+        """
+        extra = {'index': index}
+        if isinstance(request, dict) and 'id' in request:
+            extra['id'] = request['id']
+        if isinstance(request, dict) and 'error' in request and 'padecimiento' not in request:
+            return {**extra, 'error': request['error']}
+        try:
+            params = normalize_params({k: v for k, v in request.items() if k != 'id'})
+            params['n_workers'] = None  # Sin pools anidados dentro de un trabajador
+            result = optimize(self.data_models, params, evaluator=self.evaluator(params),
+                              catalog=self.catalog, cache=self.result_cache)
+        except (ValueError, TypeError, AttributeError) as e:
+            return {**extra, 'error': str(e)}
+        except Exception:
+            return {**extra, 'error': traceback.format_exc()}
+        return {**extra, **result}
+
+# Recursos del proceso trabajador (se cargan una sola vez al iniciar)
+_worker_workspace = None
+
+def _init_worker(data_dir, cache_size, result_cache=None):
+    """
+    Inicializa un proceso trabajador cargando los datos una sola vez.
+    
+    Args:
+        data_dir (str): Directorio con los CSV
+        cache_size (int): Tamaño de la caché de aptitud del trabajador
+        result_cache (ResultCache): Caché persistente de resultados
+    """
+    global _worker_workspace
+    _worker_workspace = Workspace(data_dir, cache_size, result_cache=result_cache)
+
+def _run_request(index, request):
+    """Optimiza una solicitud en el proceso trabajador."""
+    return _worker_workspace.run(index, request)
+
+class BatchOptimizer:
+    """
+    Optimización por lotes de muchas solicitudes que comparten un catálogo.
+    Cada trabajador del pool carga los datos una vez y reutiliza los evaluadores;
+    los resultados se devuelven en el orden de entrada o a medida que terminan.
+    """
+    def __init__(self, data_dir='data', n_workers=None, defaults=None, seed=None, cache_size=200000,
+                 result_cache=None):
+        """
+        Inicializa el optimizador por lotes.
+        
+        Args:
+            data_dir (str): Directorio con los CSV
+            n_workers (int): Número de procesos (por defecto, número de CPUs; 1 para
+                ejecutar en el proceso actual)
+            defaults (dict): Parámetros aplicados a todas las solicitudes (cada solicitud
+                puede sobrescribirlos)
+            seed (int): Semilla base; las solicitudes sin semilla usan seed + índice,
+                de modo que el resultado no depende del reparto entre trabajadores
+            cache_size (int): Tamaño de la caché de aptitud de cada trabajador
+            result_cache (ResultCache): Caché persistente de resultados (compartida
+                entre trabajadores a través del disco)
+        """
+        self.data_dir = data_dir
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.defaults = dict(defaults or {})
+        self.seed = seed
+        self.cache_size = cache_size
+        self.result_cache = result_cache
+        self._executor = None
+        self._workspace = None
+    
+    def _prepare(self, index, request):
+        """Combina una solicitud con los parámetros por defecto del lote."""
+        if not isinstance(request, dict):
+            return request
+        request = {**self.defaults, **request}
+        if request.get('seed') is None and self.seed is not None:
+            request['seed'] = self.seed + index
+        return request
+    
+    def run(self, requests, ordered=True):
+        """
+        Optimiza todas las solicitudes y entrega los resultados a medida que están listos.
+        Las solicitudes se consumen de forma perezosa, por lo que pueden provenir
+        de un flujo JSONL de cualquier tamaño.
+        
+        Args:
+            requests (iterable): Diccionarios con padecimiento, restricciones,
+                precio_min, precio_max y, opcionalmente, parámetros del algoritmo e 'id'
+            ordered (bool): Si es True, los resultados salen en el orden de entrada;
+                si es False, en el orden en que terminan
+        
+        Yields:
+            dict: Resultado de cada solicitud (ver Workspace.run)
+        """
+        requests = ((i, self._prepare(i, request)) for i, request in enumerate(requests))
+        
+        if self.n_workers <= 1:
+            if self._workspace is None:
+                self._workspace = Workspace(self.data_dir, self.cache_size, result_cache=self.result_cache)
+            for index, request in requests:
+                yield self._workspace.run(index, request)
+            return
+        
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.n_workers,
+                initializer=_init_worker,
+                initargs=(self.data_dir, self.cache_size, self.result_cache)
+            )
+        
+        # Mantener un número acotado de solicitudes en vuelo
+        max_pending = self.n_workers * 2
+        pending = deque()
+        for index, request in requests:
+            pending.append(self._executor.submit(_run_request, index, request))
+            if len(pending) >= max_pending:
+                yield from self._drain(pending, ordered, max_pending - 1)
+        yield from self._drain(pending, ordered, 0)
+    
+    @staticmethod
+    def _drain(pending, ordered, keep):
+        """Entrega resultados hasta que queden como mucho keep solicitudes pendientes."""
+        while len(pending) > keep:
+            if ordered:
+                yield pending.popleft().result()
+                continue
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.remove(future)
+                yield future.result()
+    
+    def shutdown(self):
+        """Libera el pool de procesos."""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.shutdown()
+
+def read_requests(stream):
+    """
+    Lee solicitudes de un flujo JSONL (una por línea) o de un arreglo JSON.
+    
+    Args:
+        stream (file): Flujo de entrada
+    
+    Yields:
+        dict: Solicitud; las líneas (o el arreglo) que no son JSON válido y los
+            elementos que no son objetos se entregan como {'error': mensaje}
+            para que el lote continúe
+    """
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        if line.lstrip().startswith('['):
+            try:
+                requests = json.loads(line + stream.read())
+            except json.JSONDecodeError as e:
+                yield {'error': f"JSON inválido: {e}"}
+                return
+            for position, request in enumerate(requests, 1):
+                yield _as_request(request, f"el elemento {position}")
+            return
+        try:
+            yield _as_request(json.loads(line), f"la línea {number}")
+        except json.JSONDecodeError as e:
+            yield {'error': f"JSON inválido en la línea {number}: {e}"}
+
+def _as_request(value, where):
+    """Devuelve la solicitud si es un objeto JSON, o un registro de error si no lo es."""
+    if isinstance(value, dict):
+        return value
+    return {'error': f"Solicitud no válida en {where}: se esperaba un objeto JSON"}
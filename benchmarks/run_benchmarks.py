@@ -0,0 +1,233 @@
+"""
+Suite de rendimiento de OptiLens sobre catálogos sintéticos de distintos tamaños.
+
+Para cada tamaño se genera un catálogo (ver synthetic_catalog) y, en un proceso
+nuevo para que la memoria pico sea independiente, se mide:
+    - carga de datos (CSV y desde la instantánea binaria)
+    - construcción del evaluador
+    - evaluate_population (evaluaciones/s, sin caché de aptitud)
+    - crossover y mutate (operaciones/s, con tasas de 1.0)
+    - GeneticAlgorithm.run (generaciones/s y evaluaciones/s, configuración de la interfaz)
+    - memoria pico (RSS del proceso y asignaciones de Python con tracemalloc)
+
+Uso:
+    python -m benchmarks.run_benchmarks --sizes 15 1000 10000 --output benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --compare benchmarks/baseline.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+DEFAULT_SIZES = (15, 1000, 10000)
+PADECIMIENTO = 'Miopía'
+PRECIO_MIN, PRECIO_MAX = 200, 800
+
+def _best_time(func, repeat):
+    """Menor tiempo de repeat ejecuciones de func (segundos)."""
+    mejor = float('inf')
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        func()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+def _peak_rss_mb():
+    """Memoria residente pico del proceso en MB (None si la plataforma no la expone)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    return round(pico / (1024 * 1024 if sys.platform == 'darwin' else 1024), 2)
+
+def bench_size(rows, population_size=100, generations=50, repeat=5, operations=2000, seed=0):
+    """
+    Mide todas las operaciones sobre un catálogo sintético de rows filas por tabla.
+    
+    Returns:
+        dict: Métricas (tiempos en segundos terminados en _s, tasas terminadas en _per_s
+            y memoria en MB terminada en _mb)
+    """
+    from benchmarks.synthetic_catalog import generate_catalog
+    from models import DataModels
+    from evaluator import FitnessEvaluator
+    from genetic_algorithm import GeneticAlgorithm
+    
+    restricciones = {'light_sensitivity': True, 'screen_time': True,
+                     'outdoor_activities': False, 'night_driving': False}
+    metrics = {'rows': rows, 'population_size': population_size, 'generations': generations}
+    
+    with tempfile.TemporaryDirectory() as data_dir:
+        generate_catalog(data_dir, rows, seed=seed)
+        random.seed(seed)
+        np.random.seed(seed)
+        
+        # Carga de datos: la primera lee los CSV y escribe la instantánea
+        inicio = time.perf_counter()
+        DataModels(data_dir)
+        metrics['load_csv_s'] = time.perf_counter() - inicio
+        metrics['load_snapshot_s'] = _best_time(lambda: DataModels(data_dir), repeat)
+        data_models = DataModels(data_dir)
+        
+        inicio = time.perf_counter()
+        evaluator = FitnessEvaluator(data_models, PADECIMIENTO, restricciones, (PRECIO_MIN, PRECIO_MAX))
+        metrics['evaluator_build_s'] = time.perf_counter() - inicio
+        
+        # evaluate_population sin caché: coste real de la función de aptitud
+        ga = GeneticAlgorithm(data_models, evaluator, population_size, generations, 1.0, 1.0, 10,
+                              compact_genome=True)
+        inicio = time.perf_counter()
+        ga.initialize_population(PRECIO_MIN, PRECIO_MAX)
+        metrics['initialize_population_s'] = time.perf_counter() - inicio
+        tiempo = _best_time(ga.evaluate_population, repeat)
+        metrics['evaluate_population_s'] = tiempo
+        metrics['evaluations_per_s'] = population_size / tiempo
+        
+        # Operadores genéticos con tasas de 1.0 para medir siempre el operador completo
+        poblacion = ga.population
+        pares = [(random.choice(poblacion), random.choice(poblacion)) for _ in range(operations)]
+        tiempo = _best_time(lambda: [ga.crossover(a, b) for a, b in pares], repeat)
+        metrics['crossover_per_s'] = operations / tiempo
+        individuos = [random.choice(poblacion) for _ in range(operations)]
+        tiempo = _best_time(lambda: [ga.mutate(ga._copy_individual(i)) for i in individuos], repeat)
+        metrics['mutate_per_s'] = operations / tiempo
+        
+        # Ejecución completa con la configuración de la interfaz gráfica
+        evaluator = FitnessEvaluator(data_models, PADECIMIENTO, restricciones, (PRECIO_MIN, PRECIO_MAX),
+                                     cache_size=20000)
+        ga = GeneticAlgorithm(data_models, evaluator, population_size, generations, 0.8, 0.05, 10,
+                              compact_genome=True)
+        inicio = time.perf_counter()
+        ga.run(PRECIO_MIN, PRECIO_MAX)
+        tiempo = time.perf_counter() - inicio
+        metrics['run_s'] = tiempo
+        metrics['generations_per_s'] = ga.current_generation / tiempo
+        metrics['run_evaluations_per_s'] = population_size * (ga.current_generation + 1) / tiempo
+        metrics['best_fitness'] = ga.get_top_n(1)[0].fitness if ga.population else None
+        
+        # Memoria: pasada aparte para que tracemalloc no afecte los tiempos
+        tracemalloc.start()
+        data_models = DataModels(data_dir, use_snapshot=False)
+        evaluator = FitnessEvaluator(data_models, PADECIMIENTO, restricciones, (PRECIO_MIN, PRECIO_MAX),
+                                     cache_size=20000)
+        GeneticAlgorithm(data_models, evaluator, population_size, generations, 0.8, 0.05, 10,
+                         compact_genome=True).run(PRECIO_MIN, PRECIO_MAX)
+        metrics['peak_traced_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        tracemalloc.stop()
+        metrics['peak_rss_mb'] = _peak_rss_mb()
+    
+    return metrics
+
+def _run_isolated(rows, args):
+    """Ejecuta bench_size en un proceso nuevo y devuelve sus métricas."""
+    comando = [sys.executable, '-m', 'benchmarks.run_benchmarks', '--single', str(rows),
+               '--population-size', str(args.population_size), '--generations', str(args.generations),
+               '--repeat', str(args.repeat), '--operations', str(args.operations), '--seed', str(args.seed)]
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    salida = subprocess.run(comando, capture_output=True, text=True, check=True, cwd=raiz)
+    return json.loads(salida.stdout)
+
+def compare(current, baseline, tolerance):
+    """
+    Compara las métricas actuales con una línea base.
+    
+    Args:
+        current (dict): Resultados actuales
+        baseline (dict): Resultados de referencia
+        tolerance (float): Empeoramiento relativo admitido (0.2 = 20 %)
+    
+    Returns:
+        list: Regresiones como (tamaño, métrica, referencia, actual)
+    """
+    regresiones = []
+    for rows, metrics in current['results'].items():
+        referencia = baseline.get('results', {}).get(rows)
+        if not referencia:
+            continue
+        for nombre, valor in metrics.items():
+            anterior = referencia.get(nombre)
+            if not isinstance(valor, (int, float)) or not isinstance(anterior, (int, float)) or not anterior:
+                continue
+            if nombre.endswith('_per_s'):
+                empeoro = valor < anterior / (1 + tolerance)
+            elif nombre.endswith('_s') or nombre.endswith('_mb'):
+                empeoro = valor > anterior * (1 + tolerance)
+            else:
+                continue
+            if empeoro:
+                regresiones.append((rows, nombre, anterior, valor))
+    return regresiones
+
+def _report(results):
+    """Imprime un resumen legible de los resultados."""
+    columnas = ('load_csv_s', 'load_snapshot_s', 'evaluations_per_s', 'crossover_per_s',
+                'mutate_per_s', 'generations_per_s', 'peak_rss_mb')
+    print('filas'.rjust(8) + ''.join(c.rjust(20) for c in columnas))
+    for rows, metrics in results['results'].items():
+        valores = [metrics.get(c) for c in columnas]
+        print(str(rows).rjust(8) + ''.join(
+            ('-' if v is None else f'{v:.4g}').rjust(20) for v in valores))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Suite de rendimiento de OptiLens')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help='Filas por tabla de cada catálogo sintético (15 a 100000)')
+    parser.add_argument('--population-size', type=int, default=100)
+    parser.add_argument('--generations', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5, help='Repeticiones de cada medición (se toma la mejor)')
+    parser.add_argument('--operations', type=int, default=2000, help='Cruces y mutaciones por medición')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', '-o', help='Archivo JSON donde guardar los resultados')
+    parser.add_argument('--compare', help='Línea base JSON contra la que detectar regresiones')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Empeoramiento relativo admitido')
+    parser.add_argument('--single', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    
+    if args.single is not None:
+        metrics = bench_size(args.single, args.population_size, args.generations, args.repeat,
+                             args.operations, args.seed)
+        json.dump(metrics, sys.stdout)
+        return 0
+    
+    results = {
+        'meta': {
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'population_size': args.population_size,
+            'generations': args.generations,
+            'seed': args.seed
+        },
+        'results': {}
+    }
+    for rows in args.sizes:
+        print(f'Midiendo catálogo de {rows} filas...', file=sys.stderr)
+        results['results'][str(rows)] = _run_isolated(rows, args)
+    
+    _report(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regresiones = compare(results, baseline, args.tolerance)
+        for rows, nombre, anterior, valor in regresiones:
+            print(f'Regresión en {rows} filas: {nombre} {anterior:.4g} -> {valor:.4g}', file=sys.stderr)
+        return 1 if regresiones else 0
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,151 @@
+"""
+Generador de catálogos sintéticos con el mismo esquema que los CSV de data/.
+
+Cada columna se muestrea de los valores reales de la plantilla: las categóricas
+conservan su vocabulario (tipos, materiales, niveles, disponibilidad...) y las
+numéricas se perturban alrededor de los valores reales con sus mismos decimales.
+Los identificadores son consecutivos y los primeros padecimientos conservan su
+nombre real, de modo que las solicitudes habituales (por ejemplo, Miopía) siguen
+siendo válidas a cualquier tamaño.
+
+Uso:
+    python -m benchmarks.synthetic_catalog salida/ --rows 10000 --seed 0
+"""
+import argparse
+import csv
+import os
+import re
+import numpy as np
+
+ARCHIVOS = ('padecimientos', 'monturas', 'lentes', 'capas', 'filtros')
+
+_NUMERO = re.compile(r'^-?\d+(\.(\d+))?$')
+_PORCENTAJE = re.compile(r'^(\d+)%$')
+
+def _read_template(path):
+    """Lee un CSV de plantilla como (columnas, filas)."""
+    with open(path, encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        columns = next(reader)
+        rows = [row for row in reader if row]
+    return columns, rows
+
+def _decimals(values):
+    """Número de decimales de una columna numérica (None si no es numérica)."""
+    decimales = 0
+    for value in values:
+        match = _NUMERO.match(value.strip())
+        if not match:
+            return None
+        decimales = max(decimales, len(match.group(2) or ''))
+    return decimales
+
+def _synthetic_column(values, rows, rng, spread):
+    """
+    Genera una columna sintética a partir de los valores de la plantilla.
+    
+    Args:
+        values (list): Valores reales de la columna
+        rows (int): Número de filas a generar
+        rng (Generator): Generador aleatorio
+        spread (float): Perturbación relativa máxima de las columnas numéricas
+    
+    Returns:
+        list: Valores como texto
+    """
+    muestra = rng.choice(np.array(values, dtype=object), size=rows)
+    decimales = _decimals(values)
+    if decimales is not None:
+        numeros = muestra.astype(float) * rng.uniform(1 - spread, 1 + spread, size=rows)
+        return [f'{v:.{decimales}f}' for v in numeros]
+    if all(_PORCENTAJE.match(v.strip()) for v in values):
+        porcentajes = np.array([int(v.strip()[:-1]) for v in muestra])
+        porcentajes = np.clip(np.rint(porcentajes * rng.uniform(1 - spread, 1 + spread, size=rows)), 0, 100)
+        return [f'{int(v)}%' for v in porcentajes]
+    return list(muestra)
+
+def generate_table(columns, template_rows, rows, rng, spread=0.15):
+    """
+    Genera las filas sintéticas de una tabla.
+    
+    Args:
+        columns (list): Columnas de la tabla (la primera es el identificador)
+        template_rows (list): Filas reales de la plantilla
+        rows (int): Número de filas a generar
+        rng (Generator): Generador aleatorio
+        spread (float): Perturbación relativa máxima de las columnas numéricas
+    
+    Returns:
+        list: Filas como listas de texto
+    """
+    prefijo = re.match(r'^\D*', template_rows[0][0]).group(0)
+    ancho = max(3, len(str(rows)))
+    data = [[f'{prefijo}{i:0{ancho}d}' for i in range(1, rows + 1)]]
+    for j in range(1, len(columns)):
+        data.append(_synthetic_column([row[j] for row in template_rows], rows, rng, spread))
+    return [list(row) for row in zip(*data)]
+
+def generate_padecimientos(columns, template_rows, rows):
+    """
+    Genera los padecimientos: se recorren los reales en orden y, a partir de la
+    segunda vuelta, se agrega un sufijo numérico al nombre para que sea único.
+    """
+    ancho = max(3, len(str(rows)))
+    nombre = columns.index('nombre_padecimiento')
+    result = []
+    for i in range(rows):
+        row = list(template_rows[i % len(template_rows)])
+        row[0] = f'P{i + 1:0{ancho}d}'
+        if i >= len(template_rows):
+            row[nombre] = f'{row[nombre]} {i // len(template_rows) + 1}'
+        result.append(row)
+    return result
+
+def generate_catalog(output_dir, rows, seed=0, template_dir='data', spread=0.15):
+    """
+    Escribe un catálogo sintético completo (los cinco CSV).
+    
+    Args:
+        output_dir (str): Directorio de salida (se crea si no existe)
+        rows (int | dict): Filas por tabla, o un diccionario archivo -> filas
+        seed (int): Semilla del generador
+        template_dir (str): Directorio con los CSV reales usados como plantilla
+        spread (float): Perturbación relativa máxima de las columnas numéricas
+    
+    Returns:
+        dict: Archivo -> número de filas escritas
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    tamanios = rows if isinstance(rows, dict) else {nombre: rows for nombre in ARCHIVOS}
+    
+    escritas = {}
+    for nombre in ARCHIVOS:
+        columns, template_rows = _read_template(os.path.join(template_dir, f'{nombre}.csv'))
+        n = tamanios.get(nombre, len(template_rows))
+        if nombre == 'padecimientos':
+            data = generate_padecimientos(columns, template_rows, n)
+        else:
+            data = generate_table(columns, template_rows, n, rng, spread)
+        with open(os.path.join(output_dir, f'{nombre}.csv'), 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            writer.writerows(data)
+        escritas[nombre] = n
+    return escritas
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Genera un catálogo sintético de OptiLens')
+    parser.add_argument('output_dir')
+    parser.add_argument('--rows', type=int, default=1000, help='Filas por tabla')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--template-dir', default='data')
+    args = parser.parse_args(argv)
+    
+    escritas = generate_catalog(args.output_dir, args.rows, args.seed, args.template_dir)
+    for nombre, n in escritas.items():
+        print(f'{nombre}: {n} filas')
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,340 @@
+import heapq
+import itertools
+import time
+from models import CompactIndividual, GenomeCatalog
+from evaluator import _puntuacion_precio
+
+class BranchAndBoundSolver:
+    """
+    Optimizador exacto por ramificación y acotamiento.
+    Aprovecha que la aptitud es una suma ponderada de términos acotables por
+    componente (compatibilidad, calidad promedio, precio y restricciones) para
+    calcular cotas optimistas de configuraciones parciales y podar las ramas que
+    no pueden superar a las mejores encontradas.
+    """
+    def __init__(self, data_models, evaluator, catalog=None, max_capas=3, max_filtros=2):
+        """
+        Inicializa el solucionador.
+        
+        Args:
+            data_models (DataModels): Instancia con acceso a los datos
+            evaluator (FitnessEvaluator): Evaluador de aptitud (se usan sus tablas)
+            catalog (GenomeCatalog): Catálogo compartido (se construye si no se indica)
+            max_capas (int): Número máximo de capas por configuración
+            max_filtros (int): Número máximo de filtros por configuración
+        """
+        self.evaluator = evaluator
+        self.tables = evaluator.tables
+        self.catalog = catalog or GenomeCatalog(data_models)
+        self.max_capas = max_capas
+        self.max_filtros = max_filtros
+        self.optimal = False
+        self.nodes_explored = 0
+        self.nodes_pruned = 0
+    
+    def solve(self, top_k=5, time_limit=None):
+        """
+        Busca las mejores configuraciones.
+        Si se agota el tiempo, devuelve las mejores encontradas hasta el momento
+        y self.optimal queda en False.
+        
+        Args:
+            top_k (int): Número de configuraciones a devolver
+            time_limit (float): Tiempo máximo de búsqueda en segundos
+        
+        Returns:
+            list: Mejores individuos compactos ordenados por aptitud
+        """
+        self.optimal = False
+        self.nodes_explored = 0
+        self.nodes_pruned = 0
+        if not self.evaluator.padecimiento_data or top_k <= 0:
+            return []
+        
+        self._prepare()
+        self._top_k = top_k
+        self._heap = []
+        self._counter = itertools.count()
+        self._deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        self._timed_out = False
+        
+        try:
+            self._search()
+            self.optimal = True
+        except _SearchTimeout:
+            self.optimal = False
+        
+        results = sorted(self._heap, key=lambda item: (-item[0], -item[1]))
+        solutions = []
+        for fitness, _, (montura_idx, lente_idx, capas_idx, filtros_idx) in results:
+            individual = CompactIndividual(self.catalog, montura_idx, lente_idx, capas_idx, filtros_idx)
+            individual.fitness = fitness
+            solutions.append(individual)
+        return solutions
+    
+    def _prepare(self):
+        """Ordena los candidatos y precalcula las cotas por sufijo."""
+        t = self.tables._scalar
+        catalog = self.catalog
+        
+        self._monturas = catalog.available_indices('monturas') or [-1]
+        self._lentes = catalog.available_indices('lentes') or [-1]
+        
+        # Capas y filtros más prometedores primero para encontrar buenas soluciones pronto
+        capas = sorted(catalog.available_indices('capas'),
+                       key=lambda i: (-t['capa_compat'][i], -t['capa_calidad'][i], catalog.precio_capa[i], i))
+        filtros = sorted(catalog.available_indices('filtros'),
+                         key=lambda i: (-t['filtro_compat'][i], -t['filtro_calidad'][i], catalog.precio_filtro[i], i))
+        self._capas = capas
+        self._filtros = filtros
+        
+        self._capa_compat_suf = self._suffix_any([t['capa_compat'][i] for i in capas])
+        self._capa_calidad_suf = self._suffix_max([t['capa_calidad'][i] for i in capas])
+        self._capa_foto_suf = self._suffix_any([t['capa_fotocromatica'][i] for i in capas])
+        self._capa_ar_suf = self._suffix_any([t['capa_antirreflejante'][i] for i in capas])
+        
+        self._filtro_compat_suf = self._suffix_any([t['filtro_compat'][i] for i in filtros])
+        self._filtro_calidad_suf = self._suffix_max([t['filtro_calidad'][i] for i in filtros])
+        self._filtro_luz_suf = self._suffix_any([t['filtro_luz'][i] for i in filtros])
+        self._filtro_azul_suf = self._suffix_any([t['filtro_azul'][i] for i in filtros])
+        self._filtro_hd_suf = self._suffix_any([t['filtro_alta_definicion'][i] for i in filtros])
+        
+        restricciones = self.tables.restricciones or {}
+        self._r_luz = bool(restricciones.get('light_sensitivity', False))
+        self._r_pantalla = bool(restricciones.get('screen_time', False))
+        self._r_exterior = bool(restricciones.get('outdoor_activities', False))
+        self._r_noche = bool(restricciones.get('night_driving', False))
+    
+    @staticmethod
+    def _suffix_any(values):
+        result = [False] * (len(values) + 1)
+        for i in range(len(values) - 1, -1, -1):
+            result[i] = result[i + 1] or bool(values[i])
+        return result
+    
+    @staticmethod
+    def _suffix_max(values):
+        result = [0.0] * (len(values) + 1)
+        for i in range(len(values) - 1, -1, -1):
+            result[i] = max(result[i + 1], values[i])
+        return result
+    
+    def _threshold(self):
+        """Aptitud mínima que debe superar una rama para no ser podada."""
+        if len(self._heap) < self._top_k:
+            return float('-inf')
+        return self._heap[0][0]
+    
+    def _tick(self):
+        self.nodes_explored += 1
+        if self._deadline is not None and self.nodes_explored % 256 == 0:
+            if time.perf_counter() > self._deadline:
+                raise _SearchTimeout()
+    
+    def _search(self):
+        t = self.tables._scalar
+        catalog = self.catalog
+        
+        # Ordenar los pares montura-lente por su cota optimista
+        pairs = []
+        for montura_idx in self._monturas:
+            for lente_idx in self._lentes:
+                state = _State()
+                if montura_idx >= 0:
+                    state.compat += t['montura_compat'][montura_idx]
+                    state.calidad += t['montura_material'][montura_idx] + t['montura_resistencia'][montura_idx]
+                    state.componentes += 1
+                    state.precio += catalog.precio_montura[montura_idx]
+                if lente_idx >= 0:
+                    state.compat += t['lente_compat'][lente_idx]
+                    state.calidad += t['lente_calidad'][lente_idx]
+                    state.componentes += 1
+                    state.precio += catalog.precio_lente[lente_idx]
+                bound = self._bound(state, 0, min(self.max_capas, len(self._capas)),
+                                    0, min(self.max_filtros, len(self._filtros)))
+                pairs.append((bound, montura_idx, lente_idx, state))
+        pairs.sort(key=lambda item: -item[0])
+        
+        for bound, montura_idx, lente_idx, state in pairs:
+            if bound + 1e-9 <= self._threshold():
+                self.nodes_pruned += 1
+                continue
+            self._capa_dfs(montura_idx, lente_idx, state, 0, ())
+    
+    def _capa_dfs(self, montura_idx, lente_idx, state, start, capas):
+        self._tick()
+        t = self.tables._scalar
+        
+        # Cerrar las capas y pasar a elegir filtros
+        kf = min(self.max_filtros, len(self._filtros))
+        if self._bound(state, len(self._capas), 0, 0, kf) + 1e-9 > self._threshold():
+            self._filtro_dfs(montura_idx, lente_idx, state, capas, 0, ())
+        else:
+            self.nodes_pruned += 1
+        
+        if len(capas) >= self.max_capas:
+            return
+        
+        for pos in range(start, len(self._capas)):
+            idx = self._capas[pos]
+            child = state.copy()
+            child.capa_compat = child.capa_compat or t['capa_compat'][idx]
+            child.foto = child.foto or t['capa_fotocromatica'][idx]
+            child.ar = child.ar or t['capa_antirreflejante'][idx]
+            child.calidad += t['capa_calidad'][idx]
+            child.componentes += 1
+            child.precio += self.catalog.precio_capa[idx]
+            
+            kc = min(self.max_capas - len(capas) - 1, len(self._capas) - pos - 1)
+            if self._bound(child, pos + 1, kc, 0, kf) + 1e-9 > self._threshold():
+                self._capa_dfs(montura_idx, lente_idx, child, pos + 1, capas + (idx,))
+            else:
+                self.nodes_pruned += 1
+    
+    def _filtro_dfs(self, montura_idx, lente_idx, state, capas, start, filtros):
+        self._tick()
+        t = self.tables._scalar
+        self._record(montura_idx, lente_idx, capas, filtros)
+        
+        if len(filtros) >= self.max_filtros:
+            return
+        
+        for pos in range(start, len(self._filtros)):
+            idx = self._filtros[pos]
+            child = state.copy()
+            child.filtro_compat = child.filtro_compat or t['filtro_compat'][idx]
+            child.luz = child.luz or t['filtro_luz'][idx]
+            child.azul = child.azul or t['filtro_azul'][idx]
+            child.hd = child.hd or t['filtro_alta_definicion'][idx]
+            child.calidad += t['filtro_calidad'][idx]
+            child.componentes += 1
+            child.precio += self.catalog.precio_filtro[idx]
+            
+            kf = min(self.max_filtros - len(filtros) - 1, len(self._filtros) - pos - 1)
+            if self._bound(child, len(self._capas), 0, pos + 1, kf) + 1e-9 > self._threshold():
+                self._filtro_dfs(montura_idx, lente_idx, child, capas, pos + 1, filtros + (idx,))
+            else:
+                self.nodes_pruned += 1
+    
+    def _record(self, montura_idx, lente_idx, capas, filtros):
+        """Evalúa de forma exacta una configuración completa y actualiza las mejores."""
+        capas = tuple(sorted(capas))
+        filtros = tuple(sorted(filtros))
+        catalog = self.catalog
+        
+        # Mismo orden de suma que calculate_precio_total
+        precio = 0
+        if montura_idx >= 0:
+            precio += catalog.precio_montura[montura_idx]
+        if lente_idx >= 0:
+            precio += catalog.precio_lente[lente_idx]
+        for i in capas:
+            precio += catalog.precio_capa[i]
+        for i in filtros:
+            precio += catalog.precio_filtro[i]
+        
+        fitness = self.tables.evaluate_one(montura_idx, lente_idx, capas, filtros, precio)
+        # El contador negativo conserva la primera configuración encontrada ante empates
+        item = (fitness, -next(self._counter), (montura_idx, lente_idx, capas, filtros))
+        if len(self._heap) < self._top_k:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
+    
+    def _bound(self, state, capa_pos, kc, filtro_pos, kf):
+        """
+        Cota superior de la aptitud de cualquier configuración que extienda el
+        estado con hasta kc capas desde capa_pos y hasta kf filtros desde filtro_pos.
+        """
+        capa_compat, foto, ar = state.capa_compat, state.foto, state.ar
+        filtro_compat, luz, azul, hd = state.filtro_compat, state.luz, state.azul, state.hd
+        calidad_capa = calidad_filtro = 0.0
+        
+        if kc > 0:
+            capa_compat = capa_compat or self._capa_compat_suf[capa_pos]
+            foto = foto or self._capa_foto_suf[capa_pos]
+            ar = ar or self._capa_ar_suf[capa_pos]
+            calidad_capa = self._capa_calidad_suf[capa_pos]
+        if kf > 0:
+            filtro_compat = filtro_compat or self._filtro_compat_suf[filtro_pos]
+            luz = luz or self._filtro_luz_suf[filtro_pos]
+            azul = azul or self._filtro_azul_suf[filtro_pos]
+            hd = hd or self._filtro_hd_suf[filtro_pos]
+            calidad_filtro = self._filtro_calidad_suf[filtro_pos]
+        
+        compatibilidad = min(1.0, 0.25 * (state.compat + bool(capa_compat) + bool(filtro_compat)))
+        
+        # El promedio de calidad es máximo en un extremo: agregar todos o ninguno de cada tipo
+        calidad = 0.0
+        for a in (0, kc):
+            for b in (0, kf):
+                componentes = state.componentes + a + b
+                valor = ((state.calidad + a * calidad_capa + b * calidad_filtro) / componentes
+                         if componentes > 0 else 0.5)
+                calidad = max(calidad, valor)
+        
+        # Agregar componentes solo aumenta el precio; la puntuación decrece a partir del mínimo
+        tables = self.tables
+        if (kc > 0 or kf > 0) and state.precio <= tables.precio_min:
+            precio = 1.0
+        else:
+            precio = _puntuacion_precio(state.precio, tables.precio_min, tables.precio_max)
+        
+        restricciones = self._restricciones(foto, ar, luz, azul, hd)
+        
+        w = tables.weights
+        fitness = (
+            w['compatibilidad_padecimiento'] * compatibilidad +
+            w['calidad_componentes'] * calidad +
+            w['precio'] * precio +
+            w['restricciones_adicionales'] * restricciones
+        )
+        return max(0, min(100, fitness * 100))
+    
+    def _restricciones(self, foto, ar, luz, azul, hd):
+        if not self.tables.restricciones:
+            return 1.0
+        
+        puntuacion = 0.0
+        num_restricciones = 0
+        if self._r_luz:
+            num_restricciones += 1
+            puntuacion += 1.0 if foto or luz else 0.0
+        if self._r_pantalla:
+            num_restricciones += 1
+            puntuacion += 1.0 if azul else 0.0
+        if self._r_exterior:
+            num_restricciones += 1
+            puntuacion += 1.0 if luz or foto else 0.0
+        if self._r_noche:
+            num_restricciones += 1
+            puntuacion += (0.7 if ar else 0.0) + (0.3 if hd else 0.0)
+        
+        return puntuacion / num_restricciones if num_restricciones > 0 else 1.0
+
+class _State:
+    """Estado acumulado de una configuración parcial."""
+    __slots__ = ('compat', 'capa_compat', 'filtro_compat', 'calidad', 'componentes', 'precio',
+                 'foto', 'ar', 'luz', 'azul', 'hd')
+    
+    def __init__(self):
+        self.compat = 0
+        self.capa_compat = False
+        self.filtro_compat = False
+        self.calidad = 0.0
+        self.componentes = 0
+        self.precio = 0
+        self.foto = False
+        self.ar = False
+        self.luz = False
+        self.azul = False
+        self.hd = False
+    
+    def copy(self):
+        clone = _State.__new__(_State)
+        for name in _State.__slots__:
+            setattr(clone, name, getattr(self, name))
+        return clone
+
+class _SearchTimeout(Exception):
+    """Se agotó el tiempo de búsqueda."""
@@ -0,0 +1,542 @@
+import hashlib
+import json
+import os
+import re
+import numpy as np
+
+# Componentes del catálogo y archivo CSV de cada uno
+COMPONENTES = ('monturas', 'lentes', 'capas', 'filtros')
+
+# Todos los CSV que forman los datos del sistema
+ARCHIVOS = ('padecimientos',) + COMPONENTES
+
+# Columnas de cada componente: (precio, disponibilidad, tipo, material)
+COLUMNAS = {
+    'monturas': ('precio_montura', 'disponibilidad_montura', 'tipo_montura', 'material_armazon'),
+    'lentes': ('precio_lente', 'disponibilidad_lente', None, None),
+    'capas': ('precio_capa', 'disponibilidad_capa', 'tipo_capa', None),
+    'filtros': ('precio_filtro', 'disponibilidad_filtro', 'tipo_filtro', None)
+}
+
+# Instantánea binaria del catálogo (se guarda junto a los CSV)
+SNAPSHOT_FILE = '.catalog_snapshot.npz'
+SNAPSHOT_VERSION = 1
+
+_PORCENTAJE = re.compile(r'^\s*-?\d+(\.\d+)?\s*%\s*$')
+
+class ComponentTable:
+    """
+    Tabla columnar de un tipo de componente.
+    Las columnas numéricas (precios, índice de refracción, grosores, porcentajes)
+    se guardan como arreglos float64 y las de texto (tipo, material, resistencia,
+    durabilidad, selectividad, disponibilidad...) como códigos enteros de
+    categoría (-1 si falta el valor) con su lista de etiquetas. Los porcentajes
+    conservan además su texto original como categoría.
+    """
+    def __init__(self, name, id_column, ids, numeric, codes, categories, columns=None, kinds=None):
+        """
+        Inicializa la tabla a partir de sus columnas ya tipadas.
+        
+        Args:
+            name (str): Nombre del componente ('monturas', 'lentes', ...)
+            id_column (str): Nombre de la columna identificadora
+            ids (ndarray): Identificadores por fila
+            numeric (dict): Columna -> arreglo float64
+            codes (dict): Columna -> arreglo int32 de códigos de categoría
+            categories (dict): Columna -> lista de etiquetas (el código es la posición)
+            columns (list): Orden original de las columnas (incluida la identificadora)
+            kinds (dict): Columna -> 'int', 'float', 'bool', 'percent' o 'text'
+        """
+        self.name = name
+        self.id_column = id_column
+        self.ids = ids
+        self.numeric = numeric
+        self.codes = codes
+        self.categories = categories
+        self.columns = columns or [id_column] + list(numeric) + [c for c in codes if c not in numeric]
+        self.kinds = kinds or {**{c: 'float' for c in numeric},
+                               **{c: 'text' for c in codes if c not in numeric}}
+        self.index = {identificador: i for i, identificador in enumerate(ids.tolist())}
+        self._category_index = {columna: {etiqueta: i for i, etiqueta in enumerate(etiquetas)}
+                                for columna, etiquetas in categories.items()}
+    
+    @classmethod
+    def from_dataframe(cls, name, df):
+        """
+        Construye la tabla a partir de un DataFrame leído del CSV.
+        
+        Args:
+            name (str): Nombre del componente
+            df (DataFrame): Datos del componente
+        
+        Returns:
+            ComponentTable: Tabla tipada
+        """
+        id_column = next((c for c in df.columns if c.startswith('id_')), df.columns[0])
+        ids = df[id_column].to_numpy()
+        if ids.dtype.kind == 'O':
+            ids = ids.astype(str)
+        numeric = {}
+        codes = {}
+        categories = {}
+        kinds = {}
+        
+        for columna in df.columns:
+            if columna == id_column:
+                continue
+            serie = df[columna]
+            if serie.dtype.kind in 'biuf':
+                numeric[columna] = serie.to_numpy(dtype=np.float64)
+                kinds[columna] = {'b': 'bool', 'i': 'int', 'u': 'int'}.get(serie.dtype.kind, 'float')
+                continue
+            
+            valores = serie.dropna().astype(str)
+            kinds[columna] = 'text'
+            if len(valores) and valores.str.match(_PORCENTAJE).all():
+                # Porcentajes como fracción (85% -> 0.85)
+                numeric[columna] = serie.astype(str).str.rstrip('% ').where(serie.notna()).astype(float).to_numpy() / 100
+                kinds[columna] = 'percent'
+            
+            etiquetas = sorted(valores.unique().tolist())
+            posiciones = {etiqueta: i for i, etiqueta in enumerate(etiquetas)}
+            codes[columna] = np.array([posiciones.get(v, -1) if isinstance(v, str) else -1
+                                       for v in serie.tolist()], dtype=np.int32)
+            categories[columna] = etiquetas
+        
+        return cls(name, id_column, ids, numeric, codes, categories, [str(c) for c in df.columns], kinds)
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def column(self, columna):
+        """Arreglo de una columna numérica o de códigos de categoría."""
+        if columna in self.numeric:
+            return self.numeric[columna]
+        return self.codes[columna]
+    
+    def code(self, columna, etiqueta):
+        """Código de una etiqueta en una columna de categoría (-1 si no existe)."""
+        return self._category_index[columna].get(etiqueta, -1)
+    
+    def labels(self, columna, default=''):
+        """
+        Etiqueta de cada fila en una columna de categoría.
+        
+        Args:
+            columna (str): Columna de categoría
+            default (str): Valor para las filas sin dato
+        
+        Returns:
+            list: Etiquetas por fila
+        """
+        etiquetas = self.categories[columna] + [default]
+        return [etiquetas[c] for c in self.codes[columna].tolist()]
+    
+    def map_categories(self, columna, funcion, dtype=float, default=''):
+        """
+        Aplica una función una sola vez por categoría y la expande a todas las filas.
+        
+        Args:
+            columna (str): Columna de categoría
+            funcion (callable): Función que recibe la etiqueta
+            dtype (type): Tipo del arreglo resultante
+            default (str): Etiqueta usada para las filas sin dato
+        
+        Returns:
+            ndarray: Valor de la función por fila
+        """
+        if columna not in self.codes:
+            return np.full(len(self), funcion(default), dtype=dtype)
+        valores = np.array([funcion(e) for e in self.categories[columna]] + [funcion(default)], dtype=dtype)
+        return valores[self.codes[columna]]
+    
+    def isin(self, columna, etiquetas):
+        """Máscara de las filas cuya categoría está en etiquetas."""
+        codigos = [self.code(columna, e) for e in etiquetas]
+        codigos = [c for c in codigos if c >= 0]
+        return np.isin(self.codes[columna], codigos)
+    
+    def values(self, columna):
+        """
+        Valores originales de una columna como lista de Python (los textos y
+        porcentajes como cadenas, los datos faltantes como NaN).
+        
+        Args:
+            columna (str): Nombre de la columna
+        
+        Returns:
+            list: Valor por fila
+        """
+        if columna == self.id_column:
+            return self.ids.tolist()
+        
+        kind = self.kinds[columna]
+        if kind in ('text', 'percent'):
+            return self.labels(columna, float('nan'))
+        if kind == 'int':
+            return self.numeric[columna].astype(np.int64).tolist()
+        if kind == 'bool':
+            return self.numeric[columna].astype(bool).tolist()
+        return self.numeric[columna].tolist()
+    
+    def records(self):
+        """
+        Filas como lista de diccionarios, equivalentes a DataFrame.to_dict('records').
+        
+        Returns:
+            list: Registros en el orden del CSV
+        """
+        columnas = [self.values(columna) for columna in self.columns]
+        return [dict(zip(self.columns, fila)) for fila in zip(*columnas)]
+    
+    def row(self, i):
+        """
+        Fila como diccionario (para interoperar con el código basado en registros).
+        
+        Args:
+            i (int): Posición de la fila
+        
+        Returns:
+            dict: Valores de la fila
+        """
+        fila = {}
+        for columna in self.columns:
+            kind = self.kinds.get(columna)
+            if columna == self.id_column:
+                fila[columna] = self.ids[i].item()
+            elif kind in ('text', 'percent'):
+                codigo = int(self.codes[columna][i])
+                fila[columna] = self.categories[columna][codigo] if codigo >= 0 else float('nan')
+            elif kind == 'int':
+                fila[columna] = int(self.numeric[columna][i])
+            elif kind == 'bool':
+                fila[columna] = bool(self.numeric[columna][i])
+            else:
+                fila[columna] = self.numeric[columna][i].item()
+        return fila
+    
+    def find(self, columna, etiqueta):
+        """Posición de la primera fila con la etiqueta indicada (-1 si no hay)."""
+        codigo = self.code(columna, etiqueta)
+        if codigo < 0:
+            return -1
+        posiciones = np.flatnonzero(self.codes[columna] == codigo)
+        return int(posiciones[0]) if len(posiciones) else -1
+    
+    def to_dataframe(self):
+        """
+        Reconstruye el DataFrame original de la tabla.
+        
+        Returns:
+            DataFrame: Datos con las mismas columnas y tipos que el CSV
+        """
+        import pandas as pd
+        datos = {}
+        for columna in self.columns:
+            kind = self.kinds.get(columna)
+            if columna == self.id_column:
+                datos[columna] = pd.Series(self.ids.tolist()) if self.ids.dtype.kind == 'U' else self.ids
+            elif kind == 'int':
+                datos[columna] = self.numeric[columna].astype(np.int64)
+            elif kind == 'bool':
+                datos[columna] = self.numeric[columna].astype(bool)
+            elif kind == 'float':
+                datos[columna] = self.numeric[columna]
+            else:
+                # Se deja a pandas inferir el tipo de texto, igual que al leer el CSV
+                datos[columna] = pd.Series(self.values(columna))
+        return pd.DataFrame(datos, columns=self.columns)
+    
+    def to_arrays(self, prefix):
+        """
+        Serializa la tabla como arreglos planos (sin objetos de Python).
+        
+        Args:
+            prefix (str): Prefijo de las claves de esta tabla
+        
+        Returns:
+            tuple: (dict de arreglos, metadatos serializables en JSON)
+        """
+        arrays = {f'{prefix}.ids': self.ids}
+        for columna, valores in self.numeric.items():
+            arrays[f'{prefix}.num.{columna}'] = valores
+        for columna, codigos in self.codes.items():
+            arrays[f'{prefix}.code.{columna}'] = codigos
+            arrays[f'{prefix}.cat.{columna}'] = np.array(self.categories[columna], dtype=str)
+        meta = {
+            'id_column': self.id_column,
+            'columns': self.columns,
+            'kinds': self.kinds,
+            'numeric': list(self.numeric),
+            'codes': list(self.codes)
+        }
+        return arrays, meta
+    
+    @classmethod
+    def from_arrays(cls, name, prefix, arrays, meta):
+        """
+        Reconstruye una tabla serializada con to_arrays.
+        
+        Args:
+            name (str): Nombre del componente
+            prefix (str): Prefijo de las claves de esta tabla
+            arrays (Mapping): Arreglos (por ejemplo, un archivo .npz abierto)
+            meta (dict): Metadatos de la tabla
+        
+        Returns:
+            ComponentTable: Tabla tipada
+        """
+        numeric = {c: arrays[f'{prefix}.num.{c}'] for c in meta['numeric']}
+        codes = {c: arrays[f'{prefix}.code.{c}'] for c in meta['codes']}
+        categories = {c: arrays[f'{prefix}.cat.{c}'].tolist() for c in meta['codes']}
+        return cls(name, meta['id_column'], arrays[f'{prefix}.ids'], numeric, codes, categories,
+                   meta['columns'], meta['kinds'])
+
+class ComponentCatalog:
+    """
+    Catálogo columnar y tipado de monturas, lentes, capas y filtros (y, si se
+    carga desde los CSV, también de los padecimientos).
+    Permite filtrar, consultar precios y traducir identificadores con arreglos
+    de NumPy, sin acceder a filas de pandas en los ciclos del algoritmo.
+    """
+    def __init__(self, tables):
+        """
+        Inicializa el catálogo.
+        
+        Args:
+            tables (dict): Nombre -> ComponentTable
+        """
+        self.tables = tables
+        self.padecimientos = tables.get('padecimientos')
+        self.monturas = tables.get('monturas')
+        self.lentes = tables.get('lentes')
+        self.capas = tables.get('capas')
+        self.filtros = tables.get('filtros')
+        self._index_cache = {}
+        self._content_hash = None
+    
+    @classmethod
+    def from_dataframes(cls, monturas, lentes, capas, filtros, padecimientos=None):
+        """
+        Construye el catálogo a partir de los DataFrames de cada componente.
+        
+        Returns:
+            ComponentCatalog: Catálogo tipado
+        """
+        dataframes = {'padecimientos': padecimientos, 'monturas': monturas, 'lentes': lentes,
+                      'capas': capas, 'filtros': filtros}
+        return cls({nombre: ComponentTable.from_dataframe(nombre, df)
+                    for nombre, df in dataframes.items() if df is not None})
+    
+    @classmethod
+    def from_csv(cls, data_dir='data'):
+        """
+        Lee los CSV y construye el catálogo.
+        
+        Args:
+            data_dir (str): Directorio donde se encuentran los archivos CSV
+        
+        Returns:
+            ComponentCatalog: Catálogo tipado
+        """
+        import pandas as pd
+        dataframes = {nombre: pd.read_csv(os.path.join(data_dir, f'{nombre}.csv')) for nombre in ARCHIVOS}
+        return cls.from_dataframes(dataframes['monturas'], dataframes['lentes'], dataframes['capas'],
+                                   dataframes['filtros'], dataframes['padecimientos'])
+    
+    @classmethod
+    def load(cls, data_dir='data', snapshot_path=None, use_snapshot=True):
+        """
+        Carga el catálogo usando la instantánea binaria si sigue vigente.
+        La instantánea se reutiliza mientras los CSV conserven su fecha de
+        modificación y tamaño; si cambiaron, se compara su hash SHA-256 y solo se
+        vuelven a leer los CSV si el contenido es distinto. Tras leer los CSV la
+        instantánea se reescribe.
+        
+        Args:
+            data_dir (str): Directorio donde se encuentran los archivos CSV
+            snapshot_path (str): Ruta de la instantánea (por defecto, dentro de data_dir)
+            use_snapshot (bool): Si es False, siempre se leen los CSV
+        
+        Returns:
+            ComponentCatalog: Catálogo tipado
+        """
+        if not use_snapshot:
+            catalog = cls.from_csv(data_dir)
+            catalog._content_hash = cls._hash_fingerprint(cls._fingerprint(data_dir))
+            return catalog
+        
+        snapshot_path = snapshot_path or os.path.join(data_dir, SNAPSHOT_FILE)
+        catalog, fingerprint = cls._read_snapshot(snapshot_path, data_dir)
+        if catalog is not None:
+            if fingerprint is not None:
+                # Mismo contenido con otra fecha: actualizar solo la huella
+                catalog._write_snapshot(snapshot_path, fingerprint)
+            return catalog
+        
+        catalog = cls.from_csv(data_dir)
+        fingerprint = cls._fingerprint(data_dir)
+        catalog._content_hash = cls._hash_fingerprint(fingerprint)
+        catalog._write_snapshot(snapshot_path, fingerprint)
+        return catalog
+    
+    @staticmethod
+    def _fingerprint(data_dir, previous=None):
+        """
+        Huella de los CSV: fecha de modificación, tamaño y hash SHA-256 de cada uno.
+        Si se indica la huella anterior, el hash de los archivos cuya fecha y tamaño
+        no cambiaron se reutiliza sin volver a leerlos.
+        
+        Returns:
+            dict: Archivo -> [mtime_ns, tamaño, sha256]
+        """
+        previous = previous or {}
+        fingerprint = {}
+        for nombre in ARCHIVOS:
+            ruta = os.path.join(data_dir, f'{nombre}.csv')
+            estado = os.stat(ruta)
+            anterior = previous.get(nombre)
+            if anterior and anterior[0] == estado.st_mtime_ns and anterior[1] == estado.st_size:
+                fingerprint[nombre] = anterior
+                continue
+            with open(ruta, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            fingerprint[nombre] = [estado.st_mtime_ns, estado.st_size, digest]
+        return fingerprint
+    
+    @staticmethod
+    def _hash_fingerprint(fingerprint):
+        """Hash del contenido de los CSV (independiente de fechas y tamaños)."""
+        contenido = '\n'.join(f'{nombre}:{fingerprint[nombre][2]}' for nombre in sorted(fingerprint))
+        return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+    
+    def content_hash(self):
+        """
+        Hash SHA-256 del contenido del catálogo. Cambia si y solo si cambia algún CSV;
+        para catálogos construidos desde DataFrames se calcula a partir de sus arreglos.
+        
+        Returns:
+            str: Hash hexadecimal
+        """
+        if self._content_hash is None:
+            digest = hashlib.sha256()
+            for nombre in sorted(self.tables):
+                arrays, meta = self.tables[nombre].to_arrays(nombre)
+                digest.update(json.dumps(meta, sort_keys=True).encode('utf-8'))
+                for clave in sorted(arrays):
+                    digest.update(clave.encode('utf-8'))
+                    digest.update(np.ascontiguousarray(arrays[clave]).tobytes())
+            self._content_hash = digest.hexdigest()
+        return self._content_hash
+    
+    @classmethod
+    def _read_snapshot(cls, snapshot_path, data_dir):
+        """
+        Lee la instantánea si existe y corresponde a los CSV actuales.
+        
+        Returns:
+            tuple: (catálogo o None, nueva huella si hay que actualizarla o None)
+        """
+        if not os.path.exists(snapshot_path):
+            return None, None
+        
+        try:
+            with np.load(snapshot_path, allow_pickle=False) as arrays:
+                meta = json.loads(arrays['meta'].item())
+                if meta.get('version') != SNAPSHOT_VERSION:
+                    return None, None
+                
+                stored = meta['fingerprint']
+                fingerprint = cls._fingerprint(data_dir, stored)
+                if any(fingerprint[n][2] != stored.get(n, [None, None, None])[2] for n in ARCHIVOS):
+                    return None, None
+                
+                tables = {nombre: ComponentTable.from_arrays(nombre, nombre, arrays, table_meta)
+                          for nombre, table_meta in meta['tables'].items()}
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Instantánea del catálogo no válida, se leerán los CSV: {e}")
+            return None, None
+        
+        catalog = cls(tables)
+        catalog._content_hash = cls._hash_fingerprint(fingerprint)
+        return catalog, (fingerprint if fingerprint != stored else None)
+    
+    def _write_snapshot(self, snapshot_path, fingerprint):
+        """Guarda el catálogo como instantánea .npz (escritura atómica)."""
+        arrays = {}
+        meta = {'version': SNAPSHOT_VERSION, 'fingerprint': fingerprint, 'tables': {}}
+        for nombre, table in self.tables.items():
+            table_arrays, table_meta = table.to_arrays(nombre)
+            arrays.update(table_arrays)
+            meta['tables'][nombre] = table_meta
+        arrays['meta'] = np.array(json.dumps(meta))
+        
+        temporal = f'{snapshot_path}.{os.getpid()}.tmp'
+        try:
+            with open(temporal, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(temporal, snapshot_path)
+        except OSError as e:
+            print(f"No se pudo guardar la instantánea del catálogo: {e}")
+            if os.path.exists(temporal):
+                os.remove(temporal)
+    
+    def precios(self, componente):
+        """Arreglo de precios de un componente."""
+        return self.tables[componente].numeric[COLUMNAS[componente][0]]
+    
+    def available_indices(self, componente, tipos=None, materiales=None, min_precio=None, max_precio=None):
+        """
+        Obtiene las posiciones de los componentes disponibles que cumplen los criterios.
+        El resultado se memoriza por argumentos (el catálogo no cambia).
+        
+        Args:
+            componente (str): 'monturas', 'lentes', 'capas' o 'filtros'
+            tipos (list): Lista de tipos permitidos (monturas, capas y filtros)
+            materiales (list): Lista de materiales permitidos (solo monturas)
+            min_precio (float): Precio mínimo
+            max_precio (float): Precio máximo
+        
+        Returns:
+            ndarray: Posiciones de las filas (de solo lectura)
+        """
+        key = (componente, frozenset(tipos) if tipos else None,
+               frozenset(materiales) if materiales else None, min_precio, max_precio)
+        indices = self._index_cache.get(key)
+        if indices is not None:
+            return indices
+        
+        table = self.tables.get(componente)
+        if table is None:
+            indices = np.empty(0, dtype=np.intp)
+        else:
+            precio, disponibilidad, tipo, material = COLUMNAS[componente]
+            mask = np.ones(len(table), dtype=bool)
+            
+            if tipos and tipo:
+                mask &= table.isin(tipo, tipos)
+            
+            if materiales and material:
+                mask &= table.isin(material, materiales)
+            
+            precios = table.numeric[precio]
+            if min_precio is not None:
+                mask &= precios >= min_precio
+            
+            if max_precio is not None:
+                mask &= precios <= max_precio
+            
+            # Filtrar por disponibilidad
+            baja = table.code(disponibilidad, 'Baja')
+            if baja >= 0:
+                mask &= table.codes[disponibilidad] != baja
+            
+            indices = np.flatnonzero(mask)
+        
+        indices.flags.writeable = False
+        self._index_cache[key] = indices
+        return indices
+    
+    def index_of(self, componente, identificador):
+        """Posición de un componente por su identificador (-1 si no existe)."""
+        return self.tables[componente].index.get(identificador, -1)
@@ -1,9 +1,14 @@
+from collections import OrderedDict
+import numpy as np
+from models import CompactIndividual
+
 class FitnessEvaluator:
     """
     Evaluador de aptitud para configuraciones de lentes terapéuticos.
     Calcula la aptitud de un individuo basado en múltiples factores.
     """
-    def __init__(self, data_models, padecimiento, restricciones=None, precio_objetivo=None):
+    def __init__(self, data_models, padecimiento, restricciones=None, precio_objetivo=None,
+                 cache_size=None, cache=None):
         """
         Inicializa el evaluador de aptitud.
         
@@ -12,6 +17,8 @@ class FitnessEvaluator:
             padecimiento (str): Nombre del padecimiento a tratar
             restricciones (dict): Restricciones médicas adicionales
             precio_objetivo (tuple): Rango de precio objetivo (min, max)
+            cache_size (int): Tamaño máximo de la caché de aptitud (None para desactivarla)
+            cache (FitnessCache): Caché compartida con otros evaluadores (tiene prioridad sobre cache_size)
         """
         self.data_models = data_models
         self.padecimiento_data = data_models.get_padecimiento_data(padecimiento)
@@ -25,6 +32,27 @@ class FitnessEvaluator:
             'precio': 0.25,
             'restricciones_adicionales': 0.20
         }
+        
+        # Tablas de puntuación por componente, precalculadas para este padecimiento
+        self.tables = None
+        if self.padecimiento_data:
+            self.tables = ScoreTables(data_models, self.padecimiento_data, self.restricciones,
+                                      self.precio_min, self.precio_max, self.weights)
+        
+        # Caché de aptitud por genotipo
+        if cache is None and cache_size:
+            cache = FitnessCache(cache_size)
+        self.cache = cache
+        # El contenido del catálogo forma parte de la clave: una caché compartida
+        # no debe devolver aptitudes calculadas con CSV anteriores a una recarga
+        self.context_key = (
+            data_models.get_catalog().content_hash(),
+            padecimiento,
+            tuple(sorted(self.restricciones.items())),
+            self.precio_min,
+            self.precio_max,
+            tuple(sorted(self.weights.items()))
+        )
     
     def evaluate(self, individual):
         """
@@ -39,6 +67,34 @@ class FitnessEvaluator:
         if not individual or not self.padecimiento_data:
             return 0
         
+        if self.cache is not None:
+            key = (self.context_key, individual.genotype())
+            fitness = self.cache.get(key)
+            if fitness is None:
+                fitness = self._evaluate_uncached(individual)
+                self.cache.put(key, fitness)
+            individual.fitness = fitness
+            return fitness
+        
+        return self._evaluate_uncached(individual)
+    
+    def _evaluate_uncached(self, individual):
+        """
+        Calcula la aptitud de un individuo sin consultar la caché.
+        
+        Args:
+            individual (Individual): Individuo a evaluar
+        
+        Returns:
+            float: Valor de aptitud (0-100)
+        """
+        # Camino rápido: sumar las tablas precalculadas
+        genome = self.tables.genome_indices(individual)
+        if genome is not None:
+            fitness = self.tables.evaluate_one(*genome, individual.precio_total)
+            individual.fitness = fitness
+            return fitness
+        
         # Evaluar cada componente de la aptitud
         comp_padecimiento = self._evaluar_compatibilidad_padecimiento(individual)
         calidad = self._evaluar_calidad_componentes(individual)
@@ -61,6 +117,80 @@ class FitnessEvaluator:
         
         return fitness
     
+    def evaluate_batch(self, population, pool=None):
+        """
+        Evalúa la aptitud de una población completa con operaciones vectorizadas.
+        Produce exactamente los mismos valores que evaluate() individuo por individuo.
+        
+        Args:
+            population (list): Individuos a evaluar
+            pool (ProcessPoolEvaluation): Pool de procesos opcional para repartir el cálculo
+        
+        Returns:
+            list: Valores de aptitud (0-100) en el mismo orden que la población
+        """
+        if not population:
+            return []
+        
+        if not self.padecimiento_data:
+            return [0 for _ in population]
+        
+        if self.cache is None:
+            return self._evaluate_batch_uncached(population, pool)
+        
+        # Consultar la caché y evaluar por lotes solo los genotipos nuevos
+        fitness_values = [None] * len(population)
+        keys = [(self.context_key, individual.genotype()) for individual in population]
+        pending = {}
+        for i, key in enumerate(keys):
+            if key in pending:
+                # Genotipo repetido dentro del mismo lote
+                pending[key].append(i)
+                continue
+            
+            fitness = self.cache.get(key)
+            if fitness is None:
+                pending[key] = [i]
+            else:
+                fitness_values[i] = fitness
+                population[i].fitness = fitness
+        
+        if pending:
+            groups = list(pending.values())
+            computed = self._evaluate_batch_uncached([population[group[0]] for group in groups], pool)
+            for group, fitness in zip(groups, computed):
+                self.cache.put(keys[group[0]], fitness)
+                for i in group:
+                    fitness_values[i] = fitness
+                    population[i].fitness = fitness
+        
+        return fitness_values
+    
+    def _evaluate_batch_uncached(self, population, pool=None):
+        """
+        Evalúa por lotes una población sin consultar la caché.
+        
+        Args:
+            population (list): Individuos a evaluar
+            pool (ProcessPoolEvaluation): Pool de procesos opcional
+        
+        Returns:
+            list: Valores de aptitud (0-100)
+        """
+        genomes = self.tables.genome_arrays(population)
+        if genomes is None:
+            # Algún componente no pertenece al catálogo: evaluar uno por uno
+            return [self._evaluate_uncached(individual) for individual in population]
+        
+        if pool is not None:
+            fitness_values = pool.evaluate(*genomes).tolist()
+        else:
+            fitness_values = self.tables.evaluate(*genomes).tolist()
+        for individual, fitness in zip(population, fitness_values):
+            individual.fitness = fitness
+        
+        return fitness_values
+    
     def _evaluar_compatibilidad_padecimiento(self, individual):
         """
         Evalúa la compatibilidad de la configuración con el padecimiento.
@@ -85,29 +215,25 @@ class FitnessEvaluator:
         
         # 1. Evaluar la montura
         if individual.montura:
-            tipo_montura = individual.montura.get('tipo_montura', '')
-            if recomendacion_montura.lower() in tipo_montura.lower():
+            if _coincide(recomendacion_montura, individual.montura.get('tipo_montura', '')):
                 puntuacion += 0.25
         
         # 2. Evaluar el lente
         if individual.lente:
-            forma_lente = individual.lente.get('forma_lente', '')
-            if recomendacion_lente.lower() in forma_lente.lower():
+            if _coincide(recomendacion_lente, individual.lente.get('forma_lente', '')):
                 puntuacion += 0.25
         
         # 3. Evaluar capas
         if individual.capas and recomendacion_capa:
             for capa in individual.capas:
-                tipo_capa = capa.get('tipo_capa', '')
-                if recomendacion_capa.lower() in tipo_capa.lower():
+                if _coincide(recomendacion_capa, capa.get('tipo_capa', '')):
                     puntuacion += 0.25
                     break
         
         # 4. Evaluar filtros
         if individual.filtros and recomendacion_filtro:
             for filtro in individual.filtros:
-                tipo_filtro = filtro.get('tipo_filtro', '')
-                if recomendacion_filtro.lower() in tipo_filtro.lower():
+                if _coincide(recomendacion_filtro, filtro.get('tipo_filtro', '')):
                     puntuacion += 0.25
                     break
         
@@ -130,67 +256,26 @@ class FitnessEvaluator:
         if individual.montura:
             componentes_evaluados += 1
             # Evaluar por material y resistencia
-            material = individual.montura.get('material_armazon', '').lower()
-            resistencia = individual.montura.get('resistencia', '').lower()
-            
-            # Puntuación por material
-            if 'titanio' in material:
-                puntuacion += 1.0
-            elif 'acetato' in material:
-                puntuacion += 0.8
-            elif 'metal' in material:
-                puntuacion += 0.7
-            else:
-                puntuacion += 0.5
-            
-            # Puntuación por resistencia
-            if 'alta' in resistencia:
-                puntuacion += 1.0
-            elif 'media' in resistencia:
-                puntuacion += 0.7
-            else:
-                puntuacion += 0.4
+            puntuacion += _puntuacion_material(individual.montura.get('material_armazon', ''))
+            puntuacion += _puntuacion_nivel(individual.montura.get('resistencia', ''))
         
         # Evaluar calidad del lente
         if individual.lente:
             componentes_evaluados += 1
             # Evaluar por índice de refracción
-            indice = individual.lente.get('indice_refraccion', 0)
-            
-            if indice >= 1.67:
-                puntuacion += 1.0
-            elif indice >= 1.6:
-                puntuacion += 0.8
-            elif indice >= 1.5:
-                puntuacion += 0.6
-            else:
-                puntuacion += 0.4
+            puntuacion += _puntuacion_indice(individual.lente.get('indice_refraccion', 0))
         
         # Evaluar calidad de capas
         if individual.capas:
             for capa in individual.capas:
                 componentes_evaluados += 1
-                durabilidad = capa.get('durabilidad', '').lower()
-                
-                if 'alta' in durabilidad:
-                    puntuacion += 1.0
-                elif 'media' in durabilidad:
-                    puntuacion += 0.7
-                else:
-                    puntuacion += 0.4
+                puntuacion += _puntuacion_nivel(capa.get('durabilidad', ''))
         
         # Evaluar calidad de filtros
         if individual.filtros:
             for filtro in individual.filtros:
                 componentes_evaluados += 1
-                selectividad = filtro.get('selectividad', '').lower()
-                
-                if 'alta' in selectividad:
-                    puntuacion += 1.0
-                elif 'media' in selectividad:
-                    puntuacion += 0.7
-                else:
-                    puntuacion += 0.4
+                puntuacion += _puntuacion_nivel(filtro.get('selectividad', ''))
         
         # Calcular promedio
         total_evaluaciones = componentes_evaluados * 1.0  # Cada componente tiene 1 evaluación
@@ -208,22 +293,7 @@ class FitnessEvaluator:
         Returns:
             float: Puntuación de precio (0-1)
         """
-        precio = individual.precio_total
-        
-        # Si el precio está dentro del rango, puntuación máxima
-        if self.precio_min <= precio <= self.precio_max:
-            # Mejor puntuación para precios más cercanos al mínimo dentro del rango
-            return 1.0 - 0.3 * ((precio - self.precio_min) / (self.precio_max - self.precio_min + 0.001))
-        
-        # Si está por debajo del mínimo, penalizar ligeramente (podría indicar baja calidad)
-        elif precio < self.precio_min:
-            return 0.7 * (precio / (self.precio_min + 0.001))
-        
-        # Si está por encima del máximo, penalizar significativamente
-        else:
-            exceso = precio - self.precio_max
-            # Cuánto más excede, peor puntuación
-            return max(0, 0.5 - (exceso / (self.precio_max + 0.001)) * 0.5)
+        return _puntuacion_precio(individual.precio_total, self.precio_min, self.precio_max)
     
     def _evaluar_restricciones_adicionales(self, individual):
         """
@@ -248,13 +318,13 @@ class FitnessEvaluator:
             tiene_solucion_luz = False
             
             for capa in individual.capas:
-                if 'fotocrom' in capa.get('tipo_capa', '').lower():
+                if _es_fotocromatica(capa):
                     tiene_solucion_luz = True
                     break
             
             if not tiene_solucion_luz:
                 for filtro in individual.filtros:
-                    if any(t in filtro.get('tipo_filtro', '').lower() for t in ['polarizado', 'uv']):
+                    if _protege_luz(filtro):
                         tiene_solucion_luz = True
                         break
             
@@ -264,8 +334,7 @@ class FitnessEvaluator:
         if self.restricciones.get('screen_time', False):
             num_restricciones += 1
             # Buscar filtros de luz azul
-            tiene_filtro_azul = any('azul' in filtro.get('tipo_filtro', '').lower() 
-                                   for filtro in individual.filtros)
+            tiene_filtro_azul = any(_filtra_luz_azul(filtro) for filtro in individual.filtros)
             puntuacion += 1.0 if tiene_filtro_azul else 0.0
         
         # Evaluación para actividades al aire libre
@@ -275,14 +344,14 @@ class FitnessEvaluator:
             tiene_proteccion_exterior = False
             
             for filtro in individual.filtros:
-                if any(t in filtro.get('tipo_filtro', '').lower() for t in ['uv', 'polarizado']):
+                if _protege_luz(filtro):
                     tiene_proteccion_exterior = True
                     break
             
             # También considerar capas fotocromáticas
             if not tiene_proteccion_exterior:
                 for capa in individual.capas:
-                    if 'fotocrom' in capa.get('tipo_capa', '').lower():
+                    if _es_fotocromatica(capa):
                         tiene_proteccion_exterior = True
                         break
             
@@ -292,10 +361,8 @@ class FitnessEvaluator:
         if self.restricciones.get('night_driving', False):
             num_restricciones += 1
             # Buscar antirreflejante y alta definición
-            tiene_antirreflejo = any('antirreflej' in capa.get('tipo_capa', '').lower() 
-                                    for capa in individual.capas)
-            tiene_alta_def = any('alta definición' in filtro.get('tipo_filtro', '').lower() 
-                                for filtro in individual.filtros)
+            tiene_antirreflejo = any(_es_antirreflejante(capa) for capa in individual.capas)
+            tiene_alta_def = any(_es_alta_definicion(filtro) for filtro in individual.filtros)
             
             if tiene_antirreflejo:
                 puntuacion += 0.7  # Antirreflejo es importante para conducción nocturna
@@ -307,3 +374,512 @@ class FitnessEvaluator:
             return puntuacion / num_restricciones
         return 1.0  # Si no se evaluaron restricciones, puntuación máxima
 
+class FitnessCache:
+    """
+    Caché LRU de valores de aptitud indexada por genotipo canónico y contexto del evaluador.
+    """
+    def __init__(self, max_size=10000):
+        """
+        Inicializa la caché.
+        
+        Args:
+            max_size (int): Número máximo de entradas antes de desalojar las menos usadas
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+    
+    def get(self, key):
+        """
+        Obtiene un valor de la caché.
+        
+        Args:
+            key (tuple): Clave (contexto, genotipo)
+        
+        Returns:
+            float: Aptitud almacenada o None si no existe
+        """
+        fitness = self._entries.get(key)
+        if fitness is None:
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return fitness
+    
+    def put(self, key, fitness):
+        """
+        Almacena un valor y desaloja la entrada menos usada si se excede el tamaño máximo.
+        
+        Args:
+            key (tuple): Clave (contexto, genotipo)
+            fitness (float): Aptitud a almacenar
+        """
+        self._entries[key] = fitness
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Vacía la caché y reinicia los contadores."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def get_stats(self):
+        """
+        Obtiene las estadísticas de uso de la caché.
+        
+        Returns:
+            dict: Aciertos, fallos, tamaño actual, tamaño máximo y tasa de aciertos
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+def _coincide(recomendacion, valor):
+    """Indica si la recomendación del padecimiento aparece en el valor del componente."""
+    return recomendacion.lower() in valor.lower()
+
+def _puntuacion_material(material):
+    """Puntuación de calidad según el material del armazón."""
+    material = material.lower()
+    if 'titanio' in material:
+        return 1.0
+    elif 'acetato' in material:
+        return 0.8
+    elif 'metal' in material:
+        return 0.7
+    return 0.5
+
+def _puntuacion_nivel(nivel):
+    """Puntuación de calidad para niveles Alta/Media/Baja (resistencia, durabilidad, selectividad)."""
+    nivel = nivel.lower()
+    if 'alta' in nivel:
+        return 1.0
+    elif 'media' in nivel:
+        return 0.7
+    return 0.4
+
+def _puntuacion_indice(indice):
+    """Puntuación de calidad según el índice de refracción del lente."""
+    if indice >= 1.67:
+        return 1.0
+    elif indice >= 1.6:
+        return 0.8
+    elif indice >= 1.5:
+        return 0.6
+    return 0.4
+
+def _puntuacion_precio(precio, precio_min, precio_max):
+    """Puntuación según qué tan bien se ajusta el precio al rango objetivo."""
+    # Si el precio está dentro del rango, puntuación máxima
+    if precio_min <= precio <= precio_max:
+        # Mejor puntuación para precios más cercanos al mínimo dentro del rango
+        return 1.0 - 0.3 * ((precio - precio_min) / (precio_max - precio_min + 0.001))
+    
+    # Si está por debajo del mínimo, penalizar ligeramente (podría indicar baja calidad)
+    elif precio < precio_min:
+        return 0.7 * (precio / (precio_min + 0.001))
+    
+    # Si está por encima del máximo, penalizar significativamente
+    else:
+        exceso = precio - precio_max
+        # Cuánto más excede, peor puntuación
+        return max(0, 0.5 - (exceso / (precio_max + 0.001)) * 0.5)
+
+def _es_fotocromatica(capa):
+    return 'fotocrom' in capa.get('tipo_capa', '').lower()
+
+def _es_antirreflejante(capa):
+    return 'antirreflej' in capa.get('tipo_capa', '').lower()
+
+def _protege_luz(filtro):
+    tipo_filtro = filtro.get('tipo_filtro', '').lower()
+    return any(t in tipo_filtro for t in ['polarizado', 'uv'])
+
+def _filtra_luz_azul(filtro):
+    return 'azul' in filtro.get('tipo_filtro', '').lower()
+
+def _es_alta_definicion(filtro):
+    return 'alta definición' in filtro.get('tipo_filtro', '').lower()
+
+class ScoreTables:
+    """
+    Tablas de puntuación por componente para un padecimiento y restricciones.
+    Cada tabla tiene una entrada por fila del catálogo más una entrada neutra
+    al final, de modo que el índice -1 (componente ausente) no aporta nada.
+    Se construyen una sola vez y la evaluación solo suma consultas a las tablas.
+    """
+    def __init__(self, data_models, padecimiento_data, restricciones, precio_min, precio_max, weights):
+        """
+        Construye las tablas a partir de los datos cargados.
+        
+        Args:
+            data_models (DataModels): Instancia del modelo de datos
+            padecimiento_data (dict): Datos del padecimiento
+            restricciones (dict): Restricciones médicas adicionales
+            precio_min (float): Precio mínimo objetivo
+            precio_max (float): Precio máximo objetivo
+            weights (dict): Pesos de la función de aptitud
+        """
+        self.restricciones = restricciones
+        self.precio_min = precio_min
+        self.precio_max = precio_max
+        self.weights = weights
+        
+        recomendacion_montura = padecimiento_data.get('recomendacion_montura', '')
+        recomendacion_lente = padecimiento_data.get('recomendacion_lente', '')
+        recomendacion_capa = padecimiento_data.get('recomendacion_capa', '')
+        recomendacion_filtro = padecimiento_data.get('recomendacion_filtro', '')
+        
+        # Las tablas se calculan sobre el catálogo columnar: cada función de puntuación
+        # se evalúa una vez por categoría y se expande con los códigos de cada fila
+        catalog = data_models.get_catalog()
+        monturas = catalog.monturas
+        lentes = catalog.lentes
+        capas = catalog.capas
+        filtros = catalog.filtros
+        
+        # Mapas id -> índice para resolver individuos con diccionarios
+        self.montura_index = dict(monturas.index) if monturas is not None else {}
+        self.lente_index = dict(lentes.index) if lentes is not None else {}
+        self.capa_index = dict(capas.index) if capas is not None else {}
+        self.filtro_index = dict(filtros.index) if filtros is not None else {}
+        
+        # Monturas
+        self.montura_compat = self._categories(monturas, 'tipo_montura',
+                                               lambda t: _coincide(recomendacion_montura, t), bool)
+        self.montura_material = self._categories(monturas, 'material_armazon', _puntuacion_material)
+        self.montura_resistencia = self._categories(monturas, 'resistencia', _puntuacion_nivel)
+        
+        # Lentes
+        self.lente_compat = self._categories(lentes, 'forma_lente',
+                                             lambda t: _coincide(recomendacion_lente, t), bool)
+        indices = (lentes.numeric.get('indice_refraccion', np.zeros(len(lentes)))
+                   if lentes is not None else np.zeros(0))
+        self.lente_calidad = self._with_sentinel(
+            np.select([indices >= 1.67, indices >= 1.6, indices >= 1.5], [1.0, 0.8, 0.6], 0.4)
+        )
+        
+        # Capas
+        self.capa_compat = self._categories(capas, 'tipo_capa',
+                                            lambda t: bool(recomendacion_capa) and _coincide(recomendacion_capa, t),
+                                            bool)
+        self.capa_calidad = self._categories(capas, 'durabilidad', _puntuacion_nivel)
+        self.capa_fotocromatica = self._categories(capas, 'tipo_capa',
+                                                   lambda t: _es_fotocromatica({'tipo_capa': t}), bool)
+        self.capa_antirreflejante = self._categories(capas, 'tipo_capa',
+                                                     lambda t: _es_antirreflejante({'tipo_capa': t}), bool)
+        
+        # Filtros
+        self.filtro_compat = self._categories(filtros, 'tipo_filtro',
+                                              lambda t: bool(recomendacion_filtro) and _coincide(recomendacion_filtro, t),
+                                              bool)
+        self.filtro_calidad = self._categories(filtros, 'selectividad', _puntuacion_nivel)
+        self.filtro_luz = self._categories(filtros, 'tipo_filtro',
+                                           lambda t: _protege_luz({'tipo_filtro': t}), bool)
+        self.filtro_azul = self._categories(filtros, 'tipo_filtro',
+                                            lambda t: _filtra_luz_azul({'tipo_filtro': t}), bool)
+        self.filtro_alta_definicion = self._categories(filtros, 'tipo_filtro',
+                                                       lambda t: _es_alta_definicion({'tipo_filtro': t}), bool)
+        
+        # Copias como listas de Python para la evaluación de un solo individuo
+        self._scalar = {nombre: getattr(self, nombre).tolist() for nombre in (
+            'montura_compat', 'montura_material', 'montura_resistencia',
+            'lente_compat', 'lente_calidad',
+            'capa_compat', 'capa_calidad', 'capa_fotocromatica', 'capa_antirreflejante',
+            'filtro_compat', 'filtro_calidad', 'filtro_luz', 'filtro_azul', 'filtro_alta_definicion'
+        )}
+    
+    @staticmethod
+    def _with_sentinel(values, dtype=float):
+        """Agrega una entrada neutra al final de un arreglo de puntuaciones."""
+        return np.concatenate([np.asarray(values, dtype=dtype), np.zeros(1, dtype=dtype)])
+    
+    @classmethod
+    def _categories(cls, table, columna, funcion, dtype=float):
+        """
+        Tabla de puntuación calculando la función una vez por categoría de la columna.
+        
+        Args:
+            table (ComponentTable): Tabla del catálogo (None si no hay datos)
+            columna (str): Columna de categoría
+            funcion (callable): Puntuación a partir de la etiqueta
+            dtype (type): Tipo de la tabla
+        
+        Returns:
+            ndarray: Puntuación por fila más la entrada neutra
+        """
+        if table is None:
+            return cls._with_sentinel([], dtype)
+        return cls._with_sentinel(table.map_categories(columna, funcion, dtype), dtype)
+    
+    def genome_indices(self, individual):
+        """
+        Obtiene los índices de los componentes de un individuo.
+        
+        Args:
+            individual (Individual | CompactIndividual): Individuo
+        
+        Returns:
+            tuple: (montura, lente, capas, filtros) o None si algún componente
+                no se encuentra en el catálogo
+        """
+        if isinstance(individual, CompactIndividual):
+            return individual.montura_idx, individual.lente_idx, individual.capas_idx, individual.filtros_idx
+        
+        try:
+            montura_idx = self.montura_index[individual.montura.get('id_montura')] if individual.montura else -1
+            lente_idx = self.lente_index[individual.lente.get('id_lente')] if individual.lente else -1
+            capas_idx = [self.capa_index[c.get('id_capa')] for c in individual.capas]
+            filtros_idx = [self.filtro_index[f.get('id_filtro')] for f in individual.filtros]
+        except KeyError:
+            return None
+        
+        return montura_idx, lente_idx, capas_idx, filtros_idx
+    
+    def evaluate_one(self, montura_idx, lente_idx, capas_idx, filtros_idx, precio):
+        """
+        Calcula la aptitud de una sola configuración sumando consultas a las tablas.
+        
+        Args:
+            montura_idx (int): Índice de la montura (-1 si no hay)
+            lente_idx (int): Índice del lente (-1 si no hay)
+            capas_idx (sequence): Índices de las capas
+            filtros_idx (sequence): Índices de los filtros
+            precio (float): Precio total de la configuración
+        
+        Returns:
+            float: Valor de aptitud (0-100)
+        """
+        t = self._scalar
+        
+        # Compatibilidad con el padecimiento
+        compatibilidad = 0.0
+        if t['montura_compat'][montura_idx]:
+            compatibilidad += 0.25
+        if t['lente_compat'][lente_idx]:
+            compatibilidad += 0.25
+        if any(t['capa_compat'][i] for i in capas_idx):
+            compatibilidad += 0.25
+        if any(t['filtro_compat'][i] for i in filtros_idx):
+            compatibilidad += 0.25
+        compatibilidad = min(1.0, compatibilidad)
+        
+        # Calidad de los componentes
+        calidad = 0.0
+        componentes = len(capas_idx) + len(filtros_idx)
+        if montura_idx >= 0:
+            componentes += 1
+            calidad += t['montura_material'][montura_idx]
+            calidad += t['montura_resistencia'][montura_idx]
+        if lente_idx >= 0:
+            componentes += 1
+            calidad += t['lente_calidad'][lente_idx]
+        for i in capas_idx:
+            calidad += t['capa_calidad'][i]
+        for i in filtros_idx:
+            calidad += t['filtro_calidad'][i]
+        calidad = calidad / componentes if componentes > 0 else 0.5
+        
+        puntuacion_precio = _puntuacion_precio(precio, self.precio_min, self.precio_max)
+        restricciones = self._restricciones_one(capas_idx, filtros_idx)
+        
+        fitness = (
+            self.weights['compatibilidad_padecimiento'] * compatibilidad +
+            self.weights['calidad_componentes'] * calidad +
+            self.weights['precio'] * puntuacion_precio +
+            self.weights['restricciones_adicionales'] * restricciones
+        )
+        
+        return max(0, min(100, fitness * 100))
+    
+    def _restricciones_one(self, capas_idx, filtros_idx):
+        if not self.restricciones:
+            return 1.0
+        
+        t = self._scalar
+        puntuacion = 0.0
+        num_restricciones = 0
+        
+        fotocromatica = any(t['capa_fotocromatica'][i] for i in capas_idx)
+        proteccion_luz = any(t['filtro_luz'][i] for i in filtros_idx)
+        
+        if self.restricciones.get('light_sensitivity', False):
+            num_restricciones += 1
+            puntuacion += 1.0 if fotocromatica or proteccion_luz else 0.0
+        
+        if self.restricciones.get('screen_time', False):
+            num_restricciones += 1
+            puntuacion += 1.0 if any(t['filtro_azul'][i] for i in filtros_idx) else 0.0
+        
+        if self.restricciones.get('outdoor_activities', False):
+            num_restricciones += 1
+            puntuacion += 1.0 if proteccion_luz or fotocromatica else 0.0
+        
+        if self.restricciones.get('night_driving', False):
+            num_restricciones += 1
+            if any(t['capa_antirreflejante'][i] for i in capas_idx):
+                puntuacion += 0.7
+            if any(t['filtro_alta_definicion'][i] for i in filtros_idx):
+                puntuacion += 0.3
+        
+        if num_restricciones > 0:
+            return puntuacion / num_restricciones
+        return 1.0
+    
+    def genome_arrays(self, population):
+        """
+        Convierte una población en arreglos de índices.
+        
+        Args:
+            population (list): Individuos (Individual o CompactIndividual)
+        
+        Returns:
+            tuple: (monturas, lentes, capas, filtros, precios) o None si algún
+                componente no se encuentra en el catálogo
+        """
+        n = len(population)
+        montura_idx = np.full(n, -1, dtype=np.intp)
+        lente_idx = np.full(n, -1, dtype=np.intp)
+        capas_rows = []
+        filtros_rows = []
+        precios = np.empty(n, dtype=float)
+        
+        for i, individual in enumerate(population):
+            precios[i] = individual.precio_total
+            
+            if isinstance(individual, CompactIndividual):
+                montura_idx[i] = individual.montura_idx
+                lente_idx[i] = individual.lente_idx
+                capas_rows.append(individual.capas_idx)
+                filtros_rows.append(individual.filtros_idx)
+                continue
+            
+            try:
+                if individual.montura:
+                    montura_idx[i] = self.montura_index[individual.montura.get('id_montura')]
+                if individual.lente:
+                    lente_idx[i] = self.lente_index[individual.lente.get('id_lente')]
+                capas_rows.append([self.capa_index[c.get('id_capa')] for c in individual.capas])
+                filtros_rows.append([self.filtro_index[f.get('id_filtro')] for f in individual.filtros])
+            except KeyError:
+                return None
+        
+        return montura_idx, lente_idx, self._pad(capas_rows), self._pad(filtros_rows), precios
+    
+    @staticmethod
+    def _pad(rows):
+        """Convierte listas de índices de longitud variable en una matriz rellena con -1."""
+        width = max((len(row) for row in rows), default=0)
+        matrix = np.full((len(rows), width), -1, dtype=np.intp)
+        for i, row in enumerate(rows):
+            matrix[i, :len(row)] = row
+        return matrix
+    
+    def evaluate(self, montura_idx, lente_idx, capas_idx, filtros_idx, precios):
+        """
+        Calcula la aptitud de un lote de configuraciones.
+        Las operaciones se aplican en el mismo orden que los métodos _evaluar_*
+        de FitnessEvaluator para obtener resultados idénticos.
+        
+        Args:
+            montura_idx (ndarray): Índice de montura por configuración (-1 si no hay)
+            lente_idx (ndarray): Índice de lente por configuración (-1 si no hay)
+            capas_idx (ndarray): Matriz de índices de capas rellena con -1
+            filtros_idx (ndarray): Matriz de índices de filtros rellena con -1
+            precios (ndarray): Precio total de cada configuración
+        
+        Returns:
+            ndarray: Valores de aptitud (0-100)
+        """
+        compatibilidad = self._compatibilidad(montura_idx, lente_idx, capas_idx, filtros_idx)
+        calidad = self._calidad(montura_idx, lente_idx, capas_idx, filtros_idx)
+        precio = self._precio(precios)
+        restricciones = self._restricciones(capas_idx, filtros_idx, len(precios))
+        
+        fitness = (
+            self.weights['compatibilidad_padecimiento'] * compatibilidad +
+            self.weights['calidad_componentes'] * calidad +
+            self.weights['precio'] * precio +
+            self.weights['restricciones_adicionales'] * restricciones
+        )
+        
+        return np.clip(fitness * 100, 0, 100)
+    
+    def _compatibilidad(self, montura_idx, lente_idx, capas_idx, filtros_idx):
+        puntuacion = np.where(self.montura_compat[montura_idx], 0.25, 0.0)
+        puntuacion = puntuacion + np.where(self.lente_compat[lente_idx], 0.25, 0.0)
+        puntuacion = puntuacion + np.where(self.capa_compat[capas_idx].any(axis=1), 0.25, 0.0)
+        puntuacion = puntuacion + np.where(self.filtro_compat[filtros_idx].any(axis=1), 0.25, 0.0)
+        return np.minimum(1.0, puntuacion)
+    
+    def _calidad(self, montura_idx, lente_idx, capas_idx, filtros_idx):
+        # Sumar en el mismo orden que la versión escalar (montura, lente, capas, filtros)
+        puntuacion = self.montura_material[montura_idx] + self.montura_resistencia[montura_idx]
+        puntuacion = puntuacion + self.lente_calidad[lente_idx]
+        for j in range(capas_idx.shape[1]):
+            puntuacion = puntuacion + self.capa_calidad[capas_idx[:, j]]
+        for j in range(filtros_idx.shape[1]):
+            puntuacion = puntuacion + self.filtro_calidad[filtros_idx[:, j]]
+        
+        componentes = ((montura_idx >= 0).astype(int) + (lente_idx >= 0) +
+                       (capas_idx >= 0).sum(axis=1) + (filtros_idx >= 0).sum(axis=1))
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(componentes > 0, puntuacion / componentes, 0.5)
+    
+    def _precio(self, precios):
+        # Versión vectorizada de _puntuacion_precio
+        precio_min, precio_max = self.precio_min, self.precio_max
+        
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            dentro = 1.0 - 0.3 * ((precios - precio_min) / (precio_max - precio_min + 0.001))
+            debajo = 0.7 * (precios / (precio_min + 0.001))
+            exceso = precios - precio_max
+            encima = np.maximum(0, 0.5 - (exceso / (precio_max + 0.001)) * 0.5)
+        
+        en_rango = (precio_min <= precios) & (precios <= precio_max)
+        return np.where(en_rango, dentro, np.where(precios < precio_min, debajo, encima))
+    
+    def _restricciones(self, capas_idx, filtros_idx, n):
+        if not self.restricciones:
+            return np.ones(n)
+        
+        puntuacion = np.zeros(n)
+        num_restricciones = 0
+        
+        fotocromatica = self.capa_fotocromatica[capas_idx].any(axis=1)
+        proteccion_luz = self.filtro_luz[filtros_idx].any(axis=1)
+        
+        if self.restricciones.get('light_sensitivity', False):
+            num_restricciones += 1
+            puntuacion = puntuacion + np.where(fotocromatica | proteccion_luz, 1.0, 0.0)
+        
+        if self.restricciones.get('screen_time', False):
+            num_restricciones += 1
+            puntuacion = puntuacion + np.where(self.filtro_azul[filtros_idx].any(axis=1), 1.0, 0.0)
+        
+        if self.restricciones.get('outdoor_activities', False):
+            num_restricciones += 1
+            puntuacion = puntuacion + np.where(proteccion_luz | fotocromatica, 1.0, 0.0)
+        
+        if self.restricciones.get('night_driving', False):
+            num_restricciones += 1
+            puntuacion = puntuacion + np.where(self.capa_antirreflejante[capas_idx].any(axis=1), 0.7, 0.0)
+            puntuacion = puntuacion + np.where(self.filtro_alta_definicion[filtros_idx].any(axis=1), 0.3, 0.0)
+        
+        if num_restricciones > 0:
+            return puntuacion / num_restricciones
+        return np.ones(n)
@@ -0,0 +1,152 @@
+import itertools
+from math import comb
+import numpy as np
+from models import CompactIndividual, GenomeCatalog
+
+class ExhaustiveSolver:
+    """
+    Solucionador exacto por enumeración completa del espacio de configuraciones.
+    Recorre todas las combinaciones de montura, lente, hasta max_capas capas y
+    hasta max_filtros filtros disponibles, evaluándolas por bloques con NumPy
+    mediante las mismas tablas de puntuación que FitnessEvaluator.
+    Toda configuración enumerada incluye montura y lente; no se aplican los
+    filtros de precio por componente, el precio se valora con la función de aptitud.
+    """
+    def __init__(self, data_models, evaluator, catalog=None, max_capas=3, max_filtros=2,
+                 chunk_size=1 << 20):
+        """
+        Inicializa el solucionador.
+        
+        Args:
+            data_models (DataModels): Instancia con acceso a los datos
+            evaluator (FitnessEvaluator): Evaluador de aptitud (se usan sus tablas)
+            catalog (GenomeCatalog): Catálogo compartido (se construye si no se indica)
+            max_capas (int): Número máximo de capas por configuración
+            max_filtros (int): Número máximo de filtros por configuración
+            chunk_size (int): Número aproximado de configuraciones evaluadas por bloque
+        """
+        self.evaluator = evaluator
+        self.tables = evaluator.tables
+        self.catalog = catalog or GenomeCatalog(data_models)
+        self.max_capas = max_capas
+        self.max_filtros = max_filtros
+        self.chunk_size = chunk_size
+        
+        self.monturas = self.catalog.available_indices('monturas') or [-1]
+        self.lentes = self.catalog.available_indices('lentes') or [-1]
+        self.capas = self.catalog.available_indices('capas')
+        self.filtros = self.catalog.available_indices('filtros')
+    
+    @staticmethod
+    def estimate_space(n_monturas, n_lentes, n_capas, n_filtros, max_capas=3, max_filtros=2):
+        """
+        Calcula el tamaño del espacio de configuraciones.
+        
+        Returns:
+            int: Número de configuraciones distintas
+        """
+        combos_capas = sum(comb(n_capas, k) for k in range(min(max_capas, n_capas) + 1))
+        combos_filtros = sum(comb(n_filtros, k) for k in range(min(max_filtros, n_filtros) + 1))
+        return max(1, n_monturas) * max(1, n_lentes) * combos_capas * combos_filtros
+    
+    def space_size(self):
+        """Tamaño del espacio de configuraciones de este catálogo."""
+        return self.estimate_space(len(self.monturas), len(self.lentes), len(self.capas),
+                                   len(self.filtros), self.max_capas, self.max_filtros)
+    
+    @staticmethod
+    def _combinations(indices, max_items):
+        """Matriz con todas las combinaciones de hasta max_items índices, rellena con -1."""
+        rows = [()]
+        for k in range(1, min(max_items, len(indices)) + 1):
+            rows.extend(itertools.combinations(indices, k))
+        matrix = np.full((len(rows), max_items), -1, dtype=np.intp)
+        for i, row in enumerate(rows):
+            matrix[i, :len(row)] = row
+        return matrix
+    
+    def solve(self, top_k=5):
+        """
+        Evalúa todo el espacio y devuelve las mejores configuraciones.
+        Ante empates se conserva el orden de enumeración.
+        
+        Args:
+            top_k (int): Número de configuraciones a devolver
+        
+        Returns:
+            list: Mejores individuos compactos ordenados por aptitud
+        """
+        if not self.evaluator.padecimiento_data or top_k <= 0:
+            return []
+        
+        catalog = self.catalog
+        capa_combos = self._combinations(self.capas, self.max_capas)
+        filtro_combos = self._combinations(self.filtros, self.max_filtros)
+        combos_per_pair = len(capa_combos) * len(filtro_combos)
+        
+        # Precios con una entrada neutra al final para el índice -1
+        precio_montura = np.array(catalog.precio_montura + [0.0], dtype=float)
+        precio_lente = np.array(catalog.precio_lente + [0.0], dtype=float)
+        precio_capa = np.array(catalog.precio_capa + [0.0], dtype=float)
+        precio_filtro = np.array(catalog.precio_filtro + [0.0], dtype=float)
+        
+        pairs = np.array(list(itertools.product(self.monturas, self.lentes)), dtype=np.intp)
+        pairs_per_chunk = max(1, self.chunk_size // combos_per_pair)
+        
+        best_fitness = np.empty(0)
+        best_rows = np.empty(0, dtype=np.int64)
+        
+        for start in range(0, len(pairs), pairs_per_chunk):
+            chunk_pairs = pairs[start:start + pairs_per_chunk]
+            shape = (len(chunk_pairs), len(capa_combos), len(filtro_combos))
+            
+            montura_idx = np.broadcast_to(chunk_pairs[:, 0, None, None], shape).ravel()
+            lente_idx = np.broadcast_to(chunk_pairs[:, 1, None, None], shape).ravel()
+            capas_idx = np.broadcast_to(capa_combos[None, :, None, :],
+                                        shape + (self.max_capas,)).reshape(-1, self.max_capas)
+            filtros_idx = np.broadcast_to(filtro_combos[None, None, :, :],
+                                          shape + (self.max_filtros,)).reshape(-1, self.max_filtros)
+            
+            # Mismo orden de suma que calculate_precio_total
+            precios = precio_montura[montura_idx] + precio_lente[lente_idx]
+            for j in range(self.max_capas):
+                precios = precios + precio_capa[capas_idx[:, j]]
+            for j in range(self.max_filtros):
+                precios = precios + precio_filtro[filtros_idx[:, j]]
+            
+            fitness = self.tables.evaluate(montura_idx, lente_idx, capas_idx, filtros_idx, precios)
+            
+            # Conservar los mejores del bloque junto con los mejores acumulados
+            rows = start * combos_per_pair + self._top_rows(fitness, top_k)
+            best_fitness = np.concatenate([best_fitness, fitness[rows - start * combos_per_pair]])
+            best_rows = np.concatenate([best_rows, rows])
+            keep = np.lexsort((best_rows, -best_fitness))[:top_k]
+            best_fitness, best_rows = best_fitness[keep], best_rows[keep]
+        
+        return [self._individual(int(row), fitness, pairs, capa_combos, filtro_combos)
+                for row, fitness in zip(best_rows, best_fitness)]
+    
+    @staticmethod
+    def _top_rows(fitness, top_k):
+        """Índices de las top_k mejores aptitudes (empates en orden de enumeración)."""
+        if len(fitness) > top_k:
+            threshold = np.partition(fitness, len(fitness) - top_k)[len(fitness) - top_k]
+            candidates = np.nonzero(fitness >= threshold)[0]
+        else:
+            candidates = np.arange(len(fitness))
+        order = np.lexsort((candidates, -fitness[candidates]))[:top_k]
+        return candidates[order]
+    
+    def _individual(self, row, fitness, pairs, capa_combos, filtro_combos):
+        """Reconstruye el individuo correspondiente a una fila de la enumeración."""
+        pair, rest = divmod(row, len(capa_combos) * len(filtro_combos))
+        capa_row, filtro_row = divmod(rest, len(filtro_combos))
+        montura_idx, lente_idx = (int(i) for i in pairs[pair])
+        
+        individual = CompactIndividual(
+            self.catalog, montura_idx, lente_idx,
+            tuple(int(i) for i in capa_combos[capa_row] if i >= 0),
+            tuple(int(i) for i in filtro_combos[filtro_row] if i >= 0)
+        )
+        individual.fitness = float(fitness)
+        return individual
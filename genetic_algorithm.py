@@ -1,13 +1,61 @@
 import random
+import threading
+import time
 import numpy as np
-from models import Individual
+from models import Individual, CompactIndividual, GenomeCatalog
+from exhaustive_solver import ExhaustiveSolver
+from history import EvolutionHistory
+from sampling import PriceFeasibleSampler
+
+class EvolutionProfile:
+    """
+    Tiempos por fase y contadores de operaciones del algoritmo genético.
+    Solo se alimenta si el algoritmo se crea con profile=True.
+    """
+    PHASES = ('elitism', 'selection', 'crossover', 'mutation', 'evaluation')
+    
+    def __init__(self):
+        """Inicializa los acumuladores en cero."""
+        self.reset()
+    
+    def reset(self):
+        """Reinicia tiempos y contadores."""
+        self.times = dict.fromkeys(self.PHASES, 0.0)
+        self.generations = 0
+        self.evaluations = 0
+        self.crossovers = 0
+        self.mutations = 0
+    
+    def get_stats(self):
+        """
+        Obtiene el resumen de la ejecución.
+        
+        Returns:
+            dict: Segundos totales, segundos por generación y fracción del tiempo de cada
+                fase, junto con los contadores de generaciones, evaluaciones, cruces y mutaciones
+        """
+        total = sum(self.times.values())
+        generaciones = max(1, self.generations)
+        return {
+            'times': dict(self.times),
+            'per_generation': {fase: t / generaciones for fase, t in self.times.items()},
+            'fractions': {fase: (t / total if total else 0.0) for fase, t in self.times.items()},
+            'total_time': total,
+            'generations': self.generations,
+            'evaluations': self.evaluations,
+            'crossovers': self.crossovers,
+            'mutations': self.mutations
+        }
 
 class GeneticAlgorithm:
     """
     Implementación del algoritmo genético para encontrar configuraciones óptimas de lentes terapéuticos.
     """
     def __init__(self, data_models, evaluator, population_size=50, generations=30, 
-                crossover_rate=0.8, mutation_rate=0.2, elitism_count=2):
+                crossover_rate=0.8, mutation_rate=0.2, elitism_count=2, compact_genome=False,
+                n_workers=None, chunk_size=None, patience=None, target_fitness=None, max_time=None,
+                exhaustive_threshold=None, vectorized_selection=False, profile=False,
+                history_stride=None, history_size=None):
         """
         Inicializa el algoritmo genético.
         
@@ -19,6 +67,25 @@ class GeneticAlgorithm:
             crossover_rate (float): Tasa de cruce (0-1)
             mutation_rate (float): Tasa de mutación (0-1)
             elitism_count (int): Número de mejores individuos que pasan directamente a la siguiente generación
+            compact_genome (bool): Si es True, los individuos se representan con índices
+                hacia un catálogo compartido (CompactIndividual) en lugar de diccionarios
+            n_workers (int): Si es mayor que 1, la población se evalúa en un pool de
+                procesos con ese número de trabajadores
+            chunk_size (int): Individuos por tarea en el pool (por defecto, reparto automático)
+            patience (int): Detener si la mejor aptitud no mejora durante este número de generaciones
+            target_fitness (float): Detener al alcanzar esta aptitud
+            max_time (float): Tiempo máximo de ejecución en segundos
+            exhaustive_threshold (int): Si el espacio de configuraciones no supera este tamaño,
+                run() lo enumera de forma exacta con ExhaustiveSolver en lugar de evolucionar
+            vectorized_selection (bool): Si es True, los torneos se sortean como una matriz
+                de índices con NumPy y la élite se obtiene con argpartition en lugar de
+                ordenar toda la población (recomendado para poblaciones grandes)
+            profile (bool): Si es True, se miden los tiempos de cada fase de evolve
+                (élite, selección, cruce, mutación y evaluación) y se cuentan las
+                operaciones aplicadas; el resumen se obtiene con get_profile()
+            history_stride (int): Cada cuántas generaciones guardar una instantánea completa
+                de la población y sus aptitudes (por defecto, solo estadísticas resumidas)
+            history_size (int): Número máximo de instantáneas conservadas (búfer circular)
         """
         self.data_models = data_models
         self.evaluator = evaluator
@@ -27,63 +94,56 @@ class GeneticAlgorithm:
         self.crossover_rate = crossover_rate
         self.mutation_rate = mutation_rate
         self.elitism_count = elitism_count
+        self.compact_genome = compact_genome
+        self.catalog = None
+        self.n_workers = n_workers
+        self.chunk_size = chunk_size
+        self._pool = None
+        self.patience = patience
+        self.target_fitness = target_fitness
+        self.max_time = max_time
+        self.exhaustive_threshold = exhaustive_threshold
+        self.vectorized_selection = vectorized_selection
+        self.profile = EvolutionProfile() if profile else None
+        self.cancel_event = threading.Event()
+        self.stop_reason = None
+        self.elapsed_time = 0.0
         self.population = []
-        self.fitness_history = []
-        self.best_fitness_history = []
-        self.avg_fitness_history = []
+        self.history = EvolutionHistory(generations + 1, history_stride, history_size)
         self.current_generation = 0
     
     def initialize_population(self, precio_min=None, precio_max=None):
         """
         Inicializa una población aleatoria de individuos.
+        Cada individuo se construye de modo que su precio total quede dentro de
+        [precio_min, precio_max] (ver PriceFeasibleSampler); si el rango no admite
+        ninguna configuración, se ignora y la función de aptitud penaliza el precio.
         
         Args:
-            precio_min (float): Precio mínimo para los componentes
-            precio_max (float): Precio máximo para los componentes
+            precio_min (float): Precio total mínimo de la configuración
+            precio_max (float): Precio total máximo de la configuración
             
         Returns:
             list: Población inicial
         """
         self.population = []
         
-        # Obtener monturas, lentes, capas y filtros disponibles
-        monturas = self.data_models.get_available_monturas(min_precio=precio_min, max_precio=precio_max)
-        lentes = self.data_models.get_available_lentes(min_precio=precio_min, max_precio=precio_max)
-        capas = self.data_models.get_available_capas(min_precio=precio_min, max_precio=precio_max)
-        filtros = self.data_models.get_available_filtros(min_precio=precio_min, max_precio=precio_max)
+        if self.compact_genome:
+            return self._initialize_compact_population(precio_min, precio_max)
+        
+        records = {nombre: self.data_models.get_records(nombre)
+                   for nombre in ('monturas', 'lentes', 'capas', 'filtros')}
         
         # Crear individuos aleatorios
-        for _ in range(self.population_size):
-            # Seleccionar una montura aleatoria
-            montura = None
-            if not monturas.empty:
-                montura_row = monturas.sample(1).iloc[0]
-                montura = montura_row.to_dict()
-            
-            # Seleccionar un lente aleatorio
-            lente = None
-            if not lentes.empty:
-                lente_row = lentes.sample(1).iloc[0]
-                lente = lente_row.to_dict()
-            
-            # Seleccionar capas aleatorias (0-3 capas)
-            selected_capas = []
-            if not capas.empty:
-                num_capas = random.randint(0, min(3, len(capas)))
-                if num_capas > 0:
-                    selected_capas_rows = capas.sample(num_capas)
-                    selected_capas = [row.to_dict() for _, row in selected_capas_rows.iterrows()]
-            
-            # Seleccionar filtros aleatorios (0-2 filtros)
-            selected_filtros = []
-            if not filtros.empty:
-                num_filtros = random.randint(0, min(2, len(filtros)))
-                if num_filtros > 0:
-                    selected_filtros_rows = filtros.sample(num_filtros)
-                    selected_filtros = [row.to_dict() for _, row in selected_filtros_rows.iterrows()]
+        for seleccion in self._sample_configurations(precio_min, precio_max):
+            montura = [dict(records['monturas'][i]) for i in seleccion['monturas']]
+            lente = [dict(records['lentes'][i]) for i in seleccion['lentes']]
+            selected_capas = [dict(records['capas'][i]) for i in seleccion['capas']]
+            selected_filtros = [dict(records['filtros'][i]) for i in seleccion['filtros']]
             
             # Crear el individuo
-            individuo = Individual(montura, lente, selected_capas, selected_filtros)
+            individuo = Individual(montura[0] if montura else None, lente[0] if lente else None,
+                                   selected_capas, selected_filtros)
             self.population.append(individuo)
         
         # Evaluar la aptitud inicial de la población
@@ -91,6 +151,100 @@ class GeneticAlgorithm:
         
         return self.population
     
+    def _initialize_compact_population(self, precio_min=None, precio_max=None):
+        """
+        Inicializa una población aleatoria de individuos compactos.
+        
+        Args:
+            precio_min (float): Precio total mínimo de la configuración
+            precio_max (float): Precio total máximo de la configuración
+            
+        Returns:
+            list: Población inicial
+        """
+        catalog = self._get_catalog()
+        
+        for seleccion in self._sample_configurations(precio_min, precio_max):
+            montura_idx = seleccion['monturas'][0] if seleccion['monturas'] else -1
+            lente_idx = seleccion['lentes'][0] if seleccion['lentes'] else -1
+            individuo = CompactIndividual(catalog, montura_idx, lente_idx,
+                                          seleccion['capas'], seleccion['filtros'])
+            self.population.append(individuo)
+        
+        # Evaluar la aptitud inicial de la población
+        self.evaluate_population()
+        
+        return self.population
+    
+    def _price_sampler(self, precio_min=None, precio_max=None):
+        """
+        Crea el muestreador de configuraciones con una montura, un lente, 0-3 capas
+        y 0-2 filtros disponibles cuyo precio total está en el rango indicado.
+        
+        Returns:
+            PriceFeasibleSampler: Muestreador sobre las posiciones del catálogo
+        """
+        components = self.data_models.get_catalog()
+        componentes = {}
+        for nombre, minimo, maximo in (('monturas', 1, 1), ('lentes', 1, 1), ('capas', 0, 3), ('filtros', 0, 2)):
+            indices = self.data_models.available_indices(nombre)
+            precios = components.precios(nombre) if len(indices) else ()
+            componentes[nombre] = (indices, precios, minimo, maximo)
+        return PriceFeasibleSampler(componentes, precio_min, precio_max)
+    
+    def _sample_configurations(self, precio_min=None, precio_max=None):
+        """
+        Genera population_size selecciones de componentes con precio total factible.
+        
+        Yields:
+            dict: Posiciones elegidas de 'monturas', 'lentes', 'capas' y 'filtros'
+        """
+        sampler = self._price_sampler(precio_min, precio_max)
+        libre = None
+        if not sampler.feasible:
+            print(f"Ninguna configuración cuesta entre {precio_min} y {precio_max}; "
+                  "la población inicial no se restringe por precio")
+        
+        for _ in range(self.population_size):
+            seleccion = sampler.sample()
+            if seleccion is None:
+                # Rango sin solución o candidatos agotados: sin restricción de precio
+                if libre is None:
+                    libre = self._price_sampler()
+                seleccion = libre.sample()
+            yield seleccion
+    
+    def _get_catalog(self):
+        """
+        Devuelve el catálogo compartido, construyéndolo la primera vez y de nuevo si
+        los datos se recargaron desde entonces (los índices del anterior ya no valen).
+        """
+        if self.catalog is None or self.catalog.version != self.data_models.version:
+            self.catalog = GenomeCatalog(self.data_models)
+        return self.catalog
+    
+    def _copy_individual(self, individual):
+        """
+        Crea una copia independiente de un individuo conservando su aptitud.
+        
+        Args:
+            individual (Individual | CompactIndividual): Individuo a copiar
+            
+        Returns:
+            Individual | CompactIndividual: Copia del individuo
+        """
+        if isinstance(individual, CompactIndividual):
+            return individual.copy()
+        
+        individual_copy = Individual(
+            individual.montura.copy() if individual.montura else None,
+            individual.lente.copy() if individual.lente else None,
+            [capa.copy() for capa in individual.capas],
+            [filtro.copy() for filtro in individual.filtros]
+        )
+        individual_copy.fitness = individual.fitness
+        return individual_copy
+    
     def evaluate_population(self):
         """
         Evalúa la aptitud de todos los individuos en la población.
@@ -98,21 +252,45 @@ class GeneticAlgorithm:
         Returns:
             list: Lista de valores de aptitud
         """
-        fitness_values = []
-        for individual in self.population:
-            fitness = self.evaluator.evaluate(individual)
-            fitness_values.append(fitness)
+        if self.n_workers and self.n_workers > 1 and self._pool is None:
+            # multiprocessing solo se carga cuando se pide evaluación en paralelo
+            from parallel import ProcessPoolEvaluation
+            self._pool = ProcessPoolEvaluation(self.evaluator, self.n_workers, self.chunk_size)
+        
+        if self.profile is None:
+            fitness_values = self.evaluator.evaluate_batch(self.population, self._pool)
+        else:
+            inicio = time.perf_counter()
+            fitness_values = self.evaluator.evaluate_batch(self.population, self._pool)
+            self.profile.times['evaluation'] += time.perf_counter() - inicio
+            self.profile.evaluations += len(self.population)
         
         # Registrar estadísticas
         if fitness_values:
-            avg_fitness = sum(fitness_values) / len(fitness_values)
-            best_fitness = max(fitness_values)
-            self.avg_fitness_history.append(avg_fitness)
-            self.best_fitness_history.append(best_fitness)
-            self.fitness_history.append(fitness_values)
+            self._record_history(fitness_values)
         
         return fitness_values
     
+    def _record_history(self, fitness_values):
+        """Registra en el historial las estadísticas de la población actual."""
+        genotypes = [self._genotype(individual) for individual in self.population]
+        self.history.record(fitness_values, genotypes, self.population)
+    
+    @property
+    def best_fitness_history(self):
+        """Mejor aptitud por generación."""
+        return self.history.best.tolist()
+    
+    @property
+    def avg_fitness_history(self):
+        """Aptitud promedio por generación."""
+        return self.history.mean.tolist()
+    
+    @property
+    def fitness_history(self):
+        """Aptitudes completas de las generaciones conservadas como instantánea (ver history_stride)."""
+        return [snapshot['fitness_values'].tolist() for snapshot in self.history.snapshots]
+    
     def select_parents(self, num_parents):
         """
         Selecciona padres para reproducción usando selección por torneo.
@@ -144,56 +322,161 @@ class GeneticAlgorithm:
         """
         parents = []
         selected_genotypes = set()
+        genotype_ids = self._genotype_ids()
+        indices = range(len(self.population))
+        tournament_size = min(3, len(self.population))
         
         for _ in range(num_parents):
             # Selección por torneo con penalización por similitud
-            tournament_size = min(3, len(self.population))
-            tournament = random.sample(self.population, tournament_size)
-            
-            # Crear copias para no modificar los originales
-            tournament_with_penalties = []
-            for individual in tournament:
-                # Crear una copia del individuo para aplicar penalización
-                ind_copy = Individual(
-                    individual.montura.copy() if individual.montura else None,
-                    individual.lente.copy() if individual.lente else None,
-                    [capa.copy() for capa in individual.capas],
-                    [filtro.copy() for filtro in individual.filtros]
-                )
-                ind_copy.fitness = individual.fitness
-                
-                # Generar una representación del genotipo
-                genotype = (
-                    str(individual.montura.get('id_montura', 0)) if individual.montura else "None",
-                    str(individual.lente.get('id_lente', 0)) if individual.lente else "None",
-                    ",".join(sorted([str(capa.get('id_capa', 0)) for capa in individual.capas])),
-                    ",".join(sorted([str(filtro.get('id_filtro', 0)) for filtro in individual.filtros]))
-                )
-                
-                # Penalizar si es similar a uno ya seleccionado
-                if genotype in selected_genotypes:
-                    ind_copy.fitness *= 0.7  # Penalización fuerte por similitud
-                
-                tournament_with_penalties.append((ind_copy, genotype))
+            # (muestrear índices consume el mismo estado aleatorio que muestrear individuos)
+            tournament = random.sample(indices, tournament_size)
             
-            # Seleccionar el ganador después de aplicar penalizaciones
-            winner, winner_genotype = max(tournament_with_penalties, key=lambda x: x[0].fitness)
+            # Penalizar aritméticamente a los genotipos ya seleccionados; gana el primer máximo
+            winner_id = None
+            best_fitness = None
+            for index in tournament:
+                fitness = self.population[index].fitness
+                if genotype_ids[index] in selected_genotypes:
+                    fitness *= 0.7  # Penalización fuerte por similitud
+                if best_fitness is None or fitness > best_fitness:
+                    winner_id, best_fitness = genotype_ids[index], fitness
             
-            # Encontrar el individuo original correspondiente
-            for individual in tournament:
-                genotype = (
-                    str(individual.montura.get('id_montura', 0)) if individual.montura else "None",
-                    str(individual.lente.get('id_lente', 0)) if individual.lente else "None",
-                    ",".join(sorted([str(capa.get('id_capa', 0)) for capa in individual.capas])),
-                    ",".join(sorted([str(filtro.get('id_filtro', 0)) for filtro in individual.filtros]))
-                )
-                if genotype == winner_genotype:
-                    parents.append(individual)
-                    selected_genotypes.add(genotype)
+            # El padre es el primer participante con el genotipo ganador
+            for index in tournament:
+                if genotype_ids[index] == winner_id:
+                    parents.append(self.population[index])
+                    selected_genotypes.add(winner_id)
                     break
         
         return parents
     
+    def _fitness_array(self):
+        """Aptitudes de la población como arreglo de NumPy."""
+        return np.fromiter((ind.fitness for ind in self.population), dtype=float,
+                           count=len(self.population))
+    
+    @staticmethod
+    def _tournament_matrix(population_size, num_tournaments, tournament_size):
+        """
+        Sortea todos los torneos a la vez como una matriz de índices sin repetidos por fila.
+        
+        Returns:
+            ndarray: Matriz (num_tournaments, tournament_size) de índices de la población
+        """
+        tournaments = np.random.randint(0, population_size, size=(num_tournaments, tournament_size))
+        
+        # Volver a sortear solo las filas con índices repetidos
+        while tournament_size > 1:
+            ordered = np.sort(tournaments, axis=1)
+            repeated = np.nonzero((ordered[:, 1:] == ordered[:, :-1]).any(axis=1))[0]
+            if len(repeated) == 0:
+                break
+            tournaments[repeated] = np.random.randint(0, population_size,
+                                                      size=(len(repeated), tournament_size))
+        return tournaments
+    
+    def select_parents_vectorized(self, num_parents, diversity=True, fitness=None):
+        """
+        Selección por torneo (tamaño 3) con todos los torneos sorteados en una sola
+        matriz de índices. Con diversity=True aplica la misma penalización por
+        similitud que select_parents_with_diversity; esa parte es secuencial porque
+        depende de los padres ya elegidos, pero solo recorre listas precalculadas.
+        
+        Args:
+            num_parents (int): Número de padres a seleccionar
+            diversity (bool): Aplicar penalización a genotipos ya seleccionados
+            fitness (ndarray): Aptitudes de la población (se calculan si no se indican)
+        
+        Returns:
+            list: Individuos seleccionados como padres
+        """
+        if num_parents <= 0 or not self.population:
+            return []
+        if fitness is None:
+            fitness = self._fitness_array()
+        
+        tournament_size = min(3, len(self.population))
+        tournaments = self._tournament_matrix(len(self.population), num_parents, tournament_size)
+        scores = fitness[tournaments]
+        
+        if not diversity:
+            winners = tournaments[np.arange(num_parents), np.argmax(scores, axis=1)]
+            return [self.population[i] for i in winners.tolist()]
+        
+        genotype_ids = self._genotype_ids()
+        parents = []
+        selected_genotypes = set()
+        for row, row_scores in zip(tournaments.tolist(), scores.tolist()):
+            best_index = row[0]
+            best_score = None
+            for index, score in zip(row, row_scores):
+                if genotype_ids[index] in selected_genotypes:
+                    score *= 0.7
+                if best_score is None or score > best_score:
+                    best_index, best_score = index, score
+            parents.append(self.population[best_index])
+            selected_genotypes.add(genotype_ids[best_index])
+        
+        return parents
+    
+    @staticmethod
+    def _elite_indices(fitness, count):
+        """
+        Índices de los count individuos con mayor aptitud usando argpartition
+        (empates en orden de la población).
+        """
+        count = min(count, len(fitness))
+        if count <= 0:
+            return []
+        if count < len(fitness):
+            # argpartition elige arbitrariamente entre los empatados en el corte: se toma
+            # el valor del corte como umbral, se conservan los que lo superan y se
+            # completa con los empatados de menor posición (como el ordenamiento estable)
+            threshold = -np.partition(-fitness, count - 1)[count - 1]
+            above = np.flatnonzero(fitness > threshold)
+            tied = np.flatnonzero(fitness == threshold)[:count - len(above)]
+            candidates = np.concatenate((above, tied))
+        else:
+            candidates = np.arange(len(fitness))
+        order = np.lexsort((candidates, -fitness[candidates]))
+        return candidates[order].tolist()
+    
+    def _genotype_ids(self):
+        """
+        Calcula un identificador entero del genotipo de cada individuo de la población;
+        los individuos con el mismo genotipo comparten identificador.
+        
+        Returns:
+            list: Identificador de genotipo por posición en la población
+        """
+        ids = {}
+        return [ids.setdefault(self._genotype(individual), len(ids)) for individual in self.population]
+    
+    def _genotype(self, individual):
+        """
+        Genera una representación hashable del genotipo de un individuo.
+        
+        Args:
+            individual (Individual | CompactIndividual): Individuo
+            
+        Returns:
+            tuple: Genotipo (montura, lente, capas ordenadas, filtros ordenados)
+        """
+        if isinstance(individual, CompactIndividual):
+            return (
+                individual.montura_idx,
+                individual.lente_idx,
+                tuple(sorted(individual.capas_idx)),
+                tuple(sorted(individual.filtros_idx))
+            )
+        
+        return (
+            str(individual.montura.get('id_montura', 0)) if individual.montura else "None",
+            str(individual.lente.get('id_lente', 0)) if individual.lente else "None",
+            ",".join(sorted([str(capa.get('id_capa', 0)) for capa in individual.capas])),
+            ",".join(sorted([str(filtro.get('id_filtro', 0)) for filtro in individual.filtros]))
+        )
+    
     def crossover(self, parent1, parent2):
         """
         Realiza operación de cruce entre dos padres para crear descendencia.
@@ -207,21 +490,18 @@ class GeneticAlgorithm:
         """
         if random.random() > self.crossover_rate:
             # Si no se realiza cruce, devolver copias de los padres
-            child1 = Individual(
-                parent1.montura.copy() if parent1.montura else None,
-                parent1.lente.copy() if parent1.lente else None,
-                [capa.copy() for capa in parent1.capas],
-                [filtro.copy() for filtro in parent1.filtros]
-            )
-            
-            child2 = Individual(
-                parent2.montura.copy() if parent2.montura else None,
-                parent2.lente.copy() if parent2.lente else None,
-                [capa.copy() for capa in parent2.capas],
-                [filtro.copy() for filtro in parent2.filtros]
-            )
+            child1 = self._copy_individual(parent1)
+            child2 = self._copy_individual(parent2)
+            child1.fitness = 0
+            child2.fitness = 0
             return child1, child2
         
+        if self.profile is not None:
+            self.profile.crossovers += 1
+        
+        if self.compact_genome:
+            return self._crossover_compact(parent1, parent2)
+        
         # Cruce de componentes
         # Montura: intercambio directo
         if random.random() < 0.5:
@@ -287,6 +567,69 @@ class GeneticAlgorithm:
         
         return child1, child2
     
+    def _crossover_compact(self, parent1, parent2):
+        """
+        Cruce entre individuos compactos. Sigue las mismas reglas que el cruce
+        de individuos con diccionarios, operando solo sobre índices.
+        
+        Args:
+            parent1 (CompactIndividual): Primer padre
+            parent2 (CompactIndividual): Segundo padre
+            
+        Returns:
+            tuple: Dos nuevos individuos compactos (descendencia)
+        """
+        catalog = self.catalog
+        
+        # Montura: intercambio directo
+        if random.random() < 0.5:
+            child1_montura, child2_montura = parent1.montura_idx, parent2.montura_idx
+        else:
+            child1_montura, child2_montura = parent2.montura_idx, parent1.montura_idx
+        
+        # Lente: intercambio directo
+        if random.random() < 0.5:
+            child1_lente, child2_lente = parent1.lente_idx, parent2.lente_idx
+        else:
+            child1_lente, child2_lente = parent2.lente_idx, parent1.lente_idx
+        
+        child1_capas, child2_capas = self._split_unique(
+            parent1.capas_idx + parent2.capas_idx, catalog.tipo_capa)
+        child1_filtros, child2_filtros = self._split_unique(
+            parent1.filtros_idx + parent2.filtros_idx, catalog.tipo_filtro)
+        
+        child1 = CompactIndividual(catalog, child1_montura, child1_lente, child1_capas, child1_filtros)
+        child2 = CompactIndividual(catalog, child2_montura, child2_lente, child2_capas, child2_filtros)
+        
+        return child1, child2
+    
+    @staticmethod
+    def _split_unique(combined, tipos):
+        """
+        Elimina índices con tipo repetido y reparte el resto entre dos hijos.
+        
+        Args:
+            combined (tuple): Índices combinados de ambos padres
+            tipos (list): Tipo de cada componente del catálogo
+            
+        Returns:
+            tuple: Tuplas de índices para cada hijo
+        """
+        if not combined:
+            return (), ()
+        
+        unique = {}
+        for idx in combined:
+            tipo = tipos[idx]
+            if tipo not in unique or random.random() < 0.5:
+                unique[tipo] = idx
+        
+        unique_list = list(unique.values())
+        random.shuffle(unique_list)
+        split_point = random.randint(0, len(unique_list))
+        
+        return tuple(unique_list[:split_point]), tuple(unique_list[split_point:])
+    
     def mutate(self, individual):
         """
         Aplica mutación a un individuo con una probabilidad determinada.
@@ -300,34 +643,37 @@ class GeneticAlgorithm:
         if random.random() > self.mutation_rate:
             return individual
         
+        if self.profile is not None:
+            self.profile.mutations += 1
+        
+        if self.compact_genome:
+            return self._mutate_compact(individual)
+        
         # Seleccionar aleatoriamente qué componente mutar
         mutation_component = random.choice(['montura', 'lente', 'capas', 'filtros'])
         
         if mutation_component == 'montura':
             # Mutar montura
-            monturas = self.data_models.get_available_monturas()
-            if not monturas.empty:
-                montura_row = monturas.sample(1).iloc[0]
-                individual.montura = montura_row.to_dict()
+            monturas = self.data_models.available_indices('monturas')
+            if len(monturas):
+                individual.montura = self._random_record('monturas', monturas)
         
         elif mutation_component == 'lente':
             # Mutar lente
-            lentes = self.data_models.get_available_lentes()
-            if not lentes.empty:
-                lente_row = lentes.sample(1).iloc[0]
-                individual.lente = lente_row.to_dict()
+            lentes = self.data_models.available_indices('lentes')
+            if len(lentes):
+                individual.lente = self._random_record('lentes', lentes)
         
         elif mutation_component == 'capas':
             # Mutar capas
-            capas = self.data_models.get_available_capas()
-            if not capas.empty:
+            capas = self.data_models.available_indices('capas')
+            if len(capas):
                 # Operaciones posibles: agregar, eliminar o reemplazar
                 operacion = random.choice(['agregar', 'eliminar', 'reemplazar'])
                 
                 if operacion == 'agregar' and len(individual.capas) < 3:
                     # Agregar una nueva capa
-                    capa_row = capas.sample(1).iloc[0]
-                    nueva_capa = capa_row.to_dict()
+                    nueva_capa = self._random_record('capas', capas)
                     # Evitar duplicados
                     if not any(c.get('id_capa') == nueva_capa.get('id_capa') for c in individual.capas):
                         individual.capas.append(nueva_capa)
@@ -340,20 +686,18 @@ class GeneticAlgorithm:
                 elif operacion == 'reemplazar' and individual.capas:
                     # Reemplazar una capa aleatoria
                     idx = random.randint(0, len(individual.capas) - 1)
-                    capa_row = capas.sample(1).iloc[0]
-                    individual.capas[idx] = capa_row.to_dict()
+                    individual.capas[idx] = self._random_record('capas', capas)
         
         elif mutation_component == 'filtros':
             # Mutar filtros
-            filtros = self.data_models.get_available_filtros()
-            if not filtros.empty:
+            filtros = self.data_models.available_indices('filtros')
+            if len(filtros):
                 # Operaciones posibles: agregar, eliminar o reemplazar
                 operacion = random.choice(['agregar', 'eliminar', 'reemplazar'])
                 
                 if operacion == 'agregar' and len(individual.filtros) < 2:
                     # Agregar un nuevo filtro
-                    filtro_row = filtros.sample(1).iloc[0]
-                    nuevo_filtro = filtro_row.to_dict()
+                    nuevo_filtro = self._random_record('filtros', filtros)
                     # Evitar duplicados
                     if not any(f.get('id_filtro') == nuevo_filtro.get('id_filtro') for f in individual.filtros):
                         individual.filtros.append(nuevo_filtro)
@@ -366,14 +710,97 @@ class GeneticAlgorithm:
                 elif operacion == 'reemplazar' and individual.filtros:
                     # Reemplazar un filtro aleatorio
                     idx = random.randint(0, len(individual.filtros) - 1)
-                    filtro_row = filtros.sample(1).iloc[0]
-                    individual.filtros[idx] = filtro_row.to_dict()
+                    individual.filtros[idx] = self._random_record('filtros', filtros)
         
         # Recalcular precio total
         individual.calculate_precio_total()
         
         return individual
     
+    def _random_record(self, componente, indices):
+        """
+        Elige al azar una fila entre las posiciones indicadas y la devuelve como
+        diccionario propio (copia del registro memorizado en DataModels).
+        
+        Args:
+            componente (str): 'monturas', 'lentes', 'capas' o 'filtros'
+            indices (ndarray): Posiciones candidatas
+        
+        Returns:
+            dict: Datos del componente elegido
+        """
+        return dict(self.data_models.get_records(componente)[random.choice(indices)])
+    
+    def _mutate_compact(self, individual):
+        """
+        Mutación de un individuo compacto con las mismas operaciones que mutate.
+        
+        Args:
+            individual (CompactIndividual): Individuo a mutar
+            
+        Returns:
+            CompactIndividual: Individuo mutado
+        """
+        catalog = self.catalog
+        mutation_component = random.choice(['montura', 'lente', 'capas', 'filtros'])
+        
+        if mutation_component == 'montura':
+            monturas = catalog.available_indices('monturas')
+            if monturas:
+                individual.montura_idx = random.choice(monturas)
+        
+        elif mutation_component == 'lente':
+            lentes = catalog.available_indices('lentes')
+            if lentes:
+                individual.lente_idx = random.choice(lentes)
+        
+        elif mutation_component == 'capas':
+            individual.capas_idx = self._mutate_indices(
+                individual.capas_idx, catalog.available_indices('capas'), 3)
+        
+        elif mutation_component == 'filtros':
+            individual.filtros_idx = self._mutate_indices(
+                individual.filtros_idx, catalog.available_indices('filtros'), 2)
+        
+        # Recalcular precio total
+        individual.calculate_precio_total()
+        
+        return individual
+    
+    @staticmethod
+    def _mutate_indices(current, available, max_items):
+        """
+        Agrega, elimina o reemplaza un índice de una tupla de componentes.
+        
+        Args:
+            current (tuple): Índices actuales
+            available (list): Índices disponibles en el catálogo
+            max_items (int): Número máximo de componentes permitidos
+            
+        Returns:
+            tuple: Nuevos índices
+        """
+        if not available:
+            return current
+        
+        operacion = random.choice(['agregar', 'eliminar', 'reemplazar'])
+        
+        if operacion == 'agregar' and len(current) < max_items:
+            nuevo = random.choice(available)
+            # Evitar duplicados
+            if nuevo not in current:
+                return current + (nuevo,)
+        
+        elif operacion == 'eliminar' and current:
+            idx = random.randint(0, len(current) - 1)
+            return current[:idx] + current[idx + 1:]
+        
+        elif operacion == 'reemplazar' and current:
+            idx = random.randint(0, len(current) - 1)
+            return current[:idx] + (random.choice(available),) + current[idx + 1:]
+        
+        return current
+    
     def evolve(self):
         """
         Ejecuta una generación del algoritmo genético.
@@ -381,21 +808,21 @@ class GeneticAlgorithm:
         Returns:
             list: Nueva población después de la evolución
         """
-        # Ordenar población por aptitud (mayor a menor)
-        self.population.sort(key=lambda x: x.fitness, reverse=True)
+        profile = self.profile
+        if profile is not None:
+            inicio = time.perf_counter()
         
-        # Preservar los mejores individuos (elitismo)
-        elite = self.population[:self.elitism_count]
-        elite_copies = []
-        for e in elite:
-            elite_copy = Individual(
-                e.montura.copy() if e.montura else None,
-                e.lente.copy() if e.lente else None,
-                [capa.copy() for capa in e.capas],
-                [filtro.copy() for filtro in e.filtros]
-            )
-            elite_copy.fitness = e.fitness
-            elite_copies.append(elite_copy)
+        if self.vectorized_selection:
+            # Élite con argpartition, sin ordenar toda la población
+            fitness = self._fitness_array()
+            elite = [self.population[i] for i in self._elite_indices(fitness, self.elitism_count)]
+        else:
+            # Ordenar población por aptitud (mayor a menor)
+            self.population.sort(key=lambda x: x.fitness, reverse=True)
+            
+            # Preservar los mejores individuos (elitismo)
+            elite = self.population[:self.elitism_count]
+        elite_copies = [self._copy_individual(e) for e in elite]
         
         # Crear nueva población
         new_population = elite_copies.copy()
@@ -404,17 +831,38 @@ class GeneticAlgorithm:
         num_offspring = self.population_size - len(elite_copies)
         num_parents_needed = (num_offspring + 1) // 2 * 2  # Asegurar número par
         
+        if profile is not None:
+            fin = time.perf_counter()
+            profile.times['elitism'] += fin - inicio
+            inicio = fin
+        
         # Usar selección con diversidad para mejorar la variedad de soluciones
-        parents = self.select_parents_with_diversity(num_parents_needed)
+        if self.vectorized_selection:
+            parents = self.select_parents_vectorized(num_parents_needed, fitness=fitness)
+        else:
+            parents = self.select_parents_with_diversity(num_parents_needed)
+        
+        if profile is not None:
+            profile.times['selection'] += time.perf_counter() - inicio
         
         # Cruce para generar descendencia
         for i in range(0, len(parents), 2):
             if i + 1 < len(parents):
-                child1, child2 = self.crossover(parents[i], parents[i+1])
-                
-                # Mutación
-                child1 = self.mutate(child1)
-                child2 = self.mutate(child2)
+                if profile is None:
+                    child1, child2 = self.crossover(parents[i], parents[i+1])
+                    
+                    # Mutación
+                    child1 = self.mutate(child1)
+                    child2 = self.mutate(child2)
+                else:
+                    inicio = time.perf_counter()
+                    child1, child2 = self.crossover(parents[i], parents[i+1])
+                    medio = time.perf_counter()
+                    child1 = self.mutate(child1)
+                    child2 = self.mutate(child2)
+                    fin = time.perf_counter()
+                    profile.times['crossover'] += medio - inicio
+                    profile.times['mutation'] += fin - medio
                 
                 new_population.append(child1)
                 if len(new_population) < self.population_size:
@@ -428,35 +876,90 @@ class GeneticAlgorithm:
         
         # Incrementar contador de generación
         self.current_generation += 1
+        if profile is not None:
+            profile.generations += 1
         
         return self.population
     
-    def run(self, precio_min=None, precio_max=None):
+    def run(self, precio_min=None, precio_max=None, callback=None, cancel_event=None):
         """
-        Ejecuta el algoritmo genético completo.
+        Ejecuta el algoritmo genético hasta completar las generaciones o hasta que se
+        cumpla un criterio de parada. El motivo queda en self.stop_reason:
+        'generations', 'patience', 'target_fitness', 'max_time', 'cancelled' o
+        'exhaustive' (si el espacio era lo bastante pequeño para enumerarlo).
         
         Args:
             precio_min (float): Precio mínimo para los componentes
             precio_max (float): Precio máximo para los componentes
+            callback (callable): Función opcional que se llama tras evaluar la población
+                inicial y tras cada generación con (generación, mejor aptitud,
+                aptitud promedio, segundos transcurridos)
+            cancel_event (threading.Event): Evento externo de cancelación (por defecto,
+                self.cancel_event, que se activa con cancel())
             
         Returns:
             list: Mejores individuos encontrados
         """
-        # Inicializar población
-        self.initialize_population(precio_min, precio_max)
-        
-        # Reiniciar historial
-        self.fitness_history = []
-        self.best_fitness_history = []
-        self.avg_fitness_history = []
-        self.current_generation = 0
+        start_time = time.perf_counter()
+        cancel_event = cancel_event if cancel_event is not None else self.cancel_event
+        self.stop_reason = 'generations'
+        if self.profile is not None:
+            self.profile.reset()
         
-        # Evaluar población inicial
-        self.evaluate_population()
+        if self.exhaustive_threshold:
+            solver = ExhaustiveSolver(self.data_models, self.evaluator, self._get_catalog())
+            if solver.space_size() <= self.exhaustive_threshold:
+                return self._run_exhaustive(solver, callback, start_time)
         
-        # Evolucionar por el número especificado de generaciones
-        for _ in range(self.generations):
-            self.evolve()
+        try:
+            # Inicializar población
+            self.initialize_population(precio_min, precio_max)
+            
+            # Reiniciar historial
+            self.history.clear()
+            self.history.reserve(self.generations + 1)
+            self.current_generation = 0
+            
+            # Evaluar población inicial
+            self.evaluate_population()
+            self._notify(callback, start_time)
+            
+            best_so_far = self.history.best[-1]
+            stale_generations = 0
+            
+            # La población inicial puede cumplir ya la aptitud objetivo o el tiempo máximo
+            stop_reason = self._check_stop(best_so_far, stale_generations, start_time)
+            if stop_reason:
+                self.stop_reason = stop_reason
+            
+            # Evolucionar por el número especificado de generaciones
+            for _ in range(0 if stop_reason else self.generations):
+                if cancel_event.is_set():
+                    self.stop_reason = 'cancelled'
+                    break
+                
+                self.evolve()
+                self._notify(callback, start_time)
+                
+                best = self.history.best[-1]
+                if best > best_so_far:
+                    best_so_far = best
+                    stale_generations = 0
+                else:
+                    stale_generations += 1
+                
+                stop_reason = self._check_stop(best_so_far, stale_generations, start_time)
+                if stop_reason:
+                    self.stop_reason = stop_reason
+                    break
+            
+            # Una cancelación que llega durante la última generación no se ve en el bucle
+            if self.stop_reason == 'generations' and cancel_event.is_set():
+                self.stop_reason = 'cancelled'
+        finally:
+            self.elapsed_time = time.perf_counter() - start_time
+            self.cancel_event.clear()
+            self.close()
         
         # Ordenar población final por aptitud
         self.population.sort(key=lambda x: x.fitness, reverse=True)
@@ -464,6 +967,59 @@ class GeneticAlgorithm:
         # Devolver los mejores individuos
         return self.population[:5]
     
+    def _run_exhaustive(self, solver, callback, start_time):
+        """
+        Sustituye la evolución por la enumeración exacta del espacio.
+        
+        Returns:
+            list: Mejores individuos encontrados
+        """
+        population = solver.solve(top_k=self.population_size)
+        if not self.compact_genome:
+            population = [individual.to_individual() for individual in population]
+        
+        self.population = population
+        self.current_generation = 0
+        self.history.clear()
+        if population:
+            self._record_history([individual.fitness for individual in population])
+            self._notify(callback, start_time)
+        
+        self.stop_reason = 'exhaustive'
+        self.elapsed_time = time.perf_counter() - start_time
+        return self.population[:5]
+    
+    def _check_stop(self, best_so_far, stale_generations, start_time):
+        """
+        Evalúa los criterios de parada anticipada.
+        
+        Returns:
+            str: Motivo de parada o None si la ejecución debe continuar
+        """
+        if self.target_fitness is not None and best_so_far >= self.target_fitness:
+            return 'target_fitness'
+        if self.patience is not None and stale_generations >= self.patience:
+            return 'patience'
+        if self.max_time is not None and time.perf_counter() - start_time >= self.max_time:
+            return 'max_time'
+        return None
+    
+    def cancel(self):
+        """Solicita detener la ejecución en curso al terminar la generación actual."""
+        self.cancel_event.set()
+    
+    def _notify(self, callback, start_time):
+        """Informa el progreso de la generación actual al callback, si existe."""
+        if callback is not None:
+            callback(self.current_generation, self.history.best[-1],
+                     self.history.mean[-1], time.perf_counter() - start_time)
+    
+    def close(self):
+        """Libera el pool de procesos de evaluación, si existe."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+    
     def get_best_individual(self):
         """
         Devuelve el mejor individuo de la población actual.
@@ -489,12 +1045,25 @@ class GeneticAlgorithm:
         if not self.population:
             return []
         
+        if self.vectorized_selection:
+            return [self.population[i] for i in self._elite_indices(self._fitness_array(), n)]
+        
         # Ordenar por aptitud (mayor a menor)
         sorted_population = sorted(self.population, key=lambda x: x.fitness, reverse=True)
         
         # Devolver los primeros N
         return sorted_population[:n]
     
+    def get_profile(self):
+        """
+        Obtiene los tiempos por fase y los contadores de la última ejecución.
+        
+        Returns:
+            dict: Resumen de EvolutionProfile.get_stats() o None si el algoritmo
+                se creó sin profile=True
+        """
+        return self.profile.get_stats() if self.profile is not None else None
+    
     def get_evolution_stats(self):
         """
         Obtiene estadísticas de la evolución.
@@ -502,5 +1071,14 @@ class GeneticAlgorithm:
         Returns:
             tuple: (generaciones, mejor aptitud, aptitud promedio)
         """
-        generations = list(range(len(self.best_fitness_history)))
-        return generations, self.best_fitness_history, self.avg_fitness_history
\ No newline at end of file
+        generations = list(range(len(self.history)))
+        return generations, self.history.best.tolist(), self.history.mean.tolist()
+    
+    def get_history_stats(self):
+        """
+        Obtiene todas las estadísticas resumidas por generación.
+        
+        Returns:
+            dict: Listas de mejor, promedio, desviación, mínimo, cuartiles y genotipos distintos
+        """
+        return self.history.get_stats()
\ No newline at end of file
@@ -0,0 +1,138 @@
+from collections import deque
+import numpy as np
+
+class EvolutionHistory:
+    """
+    Historial acotado de la evolución.
+    Por generación solo se guardan estadísticas resumidas en arreglos de NumPy
+    preasignados (mejor, promedio, desviación estándar, mínimo, cuantiles y
+    número de genotipos distintos). Las instantáneas completas de la población
+    son opcionales: se toman cada snapshot_stride generaciones y se conservan
+    como mucho max_snapshots en un búfer circular.
+    """
+    QUANTILES = (0.25, 0.5, 0.75)
+    
+    def __init__(self, capacity=64, snapshot_stride=None, max_snapshots=None):
+        """
+        Inicializa el historial.
+        
+        Args:
+            capacity (int): Generaciones preasignadas (se duplica si se supera)
+            snapshot_stride (int): Cada cuántas generaciones guardar la población completa
+                (None para no guardar instantáneas)
+            max_snapshots (int): Número máximo de instantáneas conservadas (None sin límite)
+        """
+        self.snapshot_stride = snapshot_stride
+        self.snapshots = deque(maxlen=max_snapshots)
+        self._allocate(max(1, capacity))
+    
+    def _allocate(self, capacity):
+        """Reserva los arreglos vacíos."""
+        self.size = 0
+        self._best = np.empty(capacity)
+        self._mean = np.empty(capacity)
+        self._std = np.empty(capacity)
+        self._min = np.empty(capacity)
+        self._quantiles = np.empty((capacity, len(self.QUANTILES)))
+        self._unique = np.empty(capacity, dtype=np.int64)
+    
+    def _grow(self):
+        """Duplica la capacidad conservando los datos registrados."""
+        capacity = 2 * len(self._best)
+        for nombre in ('_best', '_mean', '_std', '_min', '_quantiles', '_unique'):
+            anterior = getattr(self, nombre)
+            nuevo = np.empty((capacity,) + anterior.shape[1:], dtype=anterior.dtype)
+            nuevo[:self.size] = anterior[:self.size]
+            setattr(self, nombre, nuevo)
+    
+    def reserve(self, capacity):
+        """Asegura capacidad para al menos capacity generaciones sin reasignar."""
+        while len(self._best) < capacity:
+            self._grow()
+    
+    def clear(self):
+        """Vacía el historial conservando la capacidad reservada."""
+        self.size = 0
+        self.snapshots.clear()
+    
+    def record(self, fitness_values, genotypes=None, population=None, generation=None):
+        """
+        Registra las estadísticas de una generación.
+        
+        Args:
+            fitness_values (list): Aptitud de cada individuo
+            genotypes (iterable): Genotipos hashables de la población (para contar los distintos)
+            population (list): Población, solo necesaria si se guardan instantáneas
+            generation (int): Número de generación (por defecto, posición en el historial)
+        """
+        if self.size == len(self._best):
+            self._grow()
+        
+        i = self.size
+        fitness = np.asarray(fitness_values, dtype=float)
+        self._best[i] = fitness.max()
+        self._mean[i] = fitness.mean()
+        self._std[i] = fitness.std()
+        self._min[i] = fitness.min()
+        self._quantiles[i] = np.quantile(fitness, self.QUANTILES)
+        self._unique[i] = len(set(genotypes)) if genotypes is not None else -1
+        
+        generation = i if generation is None else generation
+        if self.snapshot_stride and generation % self.snapshot_stride == 0:
+            self.snapshots.append({
+                'generation': generation,
+                'population': list(population) if population is not None else None,
+                'fitness_values': fitness.copy()
+            })
+        self.size += 1
+    
+    def __len__(self):
+        return self.size
+    
+    @property
+    def best(self):
+        """Mejor aptitud por generación."""
+        return self._best[:self.size]
+    
+    @property
+    def mean(self):
+        """Aptitud promedio por generación."""
+        return self._mean[:self.size]
+    
+    @property
+    def std(self):
+        """Desviación estándar de la aptitud por generación."""
+        return self._std[:self.size]
+    
+    @property
+    def min(self):
+        """Peor aptitud por generación."""
+        return self._min[:self.size]
+    
+    @property
+    def quantiles(self):
+        """Cuantiles QUANTILES de la aptitud por generación (una columna por cuantil)."""
+        return self._quantiles[:self.size]
+    
+    @property
+    def unique_genotypes(self):
+        """Número de genotipos distintos por generación (-1 si no se registró)."""
+        return self._unique[:self.size]
+    
+    def get_stats(self):
+        """
+        Obtiene todas las estadísticas como listas serializables.
+        
+        Returns:
+            dict: Listas por generación de best, mean, std, min, q25, q50, q75 y unique_genotypes
+        """
+        stats = {
+            'best': self.best.tolist(),
+            'mean': self.mean.tolist(),
+            'std': self.std.tolist(),
+            'min': self.min.tolist()
+        }
+        for j, q in enumerate(self.QUANTILES):
+            stats[f'q{int(q * 100)}'] = self.quantiles[:, j].tolist()
+        stats['unique_genotypes'] = self.unique_genotypes.tolist()
+        return stats
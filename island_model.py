@@ -0,0 +1,261 @@
+import queue
+import random
+import traceback
+import multiprocessing as mp
+import numpy as np
+from models import DataModels, CompactIndividual, GenomeCatalog
+from evaluator import FitnessEvaluator
+from genetic_algorithm import GeneticAlgorithm
+
+# Segundos entre comprobaciones de que las islas siguen vivas
+_POLL_INTERVAL = 1.0
+
+def _genome(individual):
+    """Representación transportable de un individuo compacto."""
+    return (individual.montura_idx, individual.lente_idx, individual.capas_idx,
+            individual.filtros_idx, individual.fitness)
+
+def _from_genome(catalog, genome):
+    """Reconstruye un individuo compacto a partir de su representación transportable."""
+    montura_idx, lente_idx, capas_idx, filtros_idx, fitness = genome
+    individual = CompactIndividual(catalog, montura_idx, lente_idx, capas_idx, filtros_idx)
+    individual.fitness = fitness
+    return individual
+
+def _island_worker(island_id, config, inbox, outbox):
+    """
+    Proceso de una isla: evoluciona su subpoblación y cada cierto número de
+    generaciones envía sus mejores individuos y recibe inmigrantes.
+    
+    Args:
+        island_id (int): Identificador de la isla
+        config (dict): Parámetros del modelo de islas
+        inbox (Queue): Cola de inmigrantes para esta isla
+        outbox (Queue): Cola compartida hacia el proceso principal
+    """
+    try:
+        if config['seed'] is not None:
+            random.seed(config['seed'] + island_id)
+            np.random.seed(config['seed'] + island_id)
+        
+        data_models = DataModels(config['data_dir'])
+        evaluator = FitnessEvaluator(data_models, config['padecimiento'],
+                                     config['restricciones'], config['precio_objetivo'])
+        ga = GeneticAlgorithm(data_models, evaluator, config['population_size'], config['generations'],
+                              config['crossover_rate'], config['mutation_rate'], config['elitism_count'],
+                              compact_genome=True)
+        
+        ga.initialize_population(config['precio_min'], config['precio_max'])
+        ga.history.clear()
+        ga.evaluate_population()
+        
+        remaining = config['generations']
+        interval = config['migration_interval']
+        while remaining > 0:
+            for _ in range(min(interval, remaining)):
+                ga.evolve()
+            remaining -= min(interval, remaining)
+            if remaining <= 0:
+                break
+            
+            # Emigrar los mejores y esperar a los inmigrantes de esta época
+            emigrants = [_genome(ind) for ind in ga.get_top_n(config['migration_size'])]
+            outbox.put(('migrants', island_id, emigrants))
+            immigrants = inbox.get()
+            if immigrants:
+                ga.population.sort(key=lambda x: x.fitness, reverse=True)
+                keep = len(ga.population) - len(immigrants)
+                ga.population[keep:] = [_from_genome(ga.catalog, genome) for genome in immigrants]
+        
+        final = [_genome(ind) for ind in ga.get_top_n(config['top_n'])]
+        outbox.put(('final', island_id, (final, ga.best_fitness_history,
+                                          ga.avg_fitness_history)))
+    except Exception:
+        outbox.put(('error', island_id, traceback.format_exc()))
+
+class IslandModel:
+    """
+    Modelo de islas sobre GeneticAlgorithm: varias subpoblaciones evolucionan en
+    procesos independientes e intercambian sus mejores individuos periódicamente.
+    """
+    TOPOLOGIES = ('ring', 'full')
+    
+    def __init__(self, data_dir, padecimiento, restricciones=None, precio_objetivo=None,
+                 n_islands=4, migration_interval=5, migration_size=2, topology='ring',
+                 population_size=50, generations=30, crossover_rate=0.8, mutation_rate=0.2,
+                 elitism_count=2, seed=None):
+        """
+        Inicializa el modelo de islas.
+        
+        Args:
+            data_dir (str): Directorio con los CSV (cada isla carga sus propios datos)
+            padecimiento (str): Nombre del padecimiento a tratar
+            restricciones (dict): Restricciones médicas adicionales
+            precio_objetivo (tuple): Rango de precio objetivo (min, max)
+            n_islands (int): Número de islas (procesos)
+            migration_interval (int): Generaciones entre migraciones
+            migration_size (int): Mejores individuos que emigra cada isla
+            topology (str): 'ring' (cada isla envía a la siguiente) o 'full' (a todas)
+            population_size (int): Tamaño de la población de cada isla
+            generations (int): Número de generaciones
+            crossover_rate (float): Tasa de cruce (0-1)
+            mutation_rate (float): Tasa de mutación (0-1)
+            elitism_count (int): Número de individuos élite por isla
+            seed (int): Semilla base; la isla i usa seed + i
+        """
+        if topology not in self.TOPOLOGIES:
+            raise ValueError(f"Topología no soportada: {topology}")
+        
+        self.data_dir = data_dir
+        self.padecimiento = padecimiento
+        self.restricciones = restricciones or {}
+        self.precio_objetivo = precio_objetivo
+        self.n_islands = n_islands
+        self.migration_interval = max(1, migration_interval)
+        self.migration_size = migration_size
+        self.topology = topology
+        self.population_size = population_size
+        self.generations = generations
+        self.crossover_rate = crossover_rate
+        self.mutation_rate = mutation_rate
+        self.elitism_count = elitism_count
+        self.seed = seed
+        self.best_fitness_history = []
+        self.avg_fitness_history = []
+    
+    def _targets(self, island_id):
+        """Islas que reciben los emigrantes de una isla según la topología."""
+        if self.topology == 'ring':
+            return [(island_id + 1) % self.n_islands]
+        return [i for i in range(self.n_islands) if i != island_id]
+    
+    def run(self, precio_min=None, precio_max=None, top_n=5):
+        """
+        Ejecuta todas las islas y combina sus mejores soluciones.
+        
+        Args:
+            precio_min (float): Precio mínimo para los componentes
+            precio_max (float): Precio máximo para los componentes
+            top_n (int): Número de soluciones a devolver
+        
+        Returns:
+            list: Mejores individuos (sin genotipos repetidos) de todas las islas
+        """
+        config = {
+            'data_dir': self.data_dir,
+            'padecimiento': self.padecimiento,
+            'restricciones': self.restricciones,
+            'precio_objetivo': self.precio_objetivo,
+            'population_size': self.population_size,
+            'generations': self.generations,
+            'crossover_rate': self.crossover_rate,
+            'mutation_rate': self.mutation_rate,
+            'elitism_count': self.elitism_count,
+            'migration_interval': self.migration_interval,
+            'migration_size': self.migration_size,
+            'precio_min': precio_min,
+            'precio_max': precio_max,
+            'seed': self.seed,
+            'top_n': top_n
+        }
+        
+        outbox = mp.Queue()
+        inboxes = [mp.Queue() for _ in range(self.n_islands)]
+        processes = [
+            mp.Process(target=_island_worker, args=(i, config, inboxes[i], outbox), daemon=True)
+            for i in range(self.n_islands)
+        ]
+        for process in processes:
+            process.start()
+        
+        try:
+            results = self._coordinate(outbox, inboxes, processes)
+        except BaseException:
+            # Las demás islas quedarían esperando inmigrantes que ya no llegarán
+            for process in processes:
+                process.terminate()
+            raise
+        finally:
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+        
+        return self._merge(results, top_n)
+    
+    def _coordinate(self, outbox, inboxes, processes):
+        """
+        Encamina los emigrantes entre islas en cada época y recoge los resultados finales.
+        
+        Returns:
+            dict: Resultado final de cada isla
+        
+        Raises:
+            RuntimeError: Si una isla informa un error o termina sin enviar su resultado
+        """
+        max_immigrants = max(0, self.population_size - self.elitism_count)
+        results = {}
+        pending = {}
+        suspects = set()
+        
+        while len(results) < self.n_islands:
+            try:
+                kind, island_id, payload = outbox.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                # Una isla muerta sin informar (SIGKILL, falta de memoria...) no enviará nada más;
+                # se espera un intervalo más por si su último mensaje aún estaba en camino
+                dead = {i for i, process in enumerate(processes)
+                        if i not in results and not process.is_alive()}
+                if dead & suspects:
+                    i = min(dead & suspects)
+                    raise RuntimeError(f"La isla {i} terminó sin enviar su resultado "
+                                       f"(código de salida {processes[i].exitcode})")
+                suspects = dead
+                continue
+            if kind == 'error':
+                raise RuntimeError(f"Error en la isla {island_id}:\n{payload}")
+            if kind == 'final':
+                results[island_id] = payload
+                continue
+            
+            pending[island_id] = payload
+            if len(pending) == self.n_islands:
+                # Todas las islas terminaron la época: repartir según la topología
+                incoming = {i: [] for i in range(self.n_islands)}
+                for source, emigrants in pending.items():
+                    for target in self._targets(source):
+                        incoming[target].extend(emigrants)
+                for i, immigrants in incoming.items():
+                    immigrants.sort(key=lambda genome: genome[4], reverse=True)
+                    inboxes[i].put(immigrants[:max_immigrants])
+                pending = {}
+        
+        return results
+    
+    def _merge(self, results, top_n):
+        """Combina los mejores individuos y el historial de todas las islas."""
+        catalog = GenomeCatalog(DataModels(self.data_dir))
+        
+        merged = {}
+        for final, _, _ in results.values():
+            for genome in final:
+                individual = _from_genome(catalog, genome)
+                key = individual.genotype()
+                if key not in merged or merged[key].fitness < individual.fitness:
+                    merged[key] = individual
+        
+        histories = [results[i] for i in sorted(results)]
+        self.best_fitness_history = [max(values) for values in zip(*(h[1] for h in histories))]
+        self.avg_fitness_history = [sum(values) / len(values) for values in zip(*(h[2] for h in histories))]
+        
+        return sorted(merged.values(), key=lambda x: x.fitness, reverse=True)[:top_n]
+    
+    def get_evolution_stats(self):
+        """
+        Obtiene estadísticas combinadas de la evolución.
+        
+        Returns:
+            tuple: (generaciones, mejor aptitud entre islas, aptitud promedio entre islas)
+        """
+        generations = list(range(len(self.best_fitness_history)))
+        return generations, self.best_fitness_history, self.avg_fitness_history
@@ -1,39 +1,80 @@
-import pandas as pd
 import os
+from catalog import ComponentCatalog
+
+def _empty_frame():
+    """DataFrame vacío (pandas solo se importa cuando se necesita)."""
+    import pandas as pd
+    return pd.DataFrame()
 
 class DataModels:
     """
     Clase para manejar los modelos de datos del sistema OptiLens.
     Carga y proporciona acceso a los diferentes conjuntos de datos necesarios.
+    Los datos se leen de una instantánea binaria del catálogo mientras los CSV no
+    cambien; los DataFrames se construyen solo cuando se accede a ellos.
     """
-    def __init__(self, data_dir='data'):
+    def __init__(self, data_dir='data', use_snapshot=True):
         """
         Inicializa el modelo de datos cargando los CSV desde el directorio especificado.
         
         Args:
             data_dir (str): Directorio donde se encuentran los archivos CSV
+            use_snapshot (bool): Si es False, siempre se leen los CSV sin usar la instantánea
         """
         self.data_dir = data_dir
-        self.padecimientos = None
-        self.monturas = None
-        self.lentes = None
-        self.capas = None
-        self.filtros = None
+        self.use_snapshot = use_snapshot
+        self.version = 0
+        self._catalog = None
+        self._frames = {}
+        self._records_cache = {}
         self.load_data()
     
     def load_data(self):
         """Carga todos los archivos CSV necesarios."""
+        # El catálogo, los DataFrames y los registros memorizados dejan de ser válidos al recargar
+        self.version += 1
+        self._catalog = None
+        self._frames = {}
+        self._records_cache = {}
         try:
-            self.padecimientos = pd.read_csv(os.path.join(self.data_dir, 'padecimientos.csv'))
-            self.monturas = pd.read_csv(os.path.join(self.data_dir, 'monturas.csv'))
-            self.lentes = pd.read_csv(os.path.join(self.data_dir, 'lentes.csv'))
-            self.capas = pd.read_csv(os.path.join(self.data_dir, 'capas.csv'))
-            self.filtros = pd.read_csv(os.path.join(self.data_dir, 'filtros.csv'))
+            self._catalog = ComponentCatalog.load(self.data_dir, use_snapshot=self.use_snapshot)
             return True
         except Exception as e:
             print(f"Error al cargar los datos: {e}")
             return False
     
+    @property
+    def padecimientos(self):
+        """DataFrame de padecimientos."""
+        return self._frame('padecimientos')
+    
+    @property
+    def monturas(self):
+        """DataFrame de monturas."""
+        return self._frame('monturas')
+    
+    @property
+    def lentes(self):
+        """DataFrame de lentes."""
+        return self._frame('lentes')
+    
+    @property
+    def capas(self):
+        """DataFrame de capas."""
+        return self._frame('capas')
+    
+    @property
+    def filtros(self):
+        """DataFrame de filtros."""
+        return self._frame('filtros')
+    
+    def _frame(self, nombre):
+        """Construye (una sola vez por carga) el DataFrame de una tabla del catálogo."""
+        if nombre not in self._frames:
+            table = self._catalog.tables.get(nombre) if self._catalog is not None else None
+            self._frames[nombre] = table.to_dataframe() if table is not None else None
+        return self._frames[nombre]
+    
     def get_padecimiento_data(self, nombre_padecimiento):
         """
         Obtiene datos específicos de un padecimiento.
@@ -44,15 +85,63 @@ class DataModels:
         Returns:
             dict: Datos del padecimiento o None si no se encuentra
         """
-        if self.padecimientos is not None:
+        table = self._catalog.padecimientos if self._catalog is not None else None
+        if table is not None:
             try:
-                padecimiento = self.padecimientos[self.padecimientos['nombre_padecimiento'] == nombre_padecimiento]
-                if not padecimiento.empty:
-                    return padecimiento.iloc[0].to_dict()
+                i = table.find('nombre_padecimiento', nombre_padecimiento)
+                if i >= 0:
+                    return table.row(i)
             except Exception as e:
                 print(f"Error al buscar padecimiento: {e}")
         return None
     
+    def available_indices(self, componente, tipos=None, materiales=None, min_precio=None, max_precio=None):
+        """
+        Obtiene las posiciones de las filas disponibles de un componente que cumplen
+        los criterios, calculadas sobre el catálogo columnar y memorizadas por
+        argumentos hasta recargar los datos.
+        
+        Args:
+            componente (str): 'monturas', 'lentes', 'capas' o 'filtros'
+            tipos (list): Lista de tipos permitidos (monturas, capas y filtros)
+            materiales (list): Lista de materiales permitidos (solo monturas)
+            min_precio (float): Precio mínimo
+            max_precio (float): Precio máximo
+        
+        Returns:
+            ndarray: Posiciones de las filas (de solo lectura)
+        """
+        return self.get_catalog().available_indices(componente, tipos, materiales, min_precio, max_precio)
+    
+    def get_catalog(self):
+        """
+        Obtiene el catálogo columnar y tipado de los componentes (uno por carga de datos).
+            
+        Returns:
+            ComponentCatalog: Catálogo de monturas, lentes, capas y filtros
+        """
+        if self._catalog is None:
+            return ComponentCatalog({})
+        return self._catalog
+    
+    def get_records(self, componente):
+        """
+        Obtiene las filas de un componente como lista de diccionarios (memorizada
+        hasta recargar los datos). Los diccionarios son compartidos: no modificarlos.
+        
+        Args:
+            componente (str): 'monturas', 'lentes', 'capas' o 'filtros'
+        
+        Returns:
+            list: Registros en el orden del CSV
+        """
+        records = self._records_cache.get(componente)
+        if records is None:
+            table = self.get_catalog().tables.get(componente)
+            records = table.records() if table is not None else []
+            self._records_cache[componente] = records
+        return records
+    
     def get_available_monturas(self, tipos=None, materiales=None, min_precio=None, max_precio=None):
         """
         Filtra monturas disponibles según criterios.
@@ -67,26 +156,9 @@ class DataModels:
             DataFrame: Monturas filtradas
         """
         if self.monturas is None:
-            return pd.DataFrame()
-        
-        filtered_monturas = self.monturas.copy()
-        
-        if tipos:
-            filtered_monturas = filtered_monturas[filtered_monturas['tipo_montura'].isin(tipos)]
-        
-        if materiales:
-            filtered_monturas = filtered_monturas[filtered_monturas['material_armazon'].isin(materiales)]
+            return _empty_frame()
         
-        if min_precio is not None:
-            filtered_monturas = filtered_monturas[filtered_monturas['precio_montura'] >= min_precio]
-        
-        if max_precio is not None:
-            filtered_monturas = filtered_monturas[filtered_monturas['precio_montura'] <= max_precio]
-        
-        # Filtrar por disponibilidad
-        filtered_monturas = filtered_monturas[filtered_monturas['disponibilidad_montura'] != 'Baja']
-        
-        return filtered_monturas
+        return self.monturas.iloc[self.available_indices('monturas', tipos, materiales, min_precio, max_precio)]
     
     def get_available_lentes(self, min_precio=None, max_precio=None):
         """
@@ -100,20 +172,9 @@ class DataModels:
             DataFrame: Lentes filtrados
         """
         if self.lentes is None:
-            return pd.DataFrame()
-        
-        filtered_lentes = self.lentes.copy()
+            return _empty_frame()
         
-        if min_precio is not None:
-            filtered_lentes = filtered_lentes[filtered_lentes['precio_lente'] >= min_precio]
-        
-        if max_precio is not None:
-            filtered_lentes = filtered_lentes[filtered_lentes['precio_lente'] <= max_precio]
-        
-        # Filtrar por disponibilidad
-        filtered_lentes = filtered_lentes[filtered_lentes['disponibilidad_lente'] != 'Baja']
-        
-        return filtered_lentes
+        return self.lentes.iloc[self.available_indices('lentes', min_precio=min_precio, max_precio=max_precio)]
     
     def get_available_capas(self, tipos=None, min_precio=None, max_precio=None):
         """
@@ -128,23 +189,9 @@ class DataModels:
             DataFrame: Capas filtradas
         """
         if self.capas is None:
-            return pd.DataFrame()
-        
-        filtered_capas = self.capas.copy()
+            return _empty_frame()
         
-        if tipos:
-            filtered_capas = filtered_capas[filtered_capas['tipo_capa'].isin(tipos)]
-        
-        if min_precio is not None:
-            filtered_capas = filtered_capas[filtered_capas['precio_capa'] >= min_precio]
-        
-        if max_precio is not None:
-            filtered_capas = filtered_capas[filtered_capas['precio_capa'] <= max_precio]
-        
-        # Filtrar por disponibilidad
-        filtered_capas = filtered_capas[filtered_capas['disponibilidad_capa'] != 'Baja']
-        
-        return filtered_capas
+        return self.capas.iloc[self.available_indices('capas', tipos, min_precio=min_precio, max_precio=max_precio)]
     
     def get_available_filtros(self, tipos=None, min_precio=None, max_precio=None):
         """
@@ -159,23 +206,9 @@ class DataModels:
             DataFrame: Filtros disponibles
         """
         if self.filtros is None:
-            return pd.DataFrame()
-        
-        filtered_filtros = self.filtros.copy()
-        
-        if tipos:
-            filtered_filtros = filtered_filtros[filtered_filtros['tipo_filtro'].isin(tipos)]
-        
-        if min_precio is not None:
-            filtered_filtros = filtered_filtros[filtered_filtros['precio_filtro'] >= min_precio]
+            return _empty_frame()
         
-        if max_precio is not None:
-            filtered_filtros = filtered_filtros[filtered_filtros['precio_filtro'] <= max_precio]
-        
-        # Filtrar por disponibilidad
-        filtered_filtros = filtered_filtros[filtered_filtros['disponibilidad_filtro'] != 'Baja']
-        
-        return filtered_filtros
+        return self.filtros.iloc[self.available_indices('filtros', tipos, min_precio=min_precio, max_precio=max_precio)]
 
 class Individual:
     """
@@ -224,6 +257,20 @@ class Individual:
         self.precio_total = precio
         return precio
     
+    def genotype(self):
+        """
+        Genotipo canónico del individuo.
+        
+        Returns:
+            tuple: (id montura, id lente, ids de capas ordenados, ids de filtros ordenados)
+        """
+        return (
+            self.montura.get('id_montura') if self.montura else None,
+            self.lente.get('id_lente') if self.lente else None,
+            tuple(sorted(capa.get('id_capa') for capa in self.capas)),
+            tuple(sorted(filtro.get('id_filtro') for filtro in self.filtros))
+        )
+    
     def to_dict(self):
         """
         Convierte el individuo a un diccionario.
@@ -255,3 +302,201 @@ class Individual:
                 f"Precio Total: ${self.precio_total:.2f}\n"
                 f"Aptitud: {self.fitness:.2f}")
 
+class GenomeCatalog:
+    """
+    Catálogo compartido de componentes para la representación compacta.
+    Cada componente se guarda una sola vez como diccionario y los individuos
+    compactos solo almacenan índices hacia estas listas.
+    """
+    def __init__(self, data_models):
+        """
+        Construye el catálogo a partir de los datos cargados.
+        
+        Args:
+            data_models (DataModels): Instancia del modelo de datos
+        """
+        self.monturas = data_models.get_records('monturas')
+        self.lentes = data_models.get_records('lentes')
+        self.capas = data_models.get_records('capas')
+        self.filtros = data_models.get_records('filtros')
+        
+        # Versión de los datos con la que se construyó (ver DataModels.load_data)
+        self.version = data_models.version
+        self.components = data_models.get_catalog()
+        components = self.components
+        
+        # Precios por índice para calcular el precio total sin acceder a los diccionarios
+        self.precio_montura = self._column(components.monturas, 'precio_montura')
+        self.precio_lente = self._column(components.lentes, 'precio_lente')
+        self.precio_capa = self._column(components.capas, 'precio_capa')
+        self.precio_filtro = self._column(components.filtros, 'precio_filtro')
+        
+        # Identificadores por índice para construir genotipos canónicos
+        self.id_montura = components.monturas.ids.tolist() if components.monturas is not None else []
+        self.id_lente = components.lentes.ids.tolist() if components.lentes is not None else []
+        self.id_capa = components.capas.ids.tolist() if components.capas is not None else []
+        self.id_filtro = components.filtros.ids.tolist() if components.filtros is not None else []
+        
+        # Tipos usados por el cruce para evitar capas y filtros repetidos
+        self.tipo_capa = components.capas.labels('tipo_capa') if components.capas is not None else []
+        self.tipo_filtro = components.filtros.labels('tipo_filtro') if components.filtros is not None else []
+        
+        # Listas de índices disponibles memorizadas por argumentos (la mutación las consulta a cada paso)
+        self._indices = {}
+    
+    @staticmethod
+    def _column(table, columna):
+        """Columna numérica de una tabla del catálogo como lista de Python."""
+        return table.numeric[columna].tolist() if table is not None else []
+    
+    def available_indices(self, componente, min_precio=None, max_precio=None):
+        """
+        Obtiene los índices de componentes disponibles dentro de un rango de precio.
+        
+        Args:
+            componente (str): 'monturas', 'lentes', 'capas' o 'filtros'
+            min_precio (float): Precio mínimo
+            max_precio (float): Precio máximo
+            
+        Returns:
+            list: Índices de los componentes que cumplen los criterios (compartida, no modificar)
+        """
+        key = (componente, min_precio, max_precio)
+        indices = self._indices.get(key)
+        if indices is None:
+            indices = self.components.available_indices(componente, min_precio=min_precio,
+                                                        max_precio=max_precio).tolist()
+            self._indices[key] = indices
+        return indices
+
+class CompactIndividual:
+    """
+    Configuración de lentes con representación compacta (genoma entero).
+    Guarda el índice de la montura y del lente, y tuplas de índices de capas y
+    filtros, todos referidos a un GenomeCatalog compartido. Un índice -1 indica
+    que no hay componente.
+    """
+    __slots__ = ('catalog', 'montura_idx', 'lente_idx', 'capas_idx', 'filtros_idx',
+                 'fitness', 'precio_total')
+    
+    def __init__(self, catalog, montura_idx=-1, lente_idx=-1, capas_idx=(), filtros_idx=()):
+        """
+        Inicializa un individuo compacto.
+        
+        Args:
+            catalog (GenomeCatalog): Catálogo compartido de componentes
+            montura_idx (int): Índice de la montura (-1 si no hay)
+            lente_idx (int): Índice del lente (-1 si no hay)
+            capas_idx (tuple): Índices de las capas seleccionadas
+            filtros_idx (tuple): Índices de los filtros seleccionados
+        """
+        self.catalog = catalog
+        self.montura_idx = montura_idx
+        self.lente_idx = lente_idx
+        self.capas_idx = tuple(capas_idx)
+        self.filtros_idx = tuple(filtros_idx)
+        self.fitness = 0
+        self.precio_total = 0
+        self.calculate_precio_total()
+    
+    @property
+    def montura(self):
+        """Diccionario de la montura (compartido con el catálogo, no modificar)."""
+        return self.catalog.monturas[self.montura_idx] if self.montura_idx >= 0 else {}
+    
+    @property
+    def lente(self):
+        """Diccionario del lente (compartido con el catálogo, no modificar)."""
+        return self.catalog.lentes[self.lente_idx] if self.lente_idx >= 0 else {}
+    
+    @property
+    def capas(self):
+        """Lista de diccionarios de las capas seleccionadas."""
+        return [self.catalog.capas[i] for i in self.capas_idx]
+    
+    @property
+    def filtros(self):
+        """Lista de diccionarios de los filtros seleccionados."""
+        return [self.catalog.filtros[i] for i in self.filtros_idx]
+    
+    def calculate_precio_total(self):
+        """Calcula el precio total de la configuración."""
+        catalog = self.catalog
+        precio = 0
+        
+        if self.montura_idx >= 0:
+            precio += catalog.precio_montura[self.montura_idx]
+        
+        if self.lente_idx >= 0:
+            precio += catalog.precio_lente[self.lente_idx]
+        
+        for i in self.capas_idx:
+            precio += catalog.precio_capa[i]
+        
+        for i in self.filtros_idx:
+            precio += catalog.precio_filtro[i]
+        
+        self.precio_total = precio
+        return precio
+    
+    def genotype(self):
+        """
+        Genotipo canónico del individuo (mismo formato que Individual.genotype).
+        
+        Returns:
+            tuple: (id montura, id lente, ids de capas ordenados, ids de filtros ordenados)
+        """
+        catalog = self.catalog
+        return (
+            catalog.id_montura[self.montura_idx] if self.montura_idx >= 0 else None,
+            catalog.id_lente[self.lente_idx] if self.lente_idx >= 0 else None,
+            tuple(sorted(catalog.id_capa[i] for i in self.capas_idx)),
+            tuple(sorted(catalog.id_filtro[i] for i in self.filtros_idx))
+        )
+    
+    def copy(self):
+        """
+        Crea una copia del individuo. Las tuplas de índices son inmutables,
+        por lo que se comparten sin copiar.
+        
+        Returns:
+            CompactIndividual: Copia del individuo con la misma aptitud
+        """
+        clone = CompactIndividual.__new__(CompactIndividual)
+        clone.catalog = self.catalog
+        clone.montura_idx = self.montura_idx
+        clone.lente_idx = self.lente_idx
+        clone.capas_idx = self.capas_idx
+        clone.filtros_idx = self.filtros_idx
+        clone.fitness = self.fitness
+        clone.precio_total = self.precio_total
+        return clone
+    
+    def to_individual(self):
+        """
+        Materializa el individuo con copias de los diccionarios de componentes.
+        
+        Returns:
+            Individual: Individuo equivalente con representación completa
+        """
+        individual = Individual(
+            self.montura.copy() if self.montura_idx >= 0 else None,
+            self.lente.copy() if self.lente_idx >= 0 else None,
+            [capa.copy() for capa in self.capas],
+            [filtro.copy() for filtro in self.filtros]
+        )
+        individual.fitness = self.fitness
+        return individual
+    
+    def to_dict(self):
+        """
+        Convierte el individuo a un diccionario.
+        
+        Returns:
+            dict: Representación del individuo como diccionario
+        """
+        return self.to_individual().to_dict()
+    
+    def __str__(self):
+        """Representación en cadena del individuo."""
+        return str(self.to_individual())
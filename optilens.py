@@ -0,0 +1,476 @@
+"""
+Punto de entrada de línea de comandos de OptiLens (sin interfaz gráfica).
+
+Ejemplos:
+    python -m optilens padecimientos
+    python -m optilens optimize --padecimiento Miopía --restriccion screen_time --seed 1
+    python -m optilens optimize --padecimiento Fotofobia --format csv --output resultados.csv
+    python -m optilens batch --input solicitudes.jsonl --workers 4 --output resultados.jsonl
+    python -m optilens serve --port 8765 --workers 4
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import random
+import sys
+import numpy as np
+from models import DataModels, CompactIndividual
+from evaluator import FitnessEvaluator
+from genetic_algorithm import GeneticAlgorithm
+from result_cache import ResultCache, RESULT_CACHE_DIR
+
+RESTRICCIONES = ('light_sensitivity', 'screen_time', 'outdoor_activities', 'night_driving')
+
+# Mismos valores iniciales que la interfaz gráfica
+DEFAULTS = {
+    'precio_min': 200,
+    'precio_max': 800,
+    'population_size': 100,
+    'generations': 50,
+    'crossover_rate': 0.8,
+    'mutation_rate': 0.05,
+    'elitism_count': 10,
+    'patience': None,
+    'target_fitness': None,
+    'max_time': None,
+    'exhaustive_threshold': None,
+    'n_workers': None,
+    'seed': None,
+    'top': 5,
+    'unique': False
+}
+
+CSV_FIELDS = ['rank', 'fitness', 'precio_total', 'id_montura', 'tipo_montura', 'material_armazon',
+              'id_lente', 'forma_lente', 'indice_refraccion', 'capas', 'tipos_capa', 'filtros', 'tipos_filtro']
+
+def normalize_params(params):
+    """
+    Completa y valida los parámetros de una optimización.
+    
+    Args:
+        params (dict): Parámetros parciales; 'restricciones' puede ser una lista de
+            nombres de RESTRICCIONES o un diccionario {nombre: bool}
+    
+    Returns:
+        dict: Parámetros completos con 'restricciones' como lista ordenada
+    """
+    params = {**DEFAULTS, **params}
+    if not params.get('padecimiento'):
+        raise ValueError("Falta el padecimiento")
+    
+    seleccion = params.get('restricciones') or []
+    if isinstance(seleccion, dict):
+        seleccion = [r for r, activa in seleccion.items() if activa]
+    desconocidas = [r for r in seleccion if r not in RESTRICCIONES]
+    if desconocidas:
+        raise ValueError(f"Restricciones no soportadas: {', '.join(desconocidas)}")
+    params['restricciones'] = sorted(set(seleccion))
+    return params
+
+def build_evaluator(data_models, params, cache=None):
+    """
+    Crea el evaluador de aptitud para unos parámetros ya normalizados.
+    
+    Args:
+        data_models (DataModels): Datos cargados
+        params (dict): Parámetros devueltos por normalize_params()
+        cache (FitnessCache): Caché compartida (por defecto, una propia de 20000 entradas)
+    
+    Returns:
+        FitnessEvaluator: Evaluador con sus tablas precalculadas
+    """
+    if data_models.get_padecimiento_data(params['padecimiento']) is None:
+        raise ValueError(f"Padecimiento no encontrado: {params['padecimiento']}")
+    restricciones = {r: r in params['restricciones'] for r in RESTRICCIONES}
+    return FitnessEvaluator(data_models, params['padecimiento'], restricciones,
+                            (params['precio_min'], params['precio_max']),
+                            cache_size=20000, cache=cache)
+
+def optimize(data_models, params, callback=None, cancel_event=None, evaluator=None, catalog=None,
+             cache=None):
+    """
+    Ejecuta una optimización con la misma secuencia que la interfaz gráfica
+    (FitnessEvaluator + GeneticAlgorithm con genoma compacto).
+    
+    Args:
+        data_models (DataModels): Datos cargados
+        params (dict): Parámetros de la optimización (ver DEFAULTS); 'padecimiento'
+            es obligatorio y 'restricciones' es una lista de nombres de RESTRICCIONES
+        callback (callable): Progreso por generación (ver GeneticAlgorithm.run)
+        cancel_event (threading.Event): Evento externo de cancelación
+        evaluator (FitnessEvaluator): Evaluador ya construido para estos parámetros
+            (permite reutilizar sus tablas entre optimizaciones)
+        catalog (GenomeCatalog): Catálogo compartido entre optimizaciones
+        cache (ResultCache): Caché de resultados; una solicitud idéntica sobre el mismo
+            catálogo devuelve el resultado almacenado sin volver a optimizar
+    
+    Returns:
+        dict: Resultado serializable en JSON ('cached' indica si provino de la caché)
+    """
+    params = normalize_params(params)
+    key = None
+    if cache is not None:
+        key = cache.make_key(params, data_models.get_catalog().content_hash())
+        result = cache.get(key)
+        if result is not None:
+            result['cached'] = True
+            return result
+    
+    if evaluator is None:
+        evaluator = build_evaluator(data_models, params)
+    
+    if params['seed'] is not None:
+        random.seed(params['seed'])
+        np.random.seed(params['seed'])
+    
+    precio_min, precio_max = params['precio_min'], params['precio_max']
+    ga = GeneticAlgorithm(
+        data_models,
+        evaluator,
+        params['population_size'],
+        params['generations'],
+        params['crossover_rate'],
+        params['mutation_rate'],
+        params['elitism_count'],
+        compact_genome=True,
+        n_workers=params['n_workers'],
+        patience=params['patience'],
+        target_fitness=params['target_fitness'],
+        max_time=params['max_time'],
+        exhaustive_threshold=params['exhaustive_threshold']
+    )
+    ga.catalog = catalog
+    ga.run(precio_min, precio_max, callback=callback, cancel_event=cancel_event)
+    
+    solutions = ga.get_top_n(len(ga.population) if params['unique'] else params['top'])
+    if params['unique']:
+        vistos = set()
+        unicas = []
+        for solution in solutions:
+            if solution.genotype() not in vistos:
+                vistos.add(solution.genotype())
+                unicas.append(solution)
+        solutions = unicas[:params['top']]
+    
+    result = result_from_ga(ga, params, solutions)
+    if key is not None and ga.stop_reason != 'cancelled':
+        cache.put(key, result)
+    result['cached'] = False
+    return result
+
+def result_from_ga(ga, params, solutions):
+    """
+    Resume una ejecución del algoritmo genético como resultado serializable.
+    
+    Args:
+        ga (GeneticAlgorithm): Algoritmo ya ejecutado
+        params (dict): Parámetros normalizados de la optimización
+        solutions (list): Soluciones a incluir, de mejor a peor
+    
+    Returns:
+        dict: Resultado serializable en JSON
+    """
+    generations, best_history, avg_history = ga.get_evolution_stats()
+    return {
+        'padecimiento': params['padecimiento'],
+        'restricciones': params['restricciones'],
+        'precio_min': params['precio_min'],
+        'precio_max': params['precio_max'],
+        'seed': params['seed'],
+        'stop_reason': ga.stop_reason,
+        'generations': ga.current_generation,
+        'elapsed_time': ga.elapsed_time,
+        'best_fitness_history': [float(v) for v in best_history],
+        'avg_fitness_history': [float(v) for v in avg_history],
+        'solutions': [solution_to_dict(solution, rank) for rank, solution in enumerate(solutions, 1)]
+    }
+
+def solutions_from_result(result, catalog):
+    """
+    Reconstruye las soluciones de un resultado como individuos compactos.
+    
+    Args:
+        result (dict): Resultado de optimize() o result_from_ga()
+        catalog (GenomeCatalog): Catálogo del mismo contenido que el de la optimización
+    
+    Returns:
+        list: Individuos compactos con su aptitud
+    """
+    solutions = []
+    for solution in result['solutions']:
+        montura_idx, lente_idx, capas_idx, filtros_idx = solution['genome']
+        individual = CompactIndividual(catalog, montura_idx, lente_idx, tuple(capas_idx), tuple(filtros_idx))
+        individual.fitness = solution['fitness']
+        solutions.append(individual)
+    return solutions
+
+def _clean(value):
+    """Convierte valores no representables en JSON (NaN, tipos de NumPy) a tipos de Python."""
+    if isinstance(value, dict):
+        return {k: _clean(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_clean(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+def solution_to_dict(solution, rank):
+    """
+    Convierte una solución en un diccionario serializable.
+    
+    Args:
+        solution (Individual | CompactIndividual): Solución encontrada
+        rank (int): Posición en el ranking (1 = mejor)
+    
+    Returns:
+        dict: Solución con aptitud, precio y datos completos de cada componente
+            (y su genoma de índices si es un individuo compacto)
+    """
+    data = {
+        'rank': rank,
+        'fitness': float(solution.fitness),
+        'precio_total': float(solution.precio_total),
+        'montura': solution.montura or None,
+        'lente': solution.lente or None,
+        'capas': solution.capas,
+        'filtros': solution.filtros
+    }
+    if isinstance(solution, CompactIndividual):
+        data['genome'] = [solution.montura_idx, solution.lente_idx,
+                          list(solution.capas_idx), list(solution.filtros_idx)]
+    return _clean(data)
+
+def _csv_row(solution):
+    """Fila plana de una solución para la salida CSV."""
+    montura = solution['montura'] or {}
+    lente = solution['lente'] or {}
+    return {
+        'rank': solution['rank'],
+        'fitness': solution['fitness'],
+        'precio_total': solution['precio_total'],
+        'id_montura': montura.get('id_montura', ''),
+        'tipo_montura': montura.get('tipo_montura', ''),
+        'material_armazon': montura.get('material_armazon', ''),
+        'id_lente': lente.get('id_lente', ''),
+        'forma_lente': lente.get('forma_lente', ''),
+        'indice_refraccion': lente.get('indice_refraccion', ''),
+        'capas': ';'.join(str(c.get('id_capa', '')) for c in solution['capas']),
+        'tipos_capa': ';'.join(str(c.get('tipo_capa', '')) for c in solution['capas']),
+        'filtros': ';'.join(str(f.get('id_filtro', '')) for f in solution['filtros']),
+        'tipos_filtro': ';'.join(str(f.get('tipo_filtro', '')) for f in solution['filtros'])
+    }
+
+def write_results(results, fmt, stream, lines=False):
+    """
+    Escribe uno o varios resultados en JSON o CSV a medida que se producen.
+    
+    Args:
+        results (iterable): Resultados devueltos por optimize() (puede ser un generador)
+        fmt (str): 'json' o 'csv'
+        stream (file): Flujo de salida
+        lines (bool): En JSON, escribir un documento por línea (JSONL) en lugar de
+            un único documento con sangría
+    """
+    writer = None
+    for result in results:
+        if fmt == 'csv':
+            if writer is None:
+                writer = csv.DictWriter(stream, fieldnames=['padecimiento'] + CSV_FIELDS)
+                writer.writeheader()
+            for solution in result.get('solutions', []):
+                writer.writerow({'padecimiento': result['padecimiento'], **_csv_row(solution)})
+        elif lines:
+            stream.write(json.dumps(result, ensure_ascii=False) + '\n')
+        else:
+            json.dump(result, stream, ensure_ascii=False, indent=2)
+            stream.write('\n')
+        stream.flush()
+
+def _open_output(path):
+    """Flujo de salida: archivo indicado o salida estándar si es '-' o no se indica."""
+    if not path or path == '-':
+        return sys.stdout, False
+    return open(path, 'w', encoding='utf-8', newline=''), True
+
+def _add_ga_arguments(parser, workers=True):
+    """Agrega los parámetros comunes del algoritmo genético a un subcomando."""
+    ga = parser.add_argument_group('algoritmo genético')
+    ga.add_argument('--population-size', type=int, default=DEFAULTS['population_size'])
+    ga.add_argument('--generations', type=int, default=DEFAULTS['generations'])
+    ga.add_argument('--crossover-rate', type=float, default=DEFAULTS['crossover_rate'])
+    ga.add_argument('--mutation-rate', type=float, default=DEFAULTS['mutation_rate'])
+    ga.add_argument('--elitism-count', type=int, default=DEFAULTS['elitism_count'])
+    ga.add_argument('--patience', type=int, help='Generaciones sin mejora antes de detener')
+    ga.add_argument('--target-fitness', type=float, help='Detener al alcanzar esta aptitud')
+    ga.add_argument('--max-time', type=float, help='Tiempo máximo por optimización (segundos)')
+    ga.add_argument('--exhaustive-threshold', type=int,
+                    help='Enumerar de forma exacta si el espacio no supera este tamaño')
+    if workers:
+        ga.add_argument('--workers', dest='n_workers', type=int, help='Procesos para evaluar la población')
+
+def _add_output_arguments(parser):
+    """Agrega las opciones de salida a un subcomando."""
+    parser.add_argument('--top', type=int, default=DEFAULTS['top'], help='Número de soluciones a devolver')
+    parser.add_argument('--unique', action='store_true', help='Omitir soluciones con genotipo repetido')
+    parser.add_argument('--format', choices=('json', 'csv'), default='json')
+    parser.add_argument('--output', '-o', help="Archivo de salida (por defecto, salida estándar)")
+
+def _add_cache_arguments(parser):
+    """Agrega las opciones de la caché de resultados a un subcomando."""
+    cache = parser.add_argument_group('caché de resultados')
+    cache.add_argument('--cache-dir', help=f"Directorio de la caché (por defecto, <data-dir>/{RESULT_CACHE_DIR})")
+    cache.add_argument('--cache-size', type=float, default=64, help='Tamaño máximo de la caché (MB)')
+    cache.add_argument('--no-cache', action='store_true', help='No consultar ni guardar resultados en caché')
+
+def build_parser():
+    """
+    Construye el analizador de argumentos con sus subcomandos.
+    
+    Returns:
+        ArgumentParser: Analizador de la línea de comandos
+    """
+    parser = argparse.ArgumentParser(prog='optilens', description='OptiLens sin interfaz gráfica')
+    parser.add_argument('--data-dir', default='data', help='Directorio con los CSV')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    subparsers.add_parser('padecimientos', help='Listar los padecimientos disponibles')
+    
+    opt = subparsers.add_parser('optimize', help='Ejecutar una optimización')
+    opt.add_argument('--padecimiento', required=True)
+    opt.add_argument('--restriccion', dest='restricciones', action='append', choices=RESTRICCIONES,
+                     default=[], help='Restricción médica adicional (se puede repetir)')
+    opt.add_argument('--precio-min', type=float, default=DEFAULTS['precio_min'])
+    opt.add_argument('--precio-max', type=float, default=DEFAULTS['precio_max'])
+    opt.add_argument('--seed', type=int, help='Semilla para resultados reproducibles')
+    _add_ga_arguments(opt)
+    _add_output_arguments(opt)
+    _add_cache_arguments(opt)
+    
+    bat = subparsers.add_parser('batch', help='Optimizar un lote de solicitudes JSONL')
+    bat.add_argument('--input', '-i', default='-',
+                     help="Archivo JSONL o arreglo JSON de solicitudes (por defecto, entrada estándar)")
+    bat.add_argument('--workers', dest='batch_workers', type=int,
+                     help='Procesos del lote (por defecto, número de CPUs)')
+    bat.add_argument('--unordered', action='store_true',
+                     help='Entregar los resultados a medida que terminan en lugar de en orden de entrada')
+    bat.add_argument('--precio-min', type=float, default=DEFAULTS['precio_min'])
+    bat.add_argument('--precio-max', type=float, default=DEFAULTS['precio_max'])
+    bat.add_argument('--seed', type=int, help='Semilla base (cada solicitud sin semilla usa seed + índice)')
+    _add_ga_arguments(bat, workers=False)
+    _add_output_arguments(bat)
+    _add_cache_arguments(bat)
+    
+    srv = subparsers.add_parser('serve', help='Servicio HTTP local con los datos precargados')
+    srv.add_argument('--host', default='127.0.0.1')
+    srv.add_argument('--port', type=int, default=8765)
+    srv.add_argument('--workers', dest='service_workers', type=int,
+                     help='Procesos del servicio (por defecto, número de CPUs)')
+    srv.add_argument('--max-queue', type=int, help='Solicitudes en espera antes de responder 503')
+    srv.add_argument('--timeout', type=float, help='Segundos máximos por solicitud')
+    srv.add_argument('--precio-min', type=float, default=DEFAULTS['precio_min'])
+    srv.add_argument('--precio-max', type=float, default=DEFAULTS['precio_max'])
+    _add_ga_arguments(srv, workers=False)
+    srv.add_argument('--top', type=int, default=DEFAULTS['top'], help='Número de soluciones a devolver')
+    srv.add_argument('--unique', action='store_true', help='Omitir soluciones con genotipo repetido')
+    _add_cache_arguments(srv)
+    
+    return parser
+
+def _params(args):
+    """Parámetros de optimize() a partir de los argumentos del subcomando."""
+    return {key: getattr(args, key) for key in list(DEFAULTS) + ['padecimiento', 'restricciones']
+            if hasattr(args, key)}
+
+def _result_cache(args):
+    """Caché de resultados según los argumentos (None si está desactivada)."""
+    if args.no_cache:
+        return None
+    path = args.cache_dir or os.path.join(args.data_dir, RESULT_CACHE_DIR)
+    return ResultCache(path, int(args.cache_size * 1024 * 1024))
+
+def _open_input(path):
+    """Flujo de entrada: archivo indicado o entrada estándar si es '-'."""
+    if not path or path == '-':
+        return sys.stdin, False
+    return open(path, encoding='utf-8'), True
+
+def _run_batch(args):
+    """Ejecuta el subcomando batch escribiendo cada resultado en cuanto está listo."""
+    from batch import BatchOptimizer, read_requests
+    
+    defaults = _params(args)
+    defaults.pop('seed')
+    errors = []
+    
+    def report(results):
+        for result in results:
+            if 'error' in result:
+                errors.append(result['index'])
+                print(f"Error en la solicitud {result['index']}: {result['error']}", file=sys.stderr)
+                if args.format == 'csv':
+                    continue
+            yield result
+    
+    source, close_source = _open_input(args.input)
+    stream, close = _open_output(args.output)
+    try:
+        with BatchOptimizer(args.data_dir, args.batch_workers, defaults, seed=args.seed,
+                            result_cache=_result_cache(args)) as batch:
+            results = batch.run(read_requests(source), ordered=not args.unordered)
+            write_results(report(results), args.format, stream, lines=True)
+    finally:
+        if close_source:
+            source.close()
+        if close:
+            stream.close()
+    return 1 if errors else 0
+
+def main(argv=None):
+    """
+    Ejecuta la línea de comandos.
+    
+    Args:
+        argv (list): Argumentos (por defecto, sys.argv[1:])
+    
+    Returns:
+        int: Código de salida
+    """
+    args = build_parser().parse_args(argv)
+    if args.command == 'batch':
+        return _run_batch(args)
+    if args.command == 'serve':
+        from service import OptimizationService, serve
+        service = OptimizationService(args.data_dir, args.service_workers, args.max_queue,
+                                      _params(args), request_timeout=args.timeout,
+                                      result_cache=_result_cache(args))
+        service.warmup()
+        serve(service, args.host, args.port)
+        return 0
+    
+    data_models = DataModels(args.data_dir)
+    if args.command == 'padecimientos':
+        table = data_models.get_catalog().padecimientos
+        for nombre in (table.values('nombre_padecimiento') if table is not None else []):
+            print(nombre)
+        return 0
+    
+    try:
+        result = optimize(data_models, _params(args), cache=_result_cache(args))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    
+    stream, close = _open_output(args.output)
+    try:
+        write_results([result], args.format, stream)
+    finally:
+        if close:
+            stream.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
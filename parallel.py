@@ -0,0 +1,83 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# Tablas de puntuación del proceso trabajador (se reciben una sola vez al iniciar)
+_worker_tables = None
+
+def _init_worker(tables):
+    """
+    Inicializa un proceso trabajador con las tablas precalculadas del evaluador.
+    
+    Args:
+        tables (ScoreTables): Tablas de puntuación por componente
+    """
+    global _worker_tables
+    _worker_tables = tables
+
+def _evaluate_chunk(chunk):
+    """
+    Evalúa un bloque de configuraciones en el proceso trabajador.
+    
+    Args:
+        chunk (tuple): (monturas, lentes, capas, filtros, precios) como arreglos de índices
+    
+    Returns:
+        ndarray: Valores de aptitud del bloque
+    """
+    return _worker_tables.evaluate(*chunk)
+
+class ProcessPoolEvaluation:
+    """
+    Evaluación de poblaciones repartida en un pool de procesos.
+    Los trabajadores reciben las tablas del evaluador al arrancar y cada tarea
+    solo transporta los arreglos de índices de su bloque.
+    """
+    def __init__(self, evaluator, n_workers=None, chunk_size=None):
+        """
+        Crea el pool de procesos.
+        
+        Args:
+            evaluator (FitnessEvaluator): Evaluador cuyas tablas se envían a los trabajadores
+            n_workers (int): Número de procesos (por defecto, número de CPUs)
+            chunk_size (int): Configuraciones por tarea (por defecto, reparto automático)
+        """
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            initializer=_init_worker,
+            initargs=(evaluator.tables,)
+        )
+    
+    def evaluate(self, montura_idx, lente_idx, capas_idx, filtros_idx, precios):
+        """
+        Calcula la aptitud de un lote de configuraciones en paralelo.
+        El resultado es idéntico (y en el mismo orden) que ScoreTables.evaluate.
+        
+        Args:
+            montura_idx (ndarray): Índice de montura por configuración
+            lente_idx (ndarray): Índice de lente por configuración
+            capas_idx (ndarray): Matriz de índices de capas rellena con -1
+            filtros_idx (ndarray): Matriz de índices de filtros rellena con -1
+            precios (ndarray): Precio total de cada configuración
+        
+        Returns:
+            ndarray: Valores de aptitud (0-100)
+        """
+        n = len(precios)
+        chunk_size = self.chunk_size or max(1, -(-n // (self.n_workers * 4)))
+        
+        chunks = [
+            (montura_idx[i:i + chunk_size], lente_idx[i:i + chunk_size],
+             capas_idx[i:i + chunk_size], filtros_idx[i:i + chunk_size], precios[i:i + chunk_size])
+            for i in range(0, n, chunk_size)
+        ]
+        
+        # map conserva el orden de los bloques, por lo que el resultado es determinista
+        results = list(self.executor.map(_evaluate_chunk, chunks))
+        return np.concatenate(results) if results else np.empty(0)
+    
+    def shutdown(self):
+        """Detiene los procesos trabajadores."""
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,176 @@
+import os
+import json
+import hashlib
+
+# Directorio de la caché de resultados (se guarda junto a los CSV)
+RESULT_CACHE_DIR = '.result_cache'
+
+# Cambiar al modificar el algoritmo o el formato de los resultados
+RESULT_CACHE_VERSION = 2
+
+# Parámetros que no cambian el resultado de una optimización
+_IGNORED_PARAMS = ('n_workers', 'id')
+
+class ResultCache:
+    """
+    Caché persistente de resultados completos de optimización.
+    Cada entrada es un archivo JSON cuyo nombre es el hash de los parámetros de
+    la solicitud y del contenido del catálogo, de modo que al cambiar los CSV las
+    entradas anteriores dejan de coincidir. Cuando el tamaño total supera
+    max_bytes se eliminan las entradas usadas hace más tiempo. Varios procesos
+    pueden compartir el mismo directorio (las escrituras son atómicas).
+    """
+    def __init__(self, path=RESULT_CACHE_DIR, max_bytes=64 * 1024 * 1024):
+        """
+        Inicializa la caché.
+        
+        Args:
+            path (str): Directorio de la caché (se crea si no existe)
+            max_bytes (int): Tamaño máximo total de las entradas
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._bytes = None
+    
+    @staticmethod
+    def make_key(params, content_hash):
+        """
+        Calcula la clave de una solicitud.
+        
+        Args:
+            params (dict): Parámetros normalizados de la optimización
+            content_hash (str): Hash del contenido del catálogo
+        
+        Returns:
+            str: Clave hexadecimal
+        """
+        relevantes = {k: v for k, v in params.items() if k not in _IGNORED_PARAMS}
+        contenido = json.dumps([RESULT_CACHE_VERSION, content_hash, relevantes],
+                               sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+    
+    def _entry(self, key):
+        """Ruta del archivo de una entrada."""
+        return os.path.join(self.path, f'{key}.json')
+    
+    def get(self, key):
+        """
+        Obtiene un resultado almacenado.
+        
+        Args:
+            key (str): Clave devuelta por make_key()
+        
+        Returns:
+            dict: Resultado almacenado o None si no existe
+        """
+        ruta = self._entry(key)
+        try:
+            with open(ruta, encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        
+        # Marcar la entrada como usada recientemente para el desalojo
+        try:
+            os.utime(ruta)
+        except OSError:
+            pass
+        self.hits += 1
+        return result
+    
+    def put(self, key, result):
+        """
+        Almacena un resultado y desaloja entradas antiguas si se supera el tamaño máximo.
+        
+        Args:
+            key (str): Clave devuelta por make_key()
+            result (dict): Resultado serializable en JSON
+        """
+        ruta = self._entry(key)
+        temporal = f'{ruta}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            datos = json.dumps(result, ensure_ascii=False).encode('utf-8')
+            with open(temporal, 'wb') as f:
+                f.write(datos)
+            os.replace(temporal, ruta)
+        except OSError as e:
+            print(f"No se pudo guardar el resultado en la caché: {e}")
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            return
+        
+        if self._bytes is None:
+            self._bytes = self._scan()[1]
+        else:
+            self._bytes += len(datos)
+        if self._bytes > self.max_bytes:
+            self._evict()
+    
+    def _scan(self):
+        """
+        Recorre las entradas de la caché.
+        
+        Returns:
+            tuple: (lista de (último uso, tamaño, ruta), tamaño total)
+        """
+        entradas = []
+        try:
+            with os.scandir(self.path) as it:
+                for entrada in it:
+                    if not entrada.name.endswith('.json'):
+                        continue
+                    try:
+                        estado = entrada.stat()
+                    except OSError:
+                        continue
+                    entradas.append((estado.st_mtime, estado.st_size, entrada.path))
+        except OSError:
+            pass
+        return entradas, sum(size for _, size, _ in entradas)
+    
+    def _evict(self):
+        """Elimina las entradas usadas hace más tiempo hasta quedar por debajo del límite."""
+        entradas, total = self._scan()
+        entradas.sort()
+        for _, size, ruta in entradas:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+            total -= size
+        self._bytes = total
+    
+    def clear(self):
+        """Elimina todas las entradas."""
+        for _, _, ruta in self._scan()[0]:
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+        self._bytes = 0
+    
+    def __len__(self):
+        return len(self._scan()[0])
+    
+    def get_stats(self):
+        """
+        Obtiene estadísticas de uso de la caché.
+        
+        Returns:
+            dict: Aciertos, fallos, tasa de aciertos, entradas y tamaño en bytes
+        """
+        entradas, total = self._scan()
+        consultas = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / consultas if consultas else 0.0,
+            'entries': len(entradas),
+            'bytes': total
+        }
@@ -0,0 +1,124 @@
+import random
+from bisect import bisect_left, bisect_right
+from itertools import product
+import numpy as np
+
+class PriceFeasibleSampler:
+    """
+    Muestreo constructivo de configuraciones con precio total dentro de un rango.
+    Los precios de cada componente se ordenan una sola vez; al elegir cada
+    componente se acota su precio con el presupuesto restante y con la suma
+    mínima y máxima de los componentes que faltan, de modo que la configuración
+    completa siempre queda en [precio_min, precio_max] sin descartar intentos.
+    """
+    def __init__(self, componentes, precio_min=None, precio_max=None):
+        """
+        Prepara los arreglos ordenados de precios.
+        
+        Args:
+            componentes (dict): Nombre -> (índices candidatos, precios por índice,
+                mínimo de elementos, máximo de elementos)
+            precio_min (float): Precio total mínimo (None sin límite)
+            precio_max (float): Precio total máximo (None sin límite)
+        """
+        self.precio_min = -np.inf if precio_min is None else precio_min
+        self.precio_max = np.inf if precio_max is None else precio_max
+        self.names = list(componentes)
+        self._indices = {}
+        self._precios = {}
+        self._baratos = {}
+        self._caros = {}
+        self._rangos = []
+        
+        for nombre, (indices, precios, minimo, maximo) in componentes.items():
+            indices = np.asarray(indices, dtype=np.intp)
+            valores = np.asarray(precios, dtype=float)[indices] if len(indices) else np.empty(0)
+            orden = np.argsort(valores, kind='stable')
+            self._indices[nombre] = indices[orden].tolist()
+            self._precios[nombre] = valores[orden].tolist()
+            # Suma de los k más baratos y de los k más caros, para k = 0..n
+            self._baratos[nombre] = np.concatenate(([0.0], np.cumsum(valores[orden]))).tolist()
+            self._caros[nombre] = np.concatenate(([0.0], np.cumsum(valores[orden][::-1]))).tolist()
+            maximo = min(maximo, len(indices))
+            self._rangos.append(range(min(minimo, maximo), maximo + 1))
+        
+        # Combinaciones de cantidades que admiten al menos un precio total válido
+        self.feasible_counts = []
+        for counts in product(*self._rangos):
+            bajo, alto = self._bounds(counts)
+            if bajo <= self.precio_max and alto >= self.precio_min:
+                self.feasible_counts.append(counts)
+        self._feasible = set(self.feasible_counts)
+    
+    def _bounds(self, counts):
+        """Precio total mínimo y máximo alcanzables con las cantidades indicadas."""
+        bajo = sum(self._baratos[n][k] for n, k in zip(self.names, counts))
+        alto = sum(self._caros[n][k] for n, k in zip(self.names, counts))
+        return bajo, alto
+    
+    @property
+    def feasible(self):
+        """True si existe al menos una configuración dentro del rango de precio."""
+        return bool(self.feasible_counts)
+    
+    def sample(self, max_attempts=20):
+        """
+        Construye una configuración aleatoria con precio total dentro del rango.
+        Las cantidades de cada componente se eligen como en la inicialización
+        aleatoria (uniformes); si la combinación no admite un precio válido se
+        elige otra entre las factibles.
+        
+        Args:
+            max_attempts (int): Reintentos si las elecciones sin repetición agotan los candidatos
+        
+        Returns:
+            dict: Nombre -> tupla de índices elegidos, o None si no hay configuración factible
+        """
+        if not self.feasible_counts:
+            return None
+        
+        for _ in range(max_attempts):
+            counts = tuple(random.choice(r) for r in self._rangos)
+            if counts not in self._feasible:
+                counts = random.choice(self.feasible_counts)
+            seleccion = self._construct(counts)
+            if seleccion is not None:
+                return seleccion
+        return None
+    
+    def _construct(self, counts):
+        """
+        Elige los componentes uno a uno en orden aleatorio dentro de la ventana de
+        precio que todavía permite completar la configuración.
+        
+        Returns:
+            dict: Índices elegidos por componente, o None si un paso se quedó sin candidatos
+        """
+        restantes = dict(zip(self.names, counts))
+        huecos = [n for n, k in restantes.items() for _ in range(k)]
+        random.shuffle(huecos)
+        elegidas = {n: [] for n in self.names}
+        gastado = 0.0
+        
+        for nombre in huecos:
+            restantes[nombre] -= 1
+            bajo = sum(self._baratos[n][k] for n, k in restantes.items())
+            alto = sum(self._caros[n][k] for n, k in restantes.items())
+            
+            precios = self._precios[nombre]
+            inicio = bisect_left(precios, self.precio_min - gastado - alto)
+            fin = bisect_right(precios, self.precio_max - gastado - bajo)
+            tomadas = [p for p in elegidas[nombre] if inicio <= p < fin]
+            if fin - inicio <= len(tomadas):
+                return None
+            
+            # Posición uniforme entre las de la ventana que no se eligieron antes
+            posicion = random.randrange(inicio, fin - len(tomadas))
+            for p in sorted(tomadas):
+                if p <= posicion:
+                    posicion += 1
+            elegidas[nombre].append(posicion)
+            gastado += precios[posicion]
+        
+        return {n: tuple(self._indices[n][p] for p in posiciones)
+                for n, posiciones in elegidas.items()}
@@ -0,0 +1,340 @@
+import os
+import json
+import time
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import batch
+
+def _run_timed(index, request):
+    """
+    Optimiza una solicitud en el proceso trabajador midiendo su tiempo de cómputo.
+    
+    Returns:
+        tuple: (resultado, segundos de cómputo, pid del trabajador)
+    """
+    start = time.perf_counter()
+    result = batch._run_request(index, request)
+    return result, time.perf_counter() - start, os.getpid()
+
+def _ping():
+    """Tarea vacía para obligar a un trabajador a arrancar y cargar los datos."""
+    return os.getpid()
+
+class ServiceMetrics:
+    """
+    Contadores y latencias del servicio (seguro entre hilos).
+    Conserva las últimas max_samples latencias para calcular percentiles.
+    """
+    def __init__(self, max_samples=1000):
+        """
+        Inicializa las métricas.
+        
+        Args:
+            max_samples (int): Número de latencias recientes conservadas
+        """
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.cached = 0
+        self.in_flight = 0
+        self.queue_times = deque(maxlen=max_samples)
+        self.run_times = deque(maxlen=max_samples)
+        self.total_times = deque(maxlen=max_samples)
+    
+    def record(self, event, cached=False, **times):
+        """
+        Registra un evento ('accepted', 'completed', 'failed', 'rejected' o 'timeout').
+        
+        Args:
+            event (str): Tipo de evento
+            cached (bool): Si el resultado provino de la caché de resultados
+            **times: queue, run y total en segundos (solo para solicitudes terminadas)
+        """
+        with self._lock:
+            if event == 'accepted':
+                self.requests += 1
+                self.in_flight += 1
+                return
+            if event == 'rejected':
+                self.rejected += 1
+                return
+            self.in_flight -= 1
+            if event == 'timeout':
+                self.timeouts += 1
+                return
+            if event == 'failed':
+                self.failed += 1
+            else:
+                self.completed += 1
+            if cached:
+                self.cached += 1
+            if not times:
+                return
+            self.queue_times.append(times['queue'])
+            self.run_times.append(times['run'])
+            self.total_times.append(times['total'])
+    
+    @staticmethod
+    def _summary(samples):
+        """Media y percentiles (en milisegundos) de una serie de latencias."""
+        if not samples:
+            return {'count': 0}
+        values = sorted(samples)
+        
+        def percentile(p):
+            return round(values[min(len(values) - 1, int(p * len(values)))] * 1000, 3)
+        
+        return {
+            'count': len(values),
+            'mean_ms': round(sum(values) / len(values) * 1000, 3),
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'max_ms': round(values[-1] * 1000, 3)
+        }
+    
+    def snapshot(self):
+        """
+        Obtiene el estado actual de las métricas.
+        
+        Returns:
+            dict: Contadores y resumen de latencias
+        """
+        with self._lock:
+            return {
+                'uptime_s': round(time.time() - self.started, 3),
+                'requests': self.requests,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+                'cached': self.cached,
+                'in_flight': self.in_flight,
+                'queue_time': self._summary(self.queue_times),
+                'run_time': self._summary(self.run_times),
+                'total_time': self._summary(self.total_times)
+            }
+
+class ServiceBusy(Exception):
+    """La cola del servicio está llena."""
+
+class OptimizationService:
+    """
+    Servicio local de optimización con los datos precargados.
+    Las solicitudes se encolan hacia un pool acotado de procesos; cada trabajador
+    mantiene en memoria el catálogo y los evaluadores por padecimiento (ver
+    batch.Workspace). Cuando hay más de n_workers + max_queue solicitudes en
+    curso, las nuevas se rechazan en lugar de acumularse.
+    """
+    def __init__(self, data_dir='data', n_workers=None, max_queue=None, defaults=None,
+                 request_timeout=None, cache_size=200000, result_cache=None):
+        """
+        Inicializa el servicio y arranca sus trabajadores.
+        
+        Args:
+            data_dir (str): Directorio con los CSV
+            n_workers (int): Número de procesos (por defecto, número de CPUs)
+            max_queue (int): Solicitudes en espera admitidas además de las que se
+                están ejecutando (por defecto, 2 * n_workers)
+            defaults (dict): Parámetros aplicados a todas las solicitudes
+            request_timeout (float): Segundos máximos de espera por solicitud
+            cache_size (int): Tamaño de la caché de aptitud de cada trabajador
+            result_cache (ResultCache): Caché persistente de resultados
+        """
+        self.data_dir = data_dir
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.max_queue = 2 * self.n_workers if max_queue is None else max_queue
+        self.defaults = dict(defaults or {})
+        self.request_timeout = request_timeout
+        self.metrics = ServiceMetrics()
+        self._slots = threading.BoundedSemaphore(self.n_workers + self.max_queue)
+        self._counter = 0
+        self._counter_lock = threading.Lock()
+        self._initargs = (data_dir, cache_size, result_cache)
+        self._executor_lock = threading.Lock()
+        self.executor = self._start_executor()
+    
+    def _start_executor(self):
+        """Crea el pool de procesos; cada trabajador carga los datos al arrancar."""
+        return ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            initializer=batch._init_worker,
+            initargs=self._initargs
+        )
+    
+    def _restart_executor(self, broken):
+        """
+        Sustituye el pool si un trabajador murió (el pool queda inutilizable).
+        
+        Args:
+            broken (ProcessPoolExecutor): Pool que falló; si otro hilo ya lo
+                sustituyó no se vuelve a crear
+        """
+        with self._executor_lock:
+            if self.executor is not broken:
+                return
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.executor = self._start_executor()
+    
+    def warmup(self):
+        """
+        Arranca todos los trabajadores para que carguen los datos antes de la primera solicitud.
+        
+        Returns:
+            int: Número de procesos trabajadores distintos que respondieron
+        """
+        futures = [self.executor.submit(_ping) for _ in range(self.n_workers)]
+        return len({future.result() for future in futures})
+    
+    def submit(self, request):
+        """
+        Ejecuta una solicitud y espera su resultado.
+        
+        Args:
+            request (dict): Parámetros de la solicitud (ver batch.BatchOptimizer.run)
+        
+        Returns:
+            dict: Resultado con una clave 'metrics' (queue_ms, run_ms, total_ms, worker_pid)
+        
+        Raises:
+            ServiceBusy: Si la cola está llena
+            TimeoutError: Si se supera request_timeout
+            BrokenProcessPool: Si el trabajador murió durante la solicitud (el
+                pool se vuelve a crear para las siguientes)
+        """
+        if not self._slots.acquire(blocking=False):
+            self.metrics.record('rejected')
+            raise ServiceBusy(f"Cola llena ({self.n_workers + self.max_queue} solicitudes en curso)")
+        
+        with self._counter_lock:
+            index = self._counter
+            self._counter += 1
+        if isinstance(request, dict):
+            request = {**self.defaults, **request}
+        
+        self.metrics.record('accepted')
+        start = time.perf_counter()
+        executor = self.executor
+        try:
+            future = executor.submit(_run_timed, index, request)
+        except Exception as e:
+            self._slots.release()
+            self.metrics.record('failed')
+            if isinstance(e, BrokenProcessPool):
+                self._restart_executor(executor)
+            raise
+        # El lugar en la cola se libera cuando el trabajador termina, no cuando
+        # el cliente deja de esperar, para que los tiempos agotados no burlen el límite
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            result, run_time, pid = future.result(timeout=self.request_timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            self.metrics.record('timeout')
+            raise TimeoutError(f"La solicitud superó {self.request_timeout} s")
+        except BrokenProcessPool:
+            self.metrics.record('failed')
+            self._restart_executor(executor)
+            raise
+        except Exception:
+            self.metrics.record('failed')
+            raise
+        
+        total = time.perf_counter() - start
+        times = {'queue': max(0.0, total - run_time), 'run': run_time, 'total': total}
+        self.metrics.record('failed' if 'error' in result else 'completed',
+                            cached=result.get('cached', False), **times)
+        result['metrics'] = {
+            'queue_ms': round(times['queue'] * 1000, 3),
+            'run_ms': round(run_time * 1000, 3),
+            'total_ms': round(total * 1000, 3),
+            'worker_pid': pid
+        }
+        return result
+    
+    def shutdown(self):
+        """Detiene el pool de procesos."""
+        self.executor.shutdown(cancel_futures=True)
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    Rutas HTTP del servicio:
+        POST /optimize   Solicitud JSON -> resultado JSON (503 si la cola está llena)
+        GET  /metrics    Métricas del servicio
+        GET  /health     Estado del servicio
+    """
+    service = None
+    protocol_version = 'HTTP/1.1'
+    
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_GET(self):
+        if self.path == '/metrics':
+            self._send(200, self.service.metrics.snapshot())
+        elif self.path == '/health':
+            self._send(200, {'status': 'ok', 'workers': self.service.n_workers})
+        else:
+            self._send(404, {'error': f"Ruta no encontrada: {self.path}"})
+    
+    def do_POST(self):
+        if self.path != '/optimize':
+            self._send(404, {'error': f"Ruta no encontrada: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except (ValueError, UnicodeDecodeError) as e:
+            self._send(400, {'error': f"JSON inválido: {e}"})
+            return
+        
+        try:
+            result = self.service.submit(request)
+        except ServiceBusy as e:
+            self._send(503, {'error': str(e)}, {'Retry-After': '1'})
+            return
+        except TimeoutError as e:
+            self._send(504, {'error': str(e)})
+            return
+        except Exception as e:
+            self._send(500, {'error': f"Error interno: {e}"})
+            return
+        self._send(400 if 'error' in result else 200, result)
+    
+    def log_message(self, format, *args):
+        pass
+
+def serve(service, host='127.0.0.1', port=8765):
+    """
+    Atiende solicitudes HTTP hasta que se interrumpa el proceso.
+    
+    Args:
+        service (OptimizationService): Servicio ya inicializado
+        host (str): Dirección de escucha
+        port (int): Puerto de escucha
+    """
+    handler = type('Handler', (_Handler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    print(f"OptiLens escuchando en http://{host}:{server.server_port} "
+          f"({service.n_workers} trabajadores, cola de {service.max_queue})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
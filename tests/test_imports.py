@@ -0,0 +1,42 @@
+"""
+El núcleo de optimización (genetic_algorithm y evaluator) debe importarse sin
+cargar las bibliotecas de gráficos, la interfaz ni pandas, y en poco tiempo:
+los procesos trabajadores de batch y service lo importan al arrancar.
+"""
+import json
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que solo deben cargarse en el primer uso (gráficos, interfaz, exportación, pool)
+PESADOS = ('matplotlib', 'plotly', 'PyQt5', 'pandas', 'multiprocessing')
+
+# Límite generoso: la importación tarda ~0.15 s; cargar pandas o matplotlib lo supera
+TIEMPO_MAXIMO = 1.0
+
+_SCRIPT = """
+import json, sys, time
+inicio = time.perf_counter()
+import genetic_algorithm, evaluator
+tiempo = time.perf_counter() - inicio
+print(json.dumps({'time': tiempo, 'modules': sorted(sys.modules)}))
+"""
+
+def _import_core():
+    """Importa el núcleo en un intérprete nuevo y devuelve (segundos, módulos cargados)."""
+    salida = subprocess.run([sys.executable, '-c', _SCRIPT], cwd=RAIZ, capture_output=True,
+                            text=True, check=True)
+    datos = json.loads(salida.stdout)
+    return datos['time'], set(datos['modules'])
+
+def test_core_does_not_import_heavy_modules():
+    _, modulos = _import_core()
+    cargados = sorted(m for m in modulos if m.split('.')[0] in PESADOS)
+    assert not cargados, f"El núcleo importa módulos pesados: {cargados}"
+
+def test_core_import_time():
+    # Mejor de varias ejecuciones para no depender de la caché del sistema de archivos
+    tiempo = min(_import_core()[0] for _ in range(3))
+    assert tiempo < TIEMPO_MAXIMO, f"Importar el núcleo tardó {tiempo:.3f} s"
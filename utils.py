@@ -3,6 +3,8 @@ import os
 import random
 import numpy as np
 from typing import List, Dict, Any, Tuple
+from catalog import ComponentCatalog
+from sampling import PriceFeasibleSampler
 
 def load_datasets(data_dir='data'):
     """
@@ -15,17 +17,32 @@ def load_datasets(data_dir='data'):
         tuple: Dataframes de padecimientos, monturas, lentes, capas y filtros.
     """
     try:
-        padecimientos_df = pd.read_csv(os.path.join(data_dir, 'padecimientos.csv'))
-        monturas_df = pd.read_csv(os.path.join(data_dir, 'monturas.csv'))
-        lentes_df = pd.read_csv(os.path.join(data_dir, 'lentes.csv'))
-        capas_df = pd.read_csv(os.path.join(data_dir, 'capas.csv'))
-        filtros_df = pd.read_csv(os.path.join(data_dir, 'filtros.csv'))
+        # Los DataFrames se reconstruyen desde la instantánea binaria si los CSV no cambiaron
+        catalog = ComponentCatalog.load(data_dir)
+        padecimientos_df = catalog.padecimientos.to_dataframe()
+        monturas_df = catalog.monturas.to_dataframe()
+        lentes_df = catalog.lentes.to_dataframe()
+        capas_df = catalog.capas.to_dataframe()
+        filtros_df = catalog.filtros.to_dataframe()
         
         return padecimientos_df, monturas_df, lentes_df, capas_df, filtros_df
     except Exception as e:
         print(f"Error al cargar los datasets: {e}")
         return None, None, None, None, None
 
+def load_catalog(data_dir='data'):
+    """
+    Carga los CSV de componentes como catálogo columnar y tipado (desde la
+    instantánea binaria si los CSV no cambiaron).
+    
+    Args:
+        data_dir (str): Directorio donde se encuentran los archivos CSV.
+    
+    Returns:
+        ComponentCatalog: Catálogo de monturas, lentes, capas y filtros.
+    """
+    return ComponentCatalog.load(data_dir)
+
 def filter_available_components(monturas_df, lentes_df, capas_df, filtros_df):
     """
     Filtra los componentes disponibles en inventario.
@@ -191,6 +208,35 @@ def calculate_total_price_dict(individual, monturas_df, lentes_df, capas_df, fil
     
     return precio_total
 
+def calculate_total_price_catalog(individual, catalog):
+    """
+    Calcula el precio total de una configuración representada como diccionario de
+    identificadores usando los arreglos de precios del catálogo.
+    
+    Args:
+        individual (dict): Individuo con ids de 'montura', 'lente', 'capas' y 'filtros'.
+        catalog (ComponentCatalog): Catálogo de componentes.
+    
+    Returns:
+        float: Precio total de la configuración.
+    """
+    precio_total = 0
+    
+    seleccion = [
+        ('monturas', [individual.get('montura')]),
+        ('lentes', [individual.get('lente')]),
+        ('capas', individual.get('capas', [])),
+        ('filtros', individual.get('filtros', []))
+    ]
+    for componente, ids in seleccion:
+        precios = catalog.precios(componente)
+        for identificador in ids:
+            idx = catalog.index_of(componente, identificador) if identificador is not None else -1
+            if idx >= 0:
+                precio_total += precios[idx]
+    
+    return float(precio_total)
+
 def check_compatibility(montura_id, lente_id, capas_ids, filtros_ids, monturas_df, lentes_df, capas_df, filtros_df):
     """
     Verifica la compatibilidad entre los componentes seleccionados.
@@ -329,6 +375,14 @@ def generate_initial_population(
     capas_ids = capas['id'].tolist()
     filtros_ids = filtros['id'].tolist()
     
+    # Muestreo constructivo: el precio total de cada configuración ya cae en el rango
+    sampler = PriceFeasibleSampler({
+        'montura': (range(len(monturas_ids)), monturas['precio_montura'].to_numpy(), 1, 1),
+        'lente': (range(len(lentes_ids)), lentes['precio_lente'].to_numpy(), 1, 1),
+        'capas': (range(len(capas_ids)), capas['precio_capa'].to_numpy(), 0, 3),
+        'filtros': (range(len(filtros_ids)), filtros['precio_filtro'].to_numpy(), 0, 2)
+    }, precio_min, precio_max)
+    
     # Generar configuraciones aleatorias válidas
     attempts = 0
     max_attempts = size * 10  # Límite de intentos para evitar bucles infinitos
@@ -336,17 +390,14 @@ def generate_initial_population(
     while len(population) < size and attempts < max_attempts:
         attempts += 1
         
-        # Seleccionar componentes aleatorios
-        montura_id = random.choice(monturas_ids)
-        lente_id = random.choice(lentes_ids)
-        
-        # Determinar número aleatorio de capas y filtros
-        num_capas = random.randint(0, min(3, len(capas_ids)))
-        num_filtros = random.randint(0, min(2, len(filtros_ids)))
-        
-        # Seleccionar capas y filtros aleatorios
-        selected_capas = random.sample(capas_ids, num_capas) if num_capas > 0 else []
-        selected_filtros = random.sample(filtros_ids, num_filtros) if num_filtros > 0 else []
+        # Seleccionar componentes aleatorios con precio total factible
+        seleccion = sampler.sample()
+        if seleccion is None:
+            break
+        montura_id = monturas_ids[seleccion['montura'][0]]
+        lente_id = lentes_ids[seleccion['lente'][0]]
+        selected_capas = [capas_ids[i] for i in seleccion['capas']]
+        selected_filtros = [filtros_ids[i] for i in seleccion['filtros']]
         
         # Crear individuo
         individual = {
@@ -357,15 +408,9 @@ def generate_initial_population(
             'filtros': selected_filtros
         }
         
-        # Verificar compatibilidad y rango de precio
-        is_compatible = check_compatibility(montura_id, lente_id, selected_capas, selected_filtros, 
-                                          monturas_df, lentes_df, capas_df, filtros_df)
-        
-        price = calculate_total_price_dict(individual, monturas_df, lentes_df, capas_df, filtros_df)
-        is_in_price_range = precio_min <= price <= precio_max
-        
-        # Añadir individuo si cumple restricciones
-        if is_compatible and is_in_price_range:
+        # Verificar compatibilidad (el rango de precio se cumple por construcción)
+        if check_compatibility(montura_id, lente_id, selected_capas, selected_filtros, 
+                               monturas_df, lentes_df, capas_df, filtros_df):
             population.append(individual)
     
     # Si no se generó suficiente población, completar con duplicados si es necesario
@@ -1,42 +1,75 @@
-import matplotlib.pyplot as plt
-import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import pandas as pd
 import random
+import numpy as np
+from history import EvolutionHistory
+
+# plotly se importa en cada método de graficado para que importar este módulo
+# (por ejemplo, desde procesos sin pantalla) no cargue las bibliotecas de gráficos
 
 class ResultVisualizer:
     """Clase para visualizar los resultados del algoritmo genético."""
     
-    def __init__(self):
-        """Inicializa el visualizador."""
-        self.history = []
-        self.best_fitness_history = []
-        self.avg_fitness_history = []
+    def __init__(self, snapshot_stride=None, max_snapshots=None):
+        """
+        Inicializa el visualizador.
+        
+        Args:
+            snapshot_stride (int): Cada cuántas generaciones conservar la población completa
+                (por defecto, solo estadísticas resumidas)
+            max_snapshots (int): Número máximo de instantáneas conservadas (búfer circular)
+        """
+        self.history = EvolutionHistory(snapshot_stride=snapshot_stride, max_snapshots=max_snapshots)
         self.best_solutions = []
+        self._figure = None
+        self._plotted = 0
+    
+    @property
+    def best_fitness_history(self):
+        """Mejor aptitud por generación."""
+        return self.history.best.tolist()
+    
+    @property
+    def avg_fitness_history(self):
+        """Aptitud promedio por generación."""
+        return self.history.mean.tolist()
     
     def update_history(self, generation, population, fitness_values):
-        """Actualiza el historial con los datos de la generación actual."""
-        self.history.append({
-            'generation': generation,
-            'population': population.copy(),
-            'fitness_values': fitness_values.copy()
-        })
-        
-        self.best_fitness_history.append(max(fitness_values))
-        self.avg_fitness_history.append(sum(fitness_values) / len(fitness_values))
+        """Actualiza el historial con las estadísticas de la generación actual."""
+        genotypes = [individual.genotype() for individual in population]
+        self.history.record(fitness_values, genotypes, population, generation)
     
     def plot_fitness_evolution(self):
-        """Genera un gráfico de la evolución de la aptitud."""
-        generations = list(range(len(self.best_fitness_history)))
+        """
+        Genera el gráfico de la evolución de la aptitud.
+        La figura se construye una sola vez; en las llamadas siguientes solo se
+        actualizan los datos de sus trazas con las generaciones nuevas, de modo
+        que puede llamarse en cada generación para seguir la ejecución en vivo.
+        """
+        n = len(self.history)
+        if self._figure is None or n < self._plotted:
+            self._figure = self._create_fitness_figure()
+            self._plotted = 0
+        
+        if n > self._plotted:
+            generations = np.arange(n)
+            with self._figure.batch_update():
+                best, avg = self._figure.data
+                best.x, best.y = generations, self.history.best.copy()
+                avg.x, avg.y = generations, self.history.mean.copy()
+            self._plotted = n
+        return self._figure
+    
+    def _create_fitness_figure(self):
+        """Crea la figura de evolución con las trazas vacías."""
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
         
         fig = make_subplots(specs=[[{"secondary_y": True}]])
         
         # Gráfico de mejor aptitud
         fig.add_trace(
             go.Scatter(
-                x=generations,
-                y=self.best_fitness_history,
+                x=[],
+                y=[],
                 mode='lines+markers',
                 name='Mejor aptitud',
                 line=dict(color='rgb(0, 100, 200)', width=2)
@@ -46,8 +79,8 @@ class ResultVisualizer:
         # Gráfico de aptitud promedio
         fig.add_trace(
             go.Scatter(
-                x=generations,
-                y=self.avg_fitness_history,
+                x=[],
+                y=[],
                 mode='lines',
                 name='Aptitud promedio',
                 line=dict(color='rgb(200, 100, 0)', width=2, dash='dash')
@@ -76,6 +109,8 @@ class ResultVisualizer:
     
     def create_comparison_chart(self, solutions, labels):
         """Crea un gráfico de radar para comparar las mejores soluciones."""
+        import plotly.graph_objects as go
+        
         categories = ['Calidad visual', 'Protección', 'Durabilidad', 'Comodidad', 'Costo-beneficio']
         
         fig = go.Figure()